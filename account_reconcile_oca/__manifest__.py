@@ -26,6 +26,8 @@
         "views/account_move.xml",
         "views/account_account.xml",
         "views/account_bank_statement.xml",
+        "data/server_actions.xml",
+        "data/cron.xml",
     ],
     "demo": ["demo/demo.xml"],
     "post_init_hook": "post_init_hook",
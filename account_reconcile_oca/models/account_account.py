@@ -0,0 +1,14 @@
+# Copyright 2023 Dixmit
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import models
+
+
+class AccountAccount(models.Model):
+    _inherit = "account.account"
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "reconcile" in vals or "account_type" in vals:
+            self.env["account.account.reconcile.summary"]._refresh_accounts(self)
+        return res
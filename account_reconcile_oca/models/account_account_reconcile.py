@@ -1,7 +1,10 @@
 # Copyright 2023 Dixmit
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from odoo import api, fields, models
+import copy
+import json
+
+from odoo import SQL, api, fields, models
 
 
 class CharId(fields.Id):
@@ -22,6 +25,14 @@ class AccountAccountReconcile(models.Model):
     name = fields.Char(readonly=True)
     is_reconciled = fields.Boolean(readonly=True)
     active = fields.Boolean(default=True)
+    debit_amount = fields.Monetary(
+        currency_field="company_currency_id", string="Open Debit", readonly=True
+    )
+    credit_amount = fields.Monetary(
+        currency_field="company_currency_id", string="Open Credit", readonly=True
+    )
+    debit_count = fields.Integer(string="Open Debit Items", readonly=True)
+    credit_count = fields.Integer(string="Open Credit Items", readonly=True)
 
     @property
     def _table_query(self):
@@ -44,97 +55,91 @@ class AccountAccountReconcile(models.Model):
         )
         return f"""
             SELECT
-                min(aml.id) as id,
-                MAX({account_name}) as name,
-                CASE
-                    WHEN a.account_type in ('asset_receivable', 'liability_payable')
-                        THEN aml.partner_id
-                    ELSE NULL
-                    END as partner_id,
-                a.id as account_id,
+                s.id,
+                {account_name} as name,
+                s.partner_id,
+                s.account_id,
                 FALSE as is_reconciled,
-                aml.currency_id as currency_id,
-                am.company_id,
+                s.currency_id,
+                s.company_id,
                 null as foreign_currency_id,
-                (
-                    SUM(
-                        CASE WHEN aml.amount_residual > 0
-                        THEN aml.amount_residual
-                        ELSE 0 END
-                    ) > 0
-                    AND SUM(
-                        CASE WHEN aml.amount_residual < 0
-                        THEN -aml.amount_residual
-                        ELSE 0 END
-                    ) > 0
-                ) as active
+                s.debit_amount,
+                s.credit_amount,
+                s.debit_count,
+                s.credit_count,
+                (s.debit_count > 0 AND s.credit_count > 0) as active
         """
 
     def _from(self):
         return """
             FROM
-                account_account a
-                INNER JOIN account_move_line aml ON aml.account_id = a.id
-                INNER JOIN account_move am ON am.id = aml.move_id
+                account_account_reconcile_summary s
+                INNER JOIN account_account a ON a.id = s.account_id
             """
 
     def _where(self):
         return """
             WHERE a.reconcile
-                AND am.state = 'posted'
         """
 
     def _groupby(self):
         return """
-            GROUP BY
-                a.id,
-                CASE
-                    WHEN a.account_type in ('asset_receivable', 'liability_payable')
-                        THEN aml.partner_id
-                    ELSE NULL
-                END,
-                aml.currency_id,
-                am.company_id
         """
 
     def _having(self):
         return """
         """
 
+    def flush_model(self, fnames=None):
+        # The rows queued by this transaction are read from the summary table
+        self.env["account.account.reconcile.summary"]._refresh_pending()
+        return super().flush_model(fnames=fnames)
+
+    def _get_reconcile_data_records(self):
+        """Return the stored data of the current user for the whole recordset,
+        read with a single search and mapped by reconcile id."""
+        data_records = self.env["account.account.reconcile.data"].search(
+            [("user_id", "=", self.env.user.id), ("reconcile_id", "in", self.ids)]
+        )
+        return {data_record.reconcile_id: data_record for data_record in data_records}
+
     def _compute_reconcile_data_info(self):
-        data_obj = self.env["account.account.reconcile.data"]
-        for record in self:
-            if self.env.context.get("default_account_move_lines"):
+        if self.env.context.get("default_account_move_lines"):
+            for record in self:
                 data = {
                     "data": [],
                     "counterparts": self.env.context.get("default_account_move_lines"),
                 }
                 record.reconcile_data_info = self._recompute_data(data)
-                continue
-            data_record = data_obj.search(
-                [("user_id", "=", self.env.user.id), ("reconcile_id", "=", record.id)]
-            )
+            return
+        data_records = self._get_reconcile_data_records()
+        for record in self:
+            data_record = data_records.get(record.id)
             if data_record:
                 record.reconcile_data_info = data_record.data
             else:
                 record.reconcile_data_info = {"data": [], "counterparts": []}
 
     def _inverse_reconcile_data_info(self):
-        data_obj = self.env["account.account.reconcile.data"]
+        data_records = self._get_reconcile_data_records()
+        updates = []
+        vals_list = []
         for record in self:
-            data_record = data_obj.search(
-                [("user_id", "=", self.env.user.id), ("reconcile_id", "=", record.id)]
-            )
+            data_record = data_records.get(record.id)
             if data_record:
-                data_record.data = record.reconcile_data_info
+                updates.append((data_record.id, record.reconcile_data_info))
             else:
-                data_obj.create(
+                vals_list.append(
                     {
                         "reconcile_id": record.id,
                         "user_id": self.env.user.id,
                         "data": record.reconcile_data_info,
                     }
                 )
+        if updates:
+            self.env["account.account.reconcile.data"]._write_data(updates)
+        if vals_list:
+            self.env["account.account.reconcile.data"].create(vals_list)
 
     @api.onchange("add_account_move_line_id")
     def _onchange_add_account_move_line(self):
@@ -197,11 +202,18 @@ class AccountAccountReconcile(models.Model):
         data_record.unlink()
 
     def add_multiple_lines(self, domain):
-        res = super().add_multiple_lines(domain)
-        lines = self.env["account.move.line"].search(domain)
-        for line in lines:
-            self._add_account_move_line(line, keep_current=True)
-        return res
+        """Add all the lines matching the domain and return the patch to apply
+        on the reconcile data already shown by the widget."""
+        super().add_multiple_lines(domain)
+        previous_info = copy.deepcopy(self.reconcile_data_info)
+        data = self.reconcile_data_info
+        counterparts = set(data["counterparts"])
+        for line in self.env["account.move.line"].search(domain):
+            if line.id not in counterparts:
+                data["counterparts"].append(line.id)
+                counterparts.add(line.id)
+        self.reconcile_data_info = self._recompute_data(data)
+        return self._get_reconcile_data_patch(previous_info, self.reconcile_data_info)
 
 
 class AccountAccountReconcileData(models.TransientModel):
@@ -211,3 +223,27 @@ class AccountAccountReconcileData(models.TransientModel):
     user_id = fields.Many2one("res.users", required=True)
     reconcile_id = fields.Integer(required=True)
     data = fields.Serialized()
+
+    @api.model
+    def _write_data(self, updates):
+        """Write the data of several records, given as (id, data) pairs, with
+        a single query."""
+        records = self.browse([record_id for record_id, _data in updates])
+        records.flush_recordset()
+        self.env.cr.execute(
+            SQL(
+                """
+                UPDATE account_account_reconcile_data AS d
+                SET data = v.data, write_uid = %s, write_date = %s
+                FROM (VALUES %s) AS v(id, data)
+                WHERE d.id = v.id
+                """,
+                self.env.uid,
+                self.env.cr.now(),
+                SQL(", ").join(
+                    SQL("(%s, %s)", record_id, json.dumps(data))
+                    for record_id, data in updates
+                ),
+            )
+        )
+        records.invalidate_recordset(["data", "write_uid", "write_date"])
@@ -0,0 +1,270 @@
+# Copyright 2023 Dixmit
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+from odoo.tools import SQL, split_every
+
+PARTNER_ACCOUNT_TYPES = ("asset_receivable", "liability_payable")
+QUEUED_PRECOMMIT_KEY = "account_reconcile_summary_queued"
+
+
+class AccountAccountReconcileSummary(models.Model):
+    """Open debit and credit items per company, account, partner and currency.
+
+    Posting, resetting to draft, reconciling and unreconciling queue the
+    (account, partner) keys of their journal items. The queued rows are
+    recomputed with SQL before the reconciliation view is read or the
+    transaction is committed, so the view does not need to group all the open
+    journal items each time it is opened. A cron recomputes the keys that
+    would be left in the queue.
+
+    Rows are updated in place on their key and are never deleted, their id is
+    the id of the account.account.reconcile record the user data is kept on.
+    """
+
+    _name = "account.account.reconcile.summary"
+    _description = "Account Reconcile Open Items Summary"
+
+    company_id = fields.Many2one("res.company", required=True, readonly=True)
+    account_id = fields.Many2one("account.account", required=True, readonly=True)
+    partner_id = fields.Many2one("res.partner", readonly=True)
+    currency_id = fields.Many2one("res.currency", required=True, readonly=True)
+    company_currency_id = fields.Many2one(related="company_id.currency_id")
+    debit_amount = fields.Monetary(currency_field="company_currency_id")
+    credit_amount = fields.Monetary(currency_field="company_currency_id")
+    debit_count = fields.Integer()
+    credit_count = fields.Integer()
+
+    def init(self):
+        self.env.cr.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS account_account_reconcile_summary_key
+            ON account_account_reconcile_summary
+                (company_id, account_id, COALESCE(partner_id, 0), currency_id)
+            """
+        )
+        self.env.cr.execute("SELECT 1 FROM account_account_reconcile_summary LIMIT 1")
+        if not self.env.cr.rowcount:
+            self._refresh(SQL("TRUE"), SQL("TRUE"))
+
+    @api.model
+    def _partner_key_sql(self):
+        return SQL(
+            "CASE WHEN a.account_type IN %s THEN aml.partner_id ELSE NULL END",
+            PARTNER_ACCOUNT_TYPES,
+        )
+
+    @api.model
+    def _queue_lines(self, lines):
+        """Queue the rows that the given journal items belong to, they are
+        recomputed by _refresh_pending() in the same transaction.
+
+        The queue is insert only, so concurrent transactions touching the
+        same rows do not wait for each other until they commit.
+        """
+        keys = {
+            (
+                line.account_id.id,
+                line.account_id.account_type in PARTNER_ACCOUNT_TYPES
+                and line.partner_id.id
+                or None,
+            )
+            for line in lines
+            if line.account_id.reconcile
+        }
+        if not keys:
+            return
+        self.env.cr.execute(
+            SQL(
+                """
+                INSERT INTO account_account_reconcile_summary_queue
+                    (account_id, partner_id)
+                VALUES %s
+                RETURNING id
+                """,
+                SQL(", ").join(
+                    SQL("(%s, %s)", account_id, partner_id)
+                    for account_id, partner_id in keys
+                ),
+            )
+        )
+        queue_ids = [row[0] for row in self.env.cr.fetchall()]
+        precommit_data = self.env.cr.precommit.data
+        if QUEUED_PRECOMMIT_KEY not in precommit_data:
+            precommit_data[QUEUED_PRECOMMIT_KEY] = set()
+            self.env.cr.precommit.add(self._refresh_pending)
+        precommit_data[QUEUED_PRECOMMIT_KEY].update(queue_ids)
+
+    @api.model
+    def _refresh_pending(self):
+        """Recompute the rows queued by the current transaction."""
+        queue_ids = self.env.cr.precommit.data.get(QUEUED_PRECOMMIT_KEY)
+        if not queue_ids:
+            return
+        queue_ids = tuple(queue_ids)
+        self.env.cr.precommit.data[QUEUED_PRECOMMIT_KEY].clear()
+        keys = set()
+        for ids_batch in split_every(self.env.cr.IN_MAX, queue_ids, tuple):
+            self.env.cr.execute(
+                SQL(
+                    """
+                    DELETE FROM account_account_reconcile_summary_queue
+                    WHERE id IN %s
+                    RETURNING account_id, COALESCE(partner_id, 0)
+                    """,
+                    ids_batch,
+                )
+            )
+            keys.update(self.env.cr.fetchall())
+        self._refresh_keys(keys)
+
+    @api.model
+    def _cron_refresh_queued(self):
+        """Recompute the rows left in the queue by _queue_lines()."""
+        self.env.cr.execute(
+            """
+            DELETE FROM account_account_reconcile_summary_queue
+            RETURNING account_id, COALESCE(partner_id, 0)
+            """
+        )
+        self._refresh_keys(set(self.env.cr.fetchall()))
+
+    @api.model
+    def _refresh_keys(self, keys):
+        """Recompute the rows of the given (account id, partner id or 0)."""
+        for keys_batch in split_every(self.env.cr.IN_MAX, keys, tuple):
+            self._refresh(
+                SQL("(s.account_id, COALESCE(s.partner_id, 0)) IN %s", keys_batch),
+                SQL(
+                    "(aml.account_id, COALESCE(%s, 0)) IN %s",
+                    self._partner_key_sql(),
+                    keys_batch,
+                ),
+            )
+
+    @api.model
+    def _refresh_accounts(self, accounts):
+        """Recompute all the rows of the given accounts."""
+        if not accounts:
+            return
+        self._refresh(
+            SQL("s.account_id IN %s", tuple(accounts.ids)),
+            SQL("aml.account_id IN %s", tuple(accounts.ids)),
+        )
+
+    @api.model
+    def _refresh(self, summary_condition, line_condition):
+        """Recompute the rows matching the conditions from the unreconciled
+        journal items, with the unreconciled index of account.move.line.
+
+        Rows of the conditions without open items left are zeroed, the others
+        are upserted on their key, and only the rows whose totals changed are
+        written.
+        """
+        self.env["account.account"].flush_model(["account_type", "reconcile"])
+        self.env["account.move.line"].flush_model(
+            [
+                "account_id",
+                "amount_residual",
+                "company_id",
+                "currency_id",
+                "parent_state",
+                "partner_id",
+                "reconciled",
+            ]
+        )
+        self.flush_model()
+        self.env.cr.execute(
+            SQL(
+                """
+                WITH totals AS (
+                    SELECT
+                        aml.company_id,
+                        aml.account_id,
+                        %(partner_key)s AS partner_id,
+                        aml.currency_id,
+                        SUM(GREATEST(aml.amount_residual, 0)) AS debit_amount,
+                        SUM(GREATEST(-aml.amount_residual, 0)) AS credit_amount,
+                        COUNT(*) FILTER (WHERE aml.amount_residual > 0)
+                            AS debit_count,
+                        COUNT(*) FILTER (WHERE aml.amount_residual < 0)
+                            AS credit_count
+                    FROM account_move_line aml
+                    JOIN account_account a ON a.id = aml.account_id
+                    WHERE a.reconcile
+                        AND NOT aml.reconciled
+                        AND aml.parent_state = 'posted'
+                        AND %(line_condition)s
+                    GROUP BY
+                        aml.company_id, aml.account_id, %(partner_key)s,
+                        aml.currency_id
+                ),
+                emptied AS (
+                    UPDATE account_account_reconcile_summary s
+                    SET debit_amount = 0,
+                        credit_amount = 0,
+                        debit_count = 0,
+                        credit_count = 0,
+                        write_uid = %(uid)s,
+                        write_date = NOW() AT TIME ZONE 'UTC'
+                    WHERE %(summary_condition)s
+                        AND (s.debit_count != 0 OR s.credit_count != 0)
+                        AND NOT EXISTS (
+                            SELECT 1
+                            FROM totals t
+                            WHERE t.company_id = s.company_id
+                                AND t.account_id = s.account_id
+                                AND COALESCE(t.partner_id, 0)
+                                    = COALESCE(s.partner_id, 0)
+                                AND t.currency_id = s.currency_id
+                        )
+                )
+                INSERT INTO account_account_reconcile_summary AS s (
+                    company_id, account_id, partner_id, currency_id,
+                    debit_amount, credit_amount, debit_count, credit_count,
+                    create_uid, create_date, write_uid, write_date
+                )
+                SELECT
+                    t.company_id, t.account_id, t.partner_id, t.currency_id,
+                    t.debit_amount, t.credit_amount, t.debit_count, t.credit_count,
+                    %(uid)s, NOW() AT TIME ZONE 'UTC',
+                    %(uid)s, NOW() AT TIME ZONE 'UTC'
+                FROM totals t
+                ON CONFLICT
+                    (company_id, account_id, COALESCE(partner_id, 0), currency_id)
+                DO UPDATE SET
+                    debit_amount = EXCLUDED.debit_amount,
+                    credit_amount = EXCLUDED.credit_amount,
+                    debit_count = EXCLUDED.debit_count,
+                    credit_count = EXCLUDED.credit_count,
+                    write_uid = EXCLUDED.write_uid,
+                    write_date = EXCLUDED.write_date
+                WHERE (s.debit_amount, s.credit_amount, s.debit_count, s.credit_count)
+                    IS DISTINCT FROM (
+                        EXCLUDED.debit_amount,
+                        EXCLUDED.credit_amount,
+                        EXCLUDED.debit_count,
+                        EXCLUDED.credit_count
+                    )
+                """,
+                partner_key=self._partner_key_sql(),
+                uid=self.env.uid,
+                line_condition=line_condition,
+                summary_condition=summary_condition,
+            )
+        )
+        self.invalidate_model()
+        self.env["account.account.reconcile"].invalidate_model()
+
+
+class AccountAccountReconcileSummaryQueue(models.Model):
+    """Keys of the summary rows to recompute, see _queue_lines()."""
+
+    _name = "account.account.reconcile.summary.queue"
+    _description = "Account Reconcile Open Items Summary Queue"
+    _log_access = False
+
+    account_id = fields.Many2one(
+        "account.account", required=True, readonly=True, ondelete="cascade"
+    )
+    partner_id = fields.Many2one("res.partner", readonly=True, ondelete="cascade")
@@ -2,18 +2,30 @@
 # Copyright 2025 Jacques-Etienne Baudoux (BCIM) <je@bcim.be>
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+import copy
+import time
 from collections import defaultdict
 
+import psycopg2
 from dateutil import rrule
 from dateutil.relativedelta import relativedelta
 
 from odoo import Command, _, api, fields, models, tools
-from odoo.exceptions import UserError
+from odoo.exceptions import UserError, ValidationError
 from odoo.fields import first
 from odoo.tools import LazyTranslate, float_compare, float_is_zero, groupby
 
 _lt = LazyTranslate(__name__, default_lang="en_US")
 
+# Errors of a single line that must not stop the bulk validation. Concurrency
+# errors (psycopg2.OperationalError) propagate, so the transaction is retried.
+VALIDATION_ERRORS = (
+    UserError,
+    ValidationError,
+    psycopg2.IntegrityError,
+    psycopg2.DataError,
+)
+
 
 class AccountBankStatementLine(models.Model):
     _name = "account.bank.statement.line"
@@ -240,6 +252,47 @@ class AccountBankStatementLine(models.Model):
         )
         self.can_reconcile = self.reconcile_data_info.get("can_reconcile", False)
 
+    def _add_account_move_lines(self, move_lines, keep_current=False):
+        """Add several counterpart lines at once.
+
+        Same result as calling ``_add_account_move_line`` for each line, but
+        the data is scanned and the suspense line recomputed only once.
+        """
+        new_data = []
+        pending_amount = 0.0
+        currency = self._get_reconcile_currency()
+        current_ids = set(move_lines.ids)
+        present_ids = set()
+        for line in self.reconcile_data_info["data"]:
+            line_ids = set(line.get("counterpart_line_ids", [])) & current_ids
+            if line_ids:
+                present_ids |= line_ids
+                if not keep_current:
+                    continue
+            if line["kind"] != "suspense":
+                pending_amount += self._get_amount_currency(line, currency)
+            new_data.append(line)
+        for move_line in move_lines:
+            if move_line.id in present_ids:
+                continue
+            _reconcile_auxiliary_id, lines = self._get_reconcile_line(
+                move_line,
+                "other",
+                is_counterpart=True,
+                max_amount=currency.round(pending_amount),
+                move=True,
+            )
+            pending_amount += sum(
+                self._get_amount_currency(line, currency) for line in lines
+            )
+            new_data += lines
+        self.reconcile_data_info = self._recompute_suspense_line(
+            new_data,
+            self.reconcile_data_info["reconcile_auxiliary_id"],
+            self.manual_reference,
+        )
+        self.can_reconcile = self.reconcile_data_info.get("can_reconcile", False)
+
     def _recompute_suspense_line(self, data, reconcile_auxiliary_id, manual_reference):
         can_reconcile = True
         total_amount = 0
@@ -805,48 +858,154 @@ class AccountBankStatementLine(models.Model):
         return result
 
     def _reconcile_bank_line_edit(self, data):
-        _liquidity_lines, suspense_lines, other_lines = self._seek_for_lines()
-        lines_to_remove = [
-            Command.delete(line.id) for line in suspense_lines + other_lines
+        to_reconcile = self._prepare_reconcile_bank_lines_edit({self.id: data})
+        for reconcile_items in to_reconcile:
+            reconcile_items.reconcile()
+
+    def _prepare_reconcile_bank_lines_edit(self, data_by_line):
+        """Replace the lines of the moves of several statement lines at once.
+
+        The new journal items of all the statement lines are created with a
+        single call. Return the groups of journal items to reconcile.
+        """
+        moves = self.move_id
+        vals_list = []
+        counterpart_ids_list = []
+        container = {"records": moves, "self": moves}
+        with moves._check_balanced(container):
+            for st_line in self:
+                _liquidity_lines, suspense_lines, other_lines = (
+                    st_line._seek_for_lines()
+                )
+                # Cleanup previous lines.
+                st_line.move_id.with_context(
+                    skip_account_move_synchronization=True,
+                    force_delete=True,
+                    skip_invoice_sync=True,
+                    skip_readonly_check=True,
+                ).write(
+                    {
+                        "line_ids": [
+                            Command.delete(line.id)
+                            for line in suspense_lines + other_lines
+                        ],
+                    }
+                )
+                for line_vals in data_by_line[st_line.id]:
+                    if line_vals["kind"] == "liquidity":
+                        continue
+                    vals_list.append(st_line._reconcile_move_line_vals(line_vals))
+                    counterpart_ids_list.append(line_vals.get("counterpart_line_ids"))
+            lines = (
+                self.env["account.move.line"]
+                .with_context(
+                    check_move_validity=False,
+                    skip_sync_invoice=True,
+                    skip_invoice_sync=True,
+                    validate_analytic=True,
+                )
+                .create(vals_list)
+            )
+        return [
+            self.env["account.move.line"].browse(counterpart_ids) + line
+            for counterpart_ids, line in zip(counterpart_ids_list, lines)
+            if counterpart_ids
         ]
 
-        # Cleanup previous lines.
-        move = self.move_id
-        container = {"records": move, "self": move}
+    def _validate_proposed_reconciliations(self, chunk_size=100):
+        """Reconcile all the lines whose proposed reconciliation is complete.
+
+        Lines are processed by chunks: the journal items of a chunk are
+        created and reconciled together, in a savepoint. When a chunk fails
+        with a user, validation or data error, it is rolled back and its lines
+        are processed one by one so that a single failing line does not block
+        the others. Any other error propagates. Return a summary of the
+        outcome.
+        """
+        start = time.perf_counter()
+        result = {"processed": 0, "reconciled": 0, "skipped": 0, "failed": []}
+        lines = self.filtered(lambda line: not line.is_reconciled)
+        for index in range(0, len(lines), chunk_size):
+            chunk = lines[index : index + chunk_size]
+            proposed = chunk.filtered(
+                lambda line: line.reconcile_data_info.get("can_reconcile")
+                and not line.is_reconciled
+            )
+            result["processed"] += len(chunk)
+            result["skipped"] += len(chunk - proposed)
+            if not proposed:
+                continue
+            try:
+                with self.env.cr.savepoint():
+                    proposed._validate_proposed_chunk()
+                result["reconciled"] += len(proposed)
+            except VALIDATION_ERRORS:
+                for line in proposed:
+                    try:
+                        with self.env.cr.savepoint():
+                            line._validate_proposed_chunk()
+                        result["reconciled"] += 1
+                    except VALIDATION_ERRORS as error:
+                        result["failed"].append(
+                            {
+                                "id": line.id,
+                                "name": line.display_name,
+                                "error": str(error),
+                            }
+                        )
+            self.env.invalidate_all()
+        result["duration"] = time.perf_counter() - start
+        result["lines_per_second"] = (
+            result["processed"] / result["duration"] if result["duration"] else 0.0
+        )
+        return result
+
+    def _validate_proposed_chunk(self):
         to_reconcile = []
-        with move._check_balanced(container):
-            move.with_context(
-                skip_account_move_synchronization=True,
-                force_delete=True,
-                skip_invoice_sync=True,
-                skip_readonly_check=True,
-            ).write(
+        edit_lines = self.filtered(lambda line: line.journal_id.reconcile_mode == "edit")
+        if edit_lines:
+            to_reconcile += edit_lines._prepare_reconcile_bank_lines_edit(
                 {
-                    "line_ids": lines_to_remove,
+                    line.id: line._prepare_reconcile_line_data(
+                        line.reconcile_data_info["data"]
+                    )
+                    for line in edit_lines
                 }
             )
-            for line_vals in data:
-                if line_vals["kind"] == "liquidity":
-                    continue
-                line = (
-                    self.env["account.move.line"]
-                    .with_context(
-                        check_move_validity=False,
-                        skip_sync_invoice=True,
-                        skip_invoice_sync=True,
-                        validate_analytic=True,
-                    )
-                    .create(self._reconcile_move_line_vals(line_vals))
-                )
-                if line_vals.get("counterpart_line_ids"):
-                    to_reconcile.append(
-                        self.env["account.move.line"].browse(
-                            line_vals.get("counterpart_line_ids")
-                        )
-                        + line
-                    )
-        for reconcile_items in to_reconcile:
-            reconcile_items.reconcile()
+            edit_lines.write({"reconcile_mode": "edit", "reconcile_data": False})
+        for line in self - edit_lines:
+            line.reconcile_bank_line()
+        if to_reconcile:
+            self.env["account.move.line"]._reconcile_plan(to_reconcile)
+
+    def action_validate_proposed_reconciliations(self):
+        result = self._validate_proposed_reconciliations()
+        message = _(
+            "%(reconciled)s of %(processed)s lines reconciled in %(duration).1f "
+            "seconds (%(speed).1f lines per second), %(skipped)s without a complete "
+            "proposal, %(failed)s failed.",
+            reconciled=result["reconciled"],
+            processed=result["processed"],
+            duration=result["duration"],
+            speed=result["lines_per_second"],
+            skipped=result["skipped"],
+            failed=len(result["failed"]),
+        )
+        if result["failed"]:
+            message += "\n" + "\n".join(
+                f"{failure['name']}: {failure['error']}"
+                for failure in result["failed"]
+            )
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": _("Validate proposed reconciliations"),
+                "message": message,
+                "type": "warning" if result["failed"] else "success",
+                "sticky": bool(result["failed"]),
+            },
+        }
 
     def _reconcile_bank_line_keep_move_vals(self):
         return {
@@ -1330,11 +1489,13 @@ class AccountBankStatementLine(models.Model):
         )
 
     def add_multiple_lines(self, domain):
-        res = super().add_multiple_lines(domain)
+        """Add all the lines matching the domain and return the patch to apply
+        on the reconcile data already shown by the widget."""
+        super().add_multiple_lines(domain)
+        previous_info = copy.deepcopy(self.reconcile_data_info)
         lines = self.env["account.move.line"].search(domain)
-        for line in lines:
-            self._add_account_move_line(line, keep_current=True)
-        return res
+        self._add_account_move_lines(lines, keep_current=True)
+        return self._get_reconcile_data_patch(previous_info, self.reconcile_data_info)
 
     def _retrieve_partner(self):
         if self.env.context.get("skip_retrieve_partner"):
@@ -0,0 +1,19 @@
+# Copyright 2023 Dixmit
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import models
+
+
+class AccountMove(models.Model):
+    _inherit = "account.move"
+
+    def _post(self, soft=True):
+        posted = super()._post(soft=soft)
+        self.env["account.account.reconcile.summary"]._queue_lines(posted.line_ids)
+        return posted
+
+    def button_draft(self):
+        lines = self.line_ids
+        res = super().button_draft()
+        self.env["account.account.reconcile.summary"]._queue_lines(lines)
+        return res
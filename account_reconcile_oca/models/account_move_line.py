@@ -1,13 +1,27 @@
 # Copyright 2023 Dixmit
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from odoo import _, models
+from odoo import _, api, models
 from odoo.exceptions import ValidationError
 
 
 class AccountMoveLine(models.Model):
     _inherit = "account.move.line"
 
+    @api.model
+    def _reconcile_plan(self, reconciliation_plan):
+        res = super()._reconcile_plan(reconciliation_plan)
+        lines = self.env["account.move.line"]
+        plan = list(reconciliation_plan)
+        while plan:
+            item = plan.pop()
+            if isinstance(item, models.BaseModel):
+                lines |= item
+            else:
+                plan += item
+        self.env["account.account.reconcile.summary"]._queue_lines(lines)
+        return res
+
     def action_reconcile_manually(self):
         if not self:
             return {}
@@ -0,0 +1,14 @@
+# Copyright 2023 Dixmit
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import models
+
+
+class AccountPartialReconcile(models.Model):
+    _inherit = "account.partial.reconcile"
+
+    def unlink(self):
+        lines = self.debit_move_id | self.credit_move_id
+        res = super().unlink()
+        self.env["account.account.reconcile.summary"]._queue_lines(lines)
+        return res
@@ -128,5 +128,33 @@ class AccountReconcileAbstract(models.AbstractModel):
             vals["counterpart_line_ids"] = line.ids
         return [vals]
 
+    def _get_reconcile_data_patch(self, old_info, new_info):
+        """Return the changes between two values of reconcile_data_info.
+
+        Lines are keyed by their reference, so the widget can apply the patch
+        on the data it already has instead of re-rendering the whole value.
+        """
+        old_lines = {line["reference"]: line for line in old_info.get("data", [])}
+        patch = {
+            "added": [],
+            "changed": {},
+            "removed": [],
+            "suspense": False,
+            "order": [],
+            "values": {key: value for key, value in new_info.items() if key != "data"},
+        }
+        for line in new_info.get("data", []):
+            reference = line["reference"]
+            patch["order"].append(reference)
+            old_line = old_lines.pop(reference, None)
+            if line["kind"] == "suspense":
+                patch["suspense"] = line
+            elif old_line is None:
+                patch["added"].append(line)
+            elif old_line != line:
+                patch["changed"][reference] = line
+        patch["removed"] = list(old_lines)
+        return patch
+
     def add_multiple_lines(self, domain):
         self.ensure_one()
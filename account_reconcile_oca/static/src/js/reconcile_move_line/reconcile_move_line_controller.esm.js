@@ -1,4 +1,5 @@
 import {ListController} from "@web/views/list/list_controller";
+import {applyReconcileDataPatch} from "../widgets/reconcile_data_widget.esm.js";
 
 export class ReconcileMoveLineController extends ListController {
     async openRecord(record) {
@@ -7,14 +8,23 @@ export class ReconcileMoveLineController extends ListController {
         this.props.parentRecord.update(data);
     }
     async clickAddAll() {
-        await this.props.parentRecord.save();
-        await this.model.orm.call(
-            this.props.parentRecord.resModel,
+        const parentRecord = this.props.parentRecord;
+        await parentRecord.save();
+        const patch = await this.model.orm.call(
+            parentRecord.resModel,
             "add_multiple_lines",
-            [this.props.parentRecord.resIds, this.model.root.domain]
+            [parentRecord.resIds, this.model.root.domain]
         );
-        await this.props.parentRecord.load();
-        this.props.parentRecord.model.notify();
+        if (patch && parentRecord.data.reconcile_data_info) {
+            // Only the changed lines are sent back, the rest is kept as is
+            applyReconcileDataPatch(parentRecord.data.reconcile_data_info, patch);
+            if ("can_reconcile" in parentRecord.data) {
+                parentRecord.data.can_reconcile = patch.values.can_reconcile || false;
+            }
+        } else {
+            await parentRecord.load();
+        }
+        parentRecord.model.notify();
     }
 }
 
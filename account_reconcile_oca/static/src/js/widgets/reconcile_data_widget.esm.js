@@ -9,6 +9,32 @@ import {standardFieldProps} from "@web/views/fields/standard_field_props";
 
 const {Component} = owl;
 
+/**
+ * Apply a patch returned by the server (see _get_reconcile_data_patch) on the
+ * reconcile data of a record, keeping the lines that did not change.
+ */
+export function applyReconcileDataPatch(info, patch) {
+    const lines = {};
+    for (const line of info.data || []) {
+        lines[line.reference] = line;
+    }
+    for (const reference of patch.removed) {
+        delete lines[reference];
+    }
+    for (const line of patch.added) {
+        lines[line.reference] = line;
+    }
+    for (const reference in patch.changed) {
+        lines[reference] = patch.changed[reference];
+    }
+    if (patch.suspense) {
+        lines[patch.suspense.reference] = patch.suspense;
+    }
+    info.data = patch.order.map((reference) => lines[reference]);
+    Object.assign(info, patch.values);
+    return info;
+}
+
 export class AccountReconcileDataWidget extends Component {
     static props = {
         ...standardFieldProps,
@@ -166,6 +166,69 @@ class TestReconciliationWidget(TestAccountReconciliationCommon):
         )
         self.assertFalse(reconcile_account)
 
+    def test_reconcile_summary(self):
+        """
+        Open items totals are kept up to date on reconcile and unreconcile
+        """
+        account = self.non_current_assets_account
+        reconcile_account = self.env["account.account.reconcile"].search(
+            [("account_id", "=", account.id)]
+        )
+        self.assertEqual(reconcile_account.debit_count, 1)
+        self.assertEqual(reconcile_account.debit_amount, 100)
+        self.assertEqual(reconcile_account.credit_count, 2)
+        self.assertEqual(reconcile_account.credit_amount, 100)
+        lines = (self.move_1 + self.move_2).line_ids.filtered(
+            lambda r: r.account_id == account
+        )
+        lines.reconcile()
+        reconcile_account = self.env["account.account.reconcile"].search(
+            [("account_id", "=", account.id)]
+        )
+        self.assertEqual(reconcile_account.debit_count, 1)
+        self.assertEqual(reconcile_account.debit_amount, 50)
+        self.assertEqual(reconcile_account.credit_count, 1)
+        self.assertEqual(reconcile_account.credit_amount, 50)
+        lines.remove_move_reconcile()
+        reconcile_account = self.env["account.account.reconcile"].search(
+            [("account_id", "=", account.id)]
+        )
+        self.assertEqual(reconcile_account.debit_amount, 100)
+        self.assertEqual(reconcile_account.credit_count, 2)
+        self.move_3.button_draft()
+        reconcile_account = self.env["account.account.reconcile"].search(
+            [("account_id", "=", account.id)]
+        )
+        self.assertEqual(reconcile_account.credit_count, 1)
+
+    def test_reconcile_summary_queue(self):
+        """
+        Posting queues the rows, which are recomputed in the same transaction
+        and keep their id
+        """
+        account = self.non_current_assets_account
+        reconcile_account = self.env["account.account.reconcile"].search(
+            [("account_id", "=", account.id)]
+        )
+        move = self.move_1.copy()
+        move.action_post()
+        queue = self.env["account.account.reconcile.summary.queue"].search([])
+        self.assertIn(account, queue.account_id)
+        reconcile_account.invalidate_recordset()
+        self.assertEqual(reconcile_account.debit_count, 2)
+        self.assertFalse(self.env["account.account.reconcile.summary.queue"].search([]))
+        move.button_draft()
+        self.env.cr.precommit.run()
+        self.assertFalse(self.env["account.account.reconcile.summary.queue"].search([]))
+        self.assertEqual(
+            self.env["account.account.reconcile"].search(
+                [("account_id", "=", account.id)]
+            ),
+            reconcile_account,
+        )
+        reconcile_account.invalidate_recordset()
+        self.assertEqual(reconcile_account.debit_count, 1)
+
     def test_clean_reconcile(self):
         account = self.non_current_assets_account
         reconcile_account = self.env["account.account.reconcile"].search(
@@ -183,6 +246,44 @@ class TestReconciliationWidget(TestAccountReconciliationCommon):
         reconcile_account.clean_reconcile()
         self.assertFalse(reconcile_account.reconcile_data_info.get("counterparts"))
 
+    def test_reconcile_data_info_batch(self):
+        """
+        The stored data is read and written for the whole recordset at once
+        """
+        account = self.non_current_assets_account
+        reconcile_accounts = self.env["account.account.reconcile"].search([])
+        reconcile_account = reconcile_accounts.filtered(
+            lambda r: r.account_id == account
+        )
+        line = self.move_1.line_ids.filtered(lambda r: r.account_id == account)
+        reconcile_accounts.write(
+            {"reconcile_data_info": {"data": [], "counterparts": [line.id]}}
+        )
+        data_records = self.env["account.account.reconcile.data"].search(
+            [("reconcile_id", "in", reconcile_accounts.ids)]
+        )
+        self.assertEqual(len(reconcile_accounts), len(data_records))
+        reconcile_account.clean_reconcile()
+        reconcile_accounts.invalidate_recordset(["reconcile_data_info"])
+        for record in reconcile_accounts:
+            self.assertEqual(
+                record.reconcile_data_info["counterparts"],
+                [] if record == reconcile_account else [line.id],
+            )
+        # The existing rows are updated together
+        reconcile_accounts.write(
+            {"reconcile_data_info": {"data": [], "counterparts": [line.id]}}
+        )
+        reconcile_accounts.invalidate_recordset(["reconcile_data_info"])
+        self.assertEqual(
+            self.env["account.account.reconcile.data"].search_count(
+                [("reconcile_id", "in", reconcile_accounts.ids)]
+            ),
+            len(reconcile_accounts),
+        )
+        for record in reconcile_accounts:
+            self.assertEqual(record.reconcile_data_info["counterparts"], [line.id])
+
     def test_cannot_reconcile(self):
         """
         There is not enough records to reconcile for this account
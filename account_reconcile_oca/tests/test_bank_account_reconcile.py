@@ -687,6 +687,47 @@ class TestReconciliationWidget(TestAccountReconciliationCommon):
         self.assertTrue(reconcile_move.reversal_move_ids)
         self.assertFalse(bank_stmt_line.is_reconciled)
 
+    def test_validate_proposed_reconciliations(self):
+        """
+        Lines with a complete proposal are reconciled in chunks, the others are
+        skipped
+        """
+        inv1 = self.create_invoice(currency_id=self.currency_euro_id, invoice_amount=60)
+        inv2 = self.create_invoice(currency_id=self.currency_euro_id, invoice_amount=40)
+        bank_stmt = self.acc_bank_stmt_model.create(
+            {
+                "journal_id": self.bank_journal_euro.id,
+                "date": time.strftime("%Y-07-15"),
+                "name": "test",
+            }
+        )
+        st_lines = self.acc_bank_stmt_line_model.create(
+            [
+                {
+                    "name": f"testLine{amount}",
+                    "journal_id": self.bank_journal_euro.id,
+                    "statement_id": bank_stmt.id,
+                    "amount": amount,
+                    "date": time.strftime("%Y-07-15"),
+                }
+                for amount in (60, 40, 25)
+            ]
+        )
+        for st_line, invoice in zip(st_lines, inv1 + inv2):
+            receivable = invoice.line_ids.filtered(
+                lambda line: line.account_id.account_type == "asset_receivable"
+            )
+            st_line.add_multiple_lines([("id", "=", receivable.id)])
+        result = st_lines._validate_proposed_reconciliations(chunk_size=2)
+        self.assertEqual(result["processed"], 3)
+        self.assertEqual(result["reconciled"], 2)
+        self.assertEqual(result["skipped"], 1)
+        self.assertFalse(result["failed"])
+        self.assertEqual(st_lines.mapped("is_reconciled"), [True, True, False])
+        self.assertEqual((inv1 + inv2).mapped("payment_state"), ["paid", "paid"])
+        action = st_lines.action_validate_proposed_reconciliations()
+        self.assertEqual(action["tag"], "display_notification")
+
     def test_reconcile_model_with_foreign_currency(self):
         """
         We want to test what happens when we select a reconcile model to fill a
@@ -893,6 +934,51 @@ class TestReconciliationWidget(TestAccountReconciliationCommon):
             f.manual_delete = True
             self.assertFalse(f.can_reconcile)
 
+    def test_widget_add_multiple_lines_patch(self):
+        """
+        Adding several lines at once returns only the differences with the
+        data already shown in the widget
+        """
+        inv1 = self.create_invoice(currency_id=self.currency_euro_id, invoice_amount=60)
+        inv2 = self.create_invoice(currency_id=self.currency_euro_id, invoice_amount=40)
+        bank_stmt = self.acc_bank_stmt_model.create(
+            {
+                "journal_id": self.bank_journal_euro.id,
+                "date": time.strftime("%Y-07-15"),
+                "name": "test",
+            }
+        )
+        bank_stmt_line = self.acc_bank_stmt_line_model.create(
+            {
+                "name": "testLine",
+                "journal_id": self.bank_journal_euro.id,
+                "statement_id": bank_stmt.id,
+                "amount": 100,
+                "date": time.strftime("%Y-07-15"),
+            }
+        )
+        receivables = (inv1 + inv2).line_ids.filtered(
+            lambda line: line.account_id.account_type == "asset_receivable"
+        )
+        previous_data = bank_stmt_line.reconcile_data_info["data"]
+        liquidity_reference = previous_data[0]["reference"]
+        suspense_reference = previous_data[-1]["reference"]
+        patch = bank_stmt_line.add_multiple_lines([("id", "in", receivables.ids)])
+        self.assertEqual(2, len(patch["added"]))
+        self.assertEqual(
+            {f"account.move.line;{line.id}" for line in receivables},
+            {line["reference"] for line in patch["added"]},
+        )
+        self.assertFalse(patch["changed"])
+        self.assertEqual([suspense_reference], patch["removed"])
+        self.assertFalse(patch["suspense"])
+        self.assertEqual(liquidity_reference, patch["order"][0])
+        self.assertTrue(patch["values"]["can_reconcile"])
+        self.assertTrue(bank_stmt_line.can_reconcile)
+        # Adding the same lines again does not change anything
+        patch = bank_stmt_line.add_multiple_lines([("id", "in", receivables.ids)])
+        self.assertFalse(patch["added"] or patch["changed"] or patch["removed"])
+
     def test_widget_invoice_unselect(self):
         """
         We want to test how selection and unselection of an account move lines is
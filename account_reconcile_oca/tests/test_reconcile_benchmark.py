@@ -0,0 +1,229 @@
+"""Replay benchmark of the bank statement matching.
+
+Recorded (anonymised) statement lines and open items are loaded from
+``tests/fixtures/reconcile_benchmark``. The proposals of the reconcile widget
+and the automatic reconciliation are replayed on them and the speed and
+accuracy are reported as JSON.
+
+The benchmark is not part of the standard test run, launch it with::
+
+    odoo-bin -d db -i account_reconcile_oca --test-tags reconcile_benchmark
+
+Set ``RECONCILE_BENCHMARK_OUTPUT`` to write the report to a file, and
+``RECONCILE_BENCHMARK_BASELINE`` to the report of a previous run to add the
+differences against it.
+"""
+
+import json
+import logging
+import os
+import time
+
+from odoo.tests import tagged
+from odoo.tools.misc import file_open
+
+from .test_bank_account_reconcile import TestAccountReconciliationCommon
+
+_logger = logging.getLogger(__name__)
+
+FIXTURE_PATH = "account_reconcile_oca/tests/fixtures/reconcile_benchmark"
+
+
+def _load_fixture(name):
+    with file_open(f"{FIXTURE_PATH}/{name}") as fixture:
+        return json.load(fixture)
+
+
+@tagged("post_install", "-at_install", "-standard", "reconcile_benchmark")
+class TestReconcileBenchmark(TestAccountReconciliationCommon):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        book = _load_fixture("book.json")
+        cls.statement_data = _load_fixture("statement_lines.json")["lines"]
+        cls.currencies = {
+            code: cls.env.ref(f"base.{code}") for code in ("TRY", "USD", "EUR")
+        }
+        cls.currencies["TRY"].active = True
+        cls.env["res.currency.rate"].create(
+            [
+                {
+                    "currency_id": cls.currencies["TRY"].id,
+                    "name": "2024-01-01",
+                    "rate": 35.0,
+                },
+                {
+                    "currency_id": cls.currencies["USD"].id,
+                    "name": "2024-01-01",
+                    "rate": 1.08,
+                },
+            ]
+        )
+        cls.journals = {
+            "EUR": cls.bank_journal_euro,
+            "USD": cls.bank_journal_usd,
+            "TRY": cls.env["account.journal"].create(
+                {
+                    "name": "Bank TRY",
+                    "type": "bank",
+                    "code": "BNKTR",
+                    "currency_id": cls.currencies["TRY"].id,
+                    "suspense_account_id": (
+                        cls.env.company.account_journal_suspense_account_id.id
+                    ),
+                }
+            ),
+        }
+        partners = cls.env["res.partner"].create(
+            [
+                {"name": partner["name"], "vat": partner["vat"], "is_company": True}
+                for partner in book["partners"]
+            ]
+        )
+        partner_by_name = {partner.name: partner for partner in partners}
+        moves = cls.env["account.move"].create(
+            [
+                {
+                    "move_type": move["move_type"],
+                    "partner_id": partner_by_name[move["partner"]].id,
+                    "currency_id": cls.currencies[move["currency"]].id,
+                    "invoice_date": move["date"],
+                    "date": move["date"],
+                    "payment_reference": move["payment_reference"],
+                    "invoice_line_ids": [
+                        (
+                            0,
+                            0,
+                            {
+                                "name": move["key"],
+                                "quantity": 1,
+                                "price_unit": move["amount"],
+                                "tax_ids": [(6, 0, [])],
+                            },
+                        )
+                    ],
+                }
+                for move in book["moves"]
+            ]
+        )
+        moves.action_post()
+        cls.move_by_key = {
+            move["key"]: record
+            for move, record in zip(book["moves"], moves, strict=True)
+        }
+        cls.matching_model = cls.env["account.reconcile.model"].create(
+            {
+                "name": "Benchmark invoice matching",
+                "rule_type": "invoice_matching",
+                "auto_reconcile": False,
+                "match_nature": "both",
+                "match_text_location_label": True,
+                "match_text_location_reference": True,
+                "allow_payment_tolerance": True,
+                "payment_tolerance_type": "percentage",
+                "payment_tolerance_param": 0.0,
+                "company_id": cls.company.id,
+            }
+        )
+
+    def _create_statement_lines(self):
+        # Created without the test context, so nothing is reconciled yet
+        return (
+            self.env["account.bank.statement.line"]
+            .with_context(_test_account_reconcile_oca=False)
+            .create(
+                [
+                    {
+                        "journal_id": self.journals[line["currency"]].id,
+                        "date": line["date"],
+                        "amount": line["amount"],
+                        "payment_ref": line["payment_ref"],
+                        "partner_name": line["partner_name"],
+                    }
+                    for line in self.statement_data
+                ]
+            )
+        )
+
+    def _score(self, matched_moves):
+        """Compare the matched moves of each line with the expected ones."""
+        expected_count = matched = false_matches = proposed = 0
+        for line, moves in zip(self.statement_data, matched_moves, strict=True):
+            expected = line["expected"] and self.move_by_key[line["expected"]]
+            expected_count += bool(expected)
+            if not moves:
+                continue
+            proposed += 1
+            if expected and moves == expected:
+                matched += 1
+            else:
+                false_matches += 1
+        return {
+            "match_rate": matched / expected_count if expected_count else 0.0,
+            "false_match_rate": false_matches / proposed if proposed else 0.0,
+        }
+
+    def _measure(self, function, lines):
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = self.env.cr.sql_log_count
+        start = time.perf_counter()
+        matched_moves = function(lines)
+        self.env.flush_all()
+        duration = time.perf_counter() - start
+        queries = self.env.cr.sql_log_count - queries
+        return {
+            "lines": len(lines),
+            "duration": duration,
+            "lines_per_second": len(lines) / duration if duration else 0.0,
+            "queries_per_line": queries / len(lines),
+            **self._score(matched_moves),
+        }
+
+    def _replay_proposals(self, lines):
+        matched_moves = []
+        for line in lines:
+            data = line._default_reconcile_data()
+            counterparts = self.env["account.move.line"].browse(data["counterparts"])
+            matched_moves.append(counterparts.move_id)
+        return matched_moves
+
+    def _replay_auto_reconcile(self, lines):
+        lines._auto_reconcile()
+        matched_moves = []
+        for line in lines:
+            _liquidity, _suspense, other_lines = line._seek_for_lines()
+            matched_moves.append(
+                other_lines.matched_debit_ids.debit_move_id.move_id
+                | other_lines.matched_credit_ids.credit_move_id.move_id
+            )
+        return matched_moves
+
+    def _compare_with_baseline(self, report, baseline):
+        comparison = {}
+        for phase, metrics in report.items():
+            comparison[phase] = {
+                key: value - baseline[phase][key]
+                for key, value in metrics.items()
+                if isinstance(value, int | float) and key in baseline.get(phase, {})
+            }
+        return comparison
+
+    def test_reconcile_benchmark(self):
+        lines = self._create_statement_lines()
+        report = {"widget_proposal": self._measure(self._replay_proposals, lines)}
+        self.matching_model.auto_reconcile = True
+        report["auto_reconcile"] = self._measure(self._replay_auto_reconcile, lines)
+        baseline_path = os.environ.get("RECONCILE_BENCHMARK_BASELINE")
+        if baseline_path:
+            with open(baseline_path) as baseline_file:
+                report["baseline_diff"] = self._compare_with_baseline(
+                    report, json.load(baseline_file)
+                )
+        output = json.dumps(report, indent=2)
+        output_path = os.environ.get("RECONCILE_BENCHMARK_OUTPUT")
+        if output_path:
+            with open(output_path, "w") as output_file:
+                output_file.write(output)
+        _logger.info("Reconciliation benchmark:\n%s", output)
+        self.assertTrue(report["widget_proposal"]["lines"])
@@ -1,2 +1,4 @@
 from . import account_bank_statement_line
 from . import account_journal
+from . import res_partner
+from . import res_partner_bank
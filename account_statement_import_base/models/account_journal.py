@@ -2,10 +2,17 @@
 # @author: Alexis de Lattre <alexis.delattre@akretion.com>
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
 
-from odoo import api, models
+import re
+
+from odoo import SQL, api, models
 
 from odoo.addons.base.models.res_bank import sanitize_account_number
 
+from .res_partner import SANITIZED_VAT_SQL
+
+# {(database, company id): (bank accounts version, account number index)}
+_account_number_index_cache = {}
+
 
 class AccountJournal(models.Model):
     _inherit = "account.journal"
@@ -16,19 +23,103 @@ class AccountJournal(models.Model):
         that will later be used for many statement lines (to avoid
         searching data for each statement line).
         The goal is to improve performances.
+
+        The bank accounts of the company are cached, see
+        _statement_line_import_account_number_index().
         """
         self.ensure_one()
-        speeddict = {"account_number": {}}
-        partner_banks = self.env["res.partner.bank"].search_read(
-            [("company_id", "in", (False, self.company_id.id))],
-            ["acc_number", "partner_id"],
-        )
-        for partner_bank in partner_banks:
-            speeddict["account_number"][partner_bank["acc_number"]] = {
-                "partner_id": partner_bank["partner_id"][0],
-                "partner_bank_id": partner_bank["id"],
-            }
-        return speeddict
+        return {
+            "account_number": self._statement_line_import_account_number_index(),
+            "vat": {},
+        }
+
+    def _statement_line_import_account_number_index(self):
+        """Return the bank accounts part of _statement_line_import_partner_index()
+        for all the bank accounts of the company.
+
+        It is kept in memory per company until a bank account is created,
+        modified or deleted, see res.partner.bank. The returned dict is shared
+        and must not be modified.
+        """
+        self.ensure_one()
+        version = self.env["res.partner.bank"]._get_statement_import_version()
+        if version is None:
+            # Bank accounts changed in this transaction, not cached yet
+            return self._statement_line_import_partner_index()["account_number"]
+        key = (self.env.cr.dbname, self.company_id.id)
+        cached = _account_number_index_cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        index = self._statement_line_import_partner_index()["account_number"]
+        _account_number_index_cache[key] = (version, index)
+        return index
+
+    def _statement_line_import_partner_index(self, account_numbers=None, vats=None):
+        """Return the partners matching a batch of bank account and VAT
+        numbers, keyed on their normalised value, with one query per kind of
+        identifier:
+
+        {
+            "account_number": {number: {"partner_id": ..., "partner_bank_id": ...}},
+            "vat": {vat: commercial partner id},
+        }
+
+        account_numbers=None loads all the bank accounts of the company.
+        """
+        self.ensure_one()
+        index = {"account_number": {}, "vat": {}}
+        company_domain = [("company_id", "in", (False, self.company_id.id))]
+        if account_numbers is None or account_numbers:
+            domain = company_domain
+            if account_numbers is not None:
+                domain = domain + [
+                    (
+                        "sanitized_acc_number",
+                        "in",
+                        list(
+                            {
+                                self._sanitize_bank_account_number(number)
+                                for number in account_numbers
+                            }
+                        ),
+                    )
+                ]
+            partner_banks = self.env["res.partner.bank"].search_fetch(
+                domain, ["sanitized_acc_number", "partner_id"], order="id"
+            )
+            # Prefetch the commercial partners for the importers needing them
+            partner_banks.partner_id.fetch(["commercial_partner_id"])
+            for partner_bank in partner_banks:
+                index["account_number"].setdefault(
+                    partner_bank.sanitized_acc_number,
+                    {
+                        "partner_id": partner_bank.partner_id.id,
+                        "partner_bank_id": partner_bank.id,
+                    },
+                )
+        vats = {self._sanitize_vat(vat) for vat in vats or ()} - {""}
+        if vats:
+            Partner = self.env["res.partner"]
+            query = Partner._search(company_domain + [("vat", "!=", False)])
+            # Same normalisation as _sanitize_vat(), served by the expression
+            # index of res.partner
+            query.add_where(
+                SQL(
+                    f"{SANITIZED_VAT_SQL} IN %s",
+                    SQL.identifier(Partner._table, "vat"),
+                    tuple(vats),
+                )
+            )
+            query.order = SQL.identifier(Partner._table, "id")
+            partners = Partner.browse(
+                partner_id for partner_id, in self.env.execute_query(query.select())
+            )
+            partners.fetch(["vat", "commercial_partner_id"])
+            for partner in partners:
+                index["vat"].setdefault(
+                    self._sanitize_vat(partner.vat), partner.commercial_partner_id.id
+                )
+        return index
 
     def _statement_line_import_update_hook(self, st_line_vals, speeddict):
         """This method is designed to be inherited by reconciliation modules.
@@ -65,3 +156,10 @@ class AccountJournal(models.Model):
     def _sanitize_bank_account_number(self, account_number):
         """Hook for extension"""
         return sanitize_account_number(account_number)
+
+    @api.model
+    def _sanitize_vat(self, vat):
+        """Keep the digits and letters of a VAT (or national identity) number,
+        without its country prefix."""
+        vat = re.sub(r"[^0-9A-Z]", "", (vat or "").upper())
+        return re.sub(r"^[A-Z]{2}(?=[0-9])", "", vat)
@@ -0,0 +1,27 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
+
+from odoo import models
+from odoo.tools.sql import create_index
+
+# VAT (or national identity) number column given as %s, without separators
+# nor country prefix: the normalisation of account.journal._sanitize_vat()
+SANITIZED_VAT_SQL = (
+    "regexp_replace(regexp_replace(upper(%s), '[^0-9A-Z]', '', 'g'),"
+    " '^[A-Z]{2}(?=[0-9])', '')"
+)
+
+
+class ResPartner(models.Model):
+    _inherit = "res.partner"
+
+    def init(self):
+        super().init()
+        # Serves the VAT lookup of account.journal
+        # _statement_line_import_partner_index()
+        create_index(
+            self.env.cr,
+            "res_partner_sanitized_vat_index",
+            self._table,
+            [SANITIZED_VAT_SQL % "vat"],
+            where="vat IS NOT NULL",
+        )
@@ -0,0 +1,70 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
+
+from odoo import SQL, api, models
+
+# Changed whenever the bank accounts used to find the partner of imported
+# statement lines change, see account.journal
+STATEMENT_IMPORT_VERSION_PARAM = "account_statement_import_base.partner_bank_version"
+STATEMENT_IMPORT_VERSION_SEQUENCE = "account_statement_import_base_partner_bank_seq"
+STATEMENT_IMPORT_FIELDS = {"acc_number", "partner_id", "company_id", "active"}
+
+
+class ResPartnerBank(models.Model):
+    _inherit = "res.partner.bank"
+
+    def init(self):
+        super().init()
+        self.env.cr.execute(
+            SQL(
+                "CREATE SEQUENCE IF NOT EXISTS %s",
+                SQL.identifier(STATEMENT_IMPORT_VERSION_SEQUENCE),
+            )
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partner_banks = super().create(vals_list)
+        self._bump_statement_import_version()
+        return partner_banks
+
+    def write(self, vals):
+        res = super().write(vals)
+        if STATEMENT_IMPORT_FIELDS.intersection(vals):
+            self._bump_statement_import_version()
+        return res
+
+    def unlink(self):
+        self._bump_statement_import_version()
+        return super().unlink()
+
+    @api.model
+    def _get_statement_import_version(self):
+        """Return the version of the bank accounts cached by the statement
+        imports, None when they were changed in the current transaction."""
+        if self.env.cr.precommit.data.get(STATEMENT_IMPORT_VERSION_PARAM):
+            return None
+        return self.env["ir.config_parameter"].sudo().get_param(
+            STATEMENT_IMPORT_VERSION_PARAM, ""
+        )
+
+    @api.model
+    def _bump_statement_import_version(self):
+        """Invalidate the bank accounts cached by the statement imports of all
+        the workers, once per transaction when it is committed."""
+        precommit = self.env.cr.precommit
+        if precommit.data.get(STATEMENT_IMPORT_VERSION_PARAM):
+            return
+        precommit.data[STATEMENT_IMPORT_VERSION_PARAM] = True
+        precommit.add(self._commit_statement_import_version)
+
+    @api.model
+    def _commit_statement_import_version(self):
+        # A sequence value is never given twice, even when the transaction
+        # that took it is rolled back
+        version = self.env.execute_query(
+            SQL("SELECT nextval(%s)", STATEMENT_IMPORT_VERSION_SEQUENCE)
+        )[0][0]
+        self.env["ir.config_parameter"].sudo().set_param(
+            STATEMENT_IMPORT_VERSION_PARAM, str(version)
+        )
+        self.env.flush_all()
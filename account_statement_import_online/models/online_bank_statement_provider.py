@@ -5,19 +5,43 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from decimal import Decimal
+from email.utils import parsedate_to_datetime
 from html import escape
 
 from dateutil.relativedelta import MO, relativedelta
 from pytz import timezone, utc
 
 from odoo import _, api, fields, models
+from odoo.tools import split_every
 
 from odoo.addons.base.models.res_partner import _tz_get
 
 _logger = logging.getLogger(__name__)
 
+# Number of providers fetched at the same time, 1 pulls them one by one
+PULL_WORKERS_PARAM = "account_statement_import_online.pull_workers"
+# Consecutive failed scheduled pulls after which a provider is paused
+FAILURE_THRESHOLD_PARAM = "account_statement_import_online.failure_threshold"
+# Minutes a provider is paused for
+FAILURE_COOLDOWN_PARAM = "account_statement_import_online.failure_cooldown"
+
+
+def parse_retry_after(value):
+    """Return the seconds to wait of a Retry-After header, None if invalid."""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((date - datetime.now(date.tzinfo)).total_seconds(), 0.0)
+
 
 class OnlineBankStatementProvider(models.Model):
     _name = "online.bank.statement.provider"
@@ -93,6 +117,53 @@ class OnlineBankStatementProvider(models.Model):
     certificate_public_key = fields.Text()
     certificate_private_key = fields.Text()
     certificate_chain = fields.Text()
+    last_fetch_duration = fields.Float(
+        string="Last fetch duration (s)",
+        readonly=True,
+        help="Time spent obtaining the data from the bank during the last pull.",
+    )
+    last_apply_duration = fields.Float(
+        string="Last apply duration (s)",
+        readonly=True,
+        help="Time spent writing the statements during the last pull.",
+    )
+    last_transaction_ref = fields.Char(
+        string="Last transaction",
+        readonly=True,
+        copy=False,
+        help="Import ID of the newest transaction of the scheduled pulls.",
+    )
+    last_transaction_date = fields.Datetime(
+        readonly=True,
+        copy=False,
+        help="Scheduled pulls only request the transactions from this moment,"
+        " minus the sync overlap.",
+    )
+    health_state = fields.Selection(
+        selection=[
+            ("healthy", "Healthy"),
+            ("failing", "Failing"),
+            ("paused", "Paused"),
+        ],
+        compute="_compute_health_state",
+    )
+    consecutive_failures = fields.Integer(readonly=True, copy=False)
+    last_failure_date = fields.Datetime(readonly=True, copy=False)
+    last_failure_message = fields.Text(readonly=True, copy=False)
+    paused_until = fields.Datetime(
+        readonly=True,
+        copy=False,
+        help="Scheduled pulls skip the provider until then, after too many"
+        " consecutive failures or when the bank asked to retry later.",
+    )
+    sync_overlap = fields.Integer(
+        string="Sync overlap (minutes)",
+        default=60,
+        required=True,
+        help="Transactions up to this long before the last one imported are"
+        " requested again by the scheduled pulls, for the ones the bank posts"
+        " late.",
+    )
 
     _sql_constraints = [
         (
@@ -105,6 +176,11 @@ class OnlineBankStatementProvider(models.Model):
             "CHECK(interval_number > 0)",
             "Scheduled update interval must be greater than zero!",
         ),
+        (
+            "valid_sync_overlap",
+            "CHECK(sync_overlap >= 0)",
+            "Sync overlap can not be negative!",
+        ),
     ]
 
     @api.model_create_multi
@@ -188,20 +264,41 @@ class OnlineBankStatementProvider(models.Model):
                 )[0][1],
             }
 
+    @api.depends("consecutive_failures", "paused_until")
+    def _compute_health_state(self):
+        now = fields.Datetime.now()
+        for provider in self:
+            if provider.paused_until and provider.paused_until > now:
+                provider.health_state = "paused"
+            elif provider.consecutive_failures:
+                provider.health_state = "failing"
+            else:
+                provider.health_state = "healthy"
+
     def _pull(self, date_since, date_until):
         """Pull data for all providers within requested period."""
+        workers = self._get_pull_workers()
+        concurrent = self.browse()
+        if workers > 1:
+            concurrent = self.filtered(lambda p: p._supports_concurrent_fetch())
+        if len(concurrent) < 2:
+            concurrent = self.browse()
+        debug_data = concurrent._pull_concurrent(date_since, date_until, workers)
+        return debug_data + (self - concurrent)._pull_sequential(
+            date_since, date_until
+        )
+
+    def _pull_sequential(self, date_since, date_until):
         is_scheduled = self.env.context.get("scheduled")
         debug = self.env.context.get("account_statement_online_import_debug")
         debug_data = []
         for provider in self:
-            statement_date_since = provider._get_statement_date_since(date_since)
-            while statement_date_since < date_until:
-                # Note that statement_date_until is exclusive, while date_until is
-                # inclusive. So if we have daily statements date_until might
-                # be 2020-01-31, while statement_date_until is 2020-02-01.
-                statement_date_until = (
-                    statement_date_since + provider._get_statement_date_step()
-                )
+            fetch_duration = apply_duration = 0.0
+            failure = None
+            for statement_date_since, statement_date_until in (
+                provider._get_fetch_date_ranges(date_since, date_until)
+            ):
+                start = time.perf_counter()
                 try:
                     data = provider._obtain_statement_data(
                         statement_date_since, statement_date_until
@@ -212,18 +309,303 @@ class OnlineBankStatementProvider(models.Model):
                     provider._log_provider_exception(
                         exception, statement_date_since, statement_date_until
                     )
+                    failure = exception
                     break  # Continue with next provider.
+                finally:
+                    fetch_duration += time.perf_counter() - start
+                start = time.perf_counter()
                 if debug:
                     debug_data += data
                 else:
-                    provider._create_or_update_statement(
+                    provider._apply_statement_data(
                         data, statement_date_since, statement_date_until
                     )
-                statement_date_since = statement_date_until
+                apply_duration += time.perf_counter() - start
+            provider._record_pull_durations(fetch_duration, apply_duration)
             if is_scheduled:
+                provider._record_pull_health(failure)
                 provider._schedule_next_run()
         return debug_data
 
+    def _pull_concurrent(self, date_since, date_until, workers):
+        """Fetch the providers in a thread pool, then apply their data here.
+
+        Only _fetch_statement_data runs in the threads, with the plain values
+        returned by _prepare_fetch_params, so the ORM and the cursor are only
+        used from the calling thread. Statements are written as soon as the
+        data of a provider is available.
+        """
+        if not self:
+            return []
+        is_scheduled = self.env.context.get("scheduled")
+        debug = self.env.context.get("account_statement_online_import_debug")
+        debug_data = []
+        jobs = {}
+        for provider in self:
+            date_ranges = provider._get_fetch_date_ranges(date_since, date_until)
+            failure = None
+            try:
+                params = provider._prepare_fetch_params()
+            except Exception as exception:
+                if not is_scheduled:
+                    raise
+                provider._log_provider_exception(exception, date_since, date_until)
+                params = None
+                failure = exception
+            jobs[provider] = (params, date_ranges, failure)
+        with ThreadPoolExecutor(
+            max_workers=min(workers, len(self)),
+            thread_name_prefix="online_bank_statement_pull",
+        ) as executor:
+            futures = {
+                executor.submit(
+                    self._fetch_statement_date_ranges,
+                    provider,
+                    params,
+                    date_ranges,
+                ): provider
+                for provider, (params, date_ranges, _failure) in jobs.items()
+                if params
+            }
+            # Providers without anything to fetch are only rescheduled
+            for provider in self.filtered(lambda p: not jobs[p][0]):
+                provider._record_pull_durations(0.0, 0.0)
+                if is_scheduled:
+                    provider._record_pull_health(jobs[provider][2])
+                    provider._schedule_next_run()
+            for future in as_completed(futures):
+                provider = futures[future]
+                fetched, failure, fetch_duration = future.result()
+                start = time.perf_counter()
+                for (statement_date_since, statement_date_until), raw_data in fetched:
+                    data = provider._parse_statement_data(
+                        raw_data, statement_date_since, statement_date_until
+                    )
+                    if debug:
+                        debug_data += data
+                    else:
+                        provider._apply_statement_data(
+                            data, statement_date_since, statement_date_until
+                        )
+                if failure:
+                    exception, (statement_date_since, statement_date_until) = failure
+                    if not is_scheduled:
+                        raise exception
+                    provider._log_provider_exception(
+                        exception, statement_date_since, statement_date_until
+                    )
+                provider._record_pull_durations(
+                    fetch_duration, time.perf_counter() - start
+                )
+                if is_scheduled:
+                    provider._record_pull_health(failure and failure[0])
+                    provider._schedule_next_run()
+        return debug_data
+
+    @staticmethod
+    def _fetch_statement_date_ranges(provider, params, date_ranges):
+        """Run in a worker thread: fetch the raw data of each date range.
+
+        Stops at the first failure, like the sequential pull does, and
+        returns ([(date_range, raw_data)], (exception, date_range) or None,
+        duration).
+        """
+        start = time.perf_counter()
+        fetched = []
+        failure = None
+        for date_range in date_ranges:
+            try:
+                fetched.append(
+                    (date_range, provider._fetch_statement_data(params, *date_range))
+                )
+            except Exception as exception:
+                failure = (exception, date_range)
+                break
+        return fetched, failure, time.perf_counter() - start
+
+    def _record_pull_durations(self, fetch_duration, apply_duration):
+        self.ensure_one()
+        _logger.info(
+            "Online bank statement provider %s: fetched in %.2fs, applied in %.2fs",
+            self.name,
+            fetch_duration,
+            apply_duration,
+        )
+        self.write(
+            {
+                "last_fetch_duration": fetch_duration,
+                "last_apply_duration": apply_duration,
+            }
+        )
+
+    def _record_pull_health(self, exception=None):
+        """Count the consecutive failed scheduled pulls of the provider and
+        pause it when there are too many or when the bank asked to wait."""
+        self.ensure_one()
+        if not exception:
+            if self.consecutive_failures or self.paused_until:
+                self.write({"consecutive_failures": 0, "paused_until": False})
+            return
+        now = fields.Datetime.now()
+        failures = self.consecutive_failures + 1
+        paused_until = False
+        if failures >= self._get_failure_threshold():
+            paused_until = now + relativedelta(minutes=self._get_failure_cooldown())
+        retry_after = self._get_retry_after(exception)
+        if retry_after:
+            paused_until = max(
+                paused_until or now, now + relativedelta(seconds=int(retry_after))
+            )
+        self.write(
+            {
+                "consecutive_failures": failures,
+                "last_failure_date": now,
+                "last_failure_message": str(exception) or type(exception).__name__,
+                "paused_until": paused_until,
+            }
+        )
+        if paused_until:
+            _logger.warning(
+                "Online bank statement provider %s paused until %s after %s"
+                " consecutive failures",
+                self.name,
+                paused_until,
+                failures,
+            )
+
+    @api.model
+    def _get_retry_after(self, exception):
+        """Return the seconds of the Retry-After header of the HTTP error
+        behind the exception, if any."""
+        while exception is not None:
+            response = getattr(exception, "response", None)
+            headers = getattr(response, "headers", None) or getattr(
+                exception, "headers", None
+            )
+            if headers and headers.get("Retry-After"):
+                return parse_retry_after(headers["Retry-After"])
+            exception = exception.__cause__ or exception.__context__
+        return None
+
+    @api.model
+    def _get_failure_threshold(self):
+        return int(
+            self.env["ir.config_parameter"].sudo().get_param(FAILURE_THRESHOLD_PARAM, 3)
+        )
+
+    @api.model
+    def _get_failure_cooldown(self):
+        return int(
+            self.env["ir.config_parameter"].sudo().get_param(FAILURE_COOLDOWN_PARAM, 60)
+        )
+
+    @api.model
+    def _get_pull_workers(self):
+        return int(
+            self.env["ir.config_parameter"].sudo().get_param(PULL_WORKERS_PARAM, 1)
+        )
+
+    def _get_statement_date_ranges(self, date_since, date_until):
+        """Return the [since, until) ranges of the statements to pull."""
+        self.ensure_one()
+        date_ranges = []
+        statement_date_since = self._get_statement_date_since(date_since)
+        while statement_date_since < date_until:
+            # Note that statement_date_until is exclusive, while date_until is
+            # inclusive. So if we have daily statements date_until might
+            # be 2020-01-31, while statement_date_until is 2020-02-01.
+            statement_date_until = (
+                statement_date_since + self._get_statement_date_step()
+            )
+            date_ranges.append((statement_date_since, statement_date_until))
+            statement_date_since = statement_date_until
+        return date_ranges
+
+    def _get_fetch_date_ranges(self, date_since, date_until):
+        """Return the [since, until) ranges to request for the statements.
+
+        Scheduled pulls only request what is newer than the high-water mark
+        minus the sync overlap: older statements are skipped and the range of
+        the current one starts there.
+        """
+        self.ensure_one()
+        date_ranges = self._get_statement_date_ranges(date_since, date_until)
+        if not self.env.context.get("scheduled") or not self.last_transaction_date:
+            return date_ranges
+        fetch_date_since = self.last_transaction_date - relativedelta(
+            minutes=self.sync_overlap
+        )
+        return [
+            (max(statement_date_since, fetch_date_since), statement_date_until)
+            for statement_date_since, statement_date_until in date_ranges
+            if statement_date_until > fetch_date_since
+        ]
+
+    def _apply_statement_data(self, data, date_since, date_until):
+        """Write the data fetched for [date_since, date_until) in its
+        statement, then move the high-water mark of scheduled pulls."""
+        self.ensure_one()
+        statement_date_since = self._get_statement_date_since(date_since)
+        high_water_mark = self._get_high_water_mark(data, date_until)
+        if data and self._is_partial_statement_data(date_since, statement_date_since):
+            # Only the end of the statement was requested, the start balance
+            # of the data is not the one of the statement already imported.
+            statement = self.env["account.bank.statement"].search(
+                [
+                    ("journal_id", "=", self.journal_id.id),
+                    ("name", "=", self.make_statement_name(statement_date_since)),
+                ],
+                limit=1,
+            )
+            if statement:
+                lines, statement_values = data
+                data = lines, dict(
+                    statement_values or {}, balance_start=statement.balance_start
+                )
+        statement = self._create_or_update_statement(
+            data, statement_date_since, date_until
+        )
+        if self.env.context.get("scheduled"):
+            self._set_high_water_mark(*high_water_mark)
+        return statement
+
+    def _is_partial_statement_data(self, date_since, statement_date_since):
+        """Hook for extension, return whether the data fetched from date_since
+        can leave out transactions of the statement starting at
+        statement_date_since."""
+        self.ensure_one()
+        return date_since > statement_date_since
+
+    def _get_high_water_mark(self, data, date_until):
+        """Hook for extension, return the (reference, UTC date) of the newest
+        transaction of the data before date_until, (None, None) if none."""
+        self.ensure_one()
+        reference = date = None
+        for line_values in (data and data[0]) or []:
+            line_date = self._get_line_utc_date(line_values)
+            if line_date < date_until and (date is None or line_date >= date):
+                reference, date = line_values.get("unique_import_id"), line_date
+        return reference, date
+
+    def _set_high_water_mark(self, reference, date):
+        self.ensure_one()
+        if date and (
+            not self.last_transaction_date or date >= self.last_transaction_date
+        ):
+            self.write(
+                {"last_transaction_ref": reference, "last_transaction_date": date}
+            )
+
+    @api.model
+    def _get_line_utc_date(self, line_values):
+        """Return the date of the line values as a naive UTC datetime."""
+        date = line_values["date"]
+        if not isinstance(date, datetime):
+            date = fields.Datetime.from_string(date)
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=utc)
+        return date.astimezone(utc).replace(tzinfo=None)
+
     def _log_provider_exception(
         self, exception, statement_date_since, statement_date_until
     ):
@@ -332,21 +714,15 @@ class OnlineBankStatementProvider(models.Model):
         statement_date_until,
     ):
         """Get lines from line data, but only for the right date."""
-        AccountBankStatementLine = self.env["account.bank.statement.line"]
         provider_tz = timezone(self.tz) if self.tz else utc
         journal = self.journal_id
-        speeddict = journal._statement_line_import_speeddict()
         filtered_lines = []
         lines_before_since = 0
         lines_after_until = 0
         lines_not_unique = 0
+        dated_lines = []
         for line_values in unfiltered_lines:
-            date = line_values["date"]
-            if not isinstance(date, datetime):
-                date = fields.Datetime.from_string(date)
-            if date.tzinfo is None:
-                date = date.replace(tzinfo=utc)
-            date = date.astimezone(utc).replace(tzinfo=None)
+            date = self._get_line_utc_date(line_values)
             if date < statement_date_since:
                 if "balance_start" in statement_values:
                     statement_values["balance_start"] = Decimal(
@@ -367,13 +743,24 @@ class OnlineBankStatementProvider(models.Model):
             journal._statement_line_import_update_unique_import_id(
                 line_values, self.account_number
             )
+            dated_lines.append(line_values)
+        # Resolve all import ids at once instead of one search per line
+        known_import_ids = self._get_existing_unique_import_ids(
+            {
+                line["unique_import_id"]
+                for line in dated_lines
+                if line.get("unique_import_id")
+            }
+        )
+        speeddict = journal._statement_line_import_speeddict()
+        for line_values in dated_lines:
             unique_import_id = line_values.get("unique_import_id")
             if unique_import_id:
-                if AccountBankStatementLine.sudo().search(
-                    [("unique_import_id", "=", unique_import_id)], limit=1
-                ):
+                if unique_import_id in known_import_ids:
                     lines_not_unique += 1
                     continue
+                # Also skip repeated transactions within the same data
+                known_import_ids.add(unique_import_id)
             if not line_values.get("payment_ref"):
                 line_values["payment_ref"] = line_values.get("ref")
             line_values["journal_id"] = self.journal_id.id
@@ -401,6 +788,19 @@ class OnlineBankStatementProvider(models.Model):
                 )
         return filtered_lines
 
+    @api.model
+    def _get_existing_unique_import_ids(self, unique_import_ids):
+        """Return the subset of unique_import_ids already imported."""
+        AccountBankStatementLine = self.env["account.bank.statement.line"].sudo()
+        existing = set()
+        for batch in split_every(self.env.cr.IN_MAX, unique_import_ids):
+            existing.update(
+                AccountBankStatementLine.search_fetch(
+                    [("unique_import_id", "in", batch)], ["unique_import_id"]
+                ).mapped("unique_import_id")
+            )
+        return existing
+
     def _update_statement_balances(self, statement_values):
         """Update statement balance_ start/end/end_real."""
         AccountBankStatement = self.env["account.bank.statement"]
@@ -474,9 +874,19 @@ class OnlineBankStatementProvider(models.Model):
     @api.model
     def _scheduled_pull(self):
         _logger.info(_("Scheduled pull of online bank statements..."))
-        providers = self.search(
-            [("active", "=", True), ("next_run", "<=", fields.Datetime.now())]
+        now = fields.Datetime.now()
+        providers = self.search([("active", "=", True), ("next_run", "<=", now)])
+        paused_providers = providers.filtered(
+            lambda p: p.paused_until and p.paused_until > now
         )
+        for provider in paused_providers:
+            _logger.info(
+                "Skipping online bank statement provider %s until %s: %s",
+                provider.name,
+                provider.paused_until,
+                provider.last_failure_message,
+            )
+        providers -= paused_providers
         if providers:
             _logger.info(
                 _("Pulling online bank statements of: %(provider_names)s"),
@@ -517,6 +927,36 @@ class OnlineBankStatementProvider(models.Model):
         self.ensure_one()
         return []
 
+    def _supports_concurrent_fetch(self):
+        """Hook for extension, return True when the service implements
+        _prepare_fetch_params, _fetch_statement_data and _parse_statement_data
+        so it can be fetched in a thread pool."""
+        self.ensure_one()
+        return False
+
+    def _prepare_fetch_params(self):
+        """Hook for extension, return the plain values (no records) needed by
+        _fetch_statement_data, or None when there is nothing to fetch."""
+        self.ensure_one()
+        return {"service": self.service}
+
+    def _fetch_statement_data(self, params, date_since, date_until):
+        """Hook for extension, return the raw data of the period.
+
+        Runs in a worker thread: it must only use params and must not read
+        fields of self or use self.env.
+        """
+        return []
+
+    def _parse_statement_data(self, raw_data, date_since, date_until):
+        """Hook for extension, turn the raw data of _fetch_statement_data into
+        the (lines, statement values) returned by _obtain_statement_data."""
+        self.ensure_one()
+        return raw_data
+
+    def action_resume_scheduled_pull(self):
+        self.write({"consecutive_failures": 0, "paused_until": False})
+
     def action_online_bank_statements_pull_wizard(self):
         self.ensure_one()
         WIZARD_MODEL = "online.bank.statement.pull.wizard"
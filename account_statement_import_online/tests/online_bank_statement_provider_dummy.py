@@ -21,35 +21,53 @@ class OnlineBankStatementProviderDummy(models.Model):
                 date_since,
                 date_until,
             )  # pragma: no cover
+        return self._dummy_statement_data(self.env.context, date_since, date_until)
 
-        if self.env.context.get("crash", False):
-            exception = self.env.context.get("exception", Exception("Expected"))
+    def _supports_concurrent_fetch(self):
+        return self.service == "dummy" or super()._supports_concurrent_fetch()
+
+    def _prepare_fetch_params(self):
+        params = super()._prepare_fetch_params()
+        if self.service == "dummy":
+            params["options"] = dict(self.env.context)
+        return params
+
+    def _fetch_statement_data(self, params, date_since, date_until):
+        if params["service"] != "dummy":
+            return super()._fetch_statement_data(
+                params, date_since, date_until
+            )  # pragma: no cover
+        return self._dummy_statement_data(params["options"], date_since, date_until)
+
+    def _dummy_statement_data(self, options, date_since, date_until):
+        """Generate the statement data from the options, which are the
+        context for a sequential pull."""
+        if options.get("crash", False):
+            exception = options.get("exception", Exception("Expected"))
             raise exception
 
-        line_step_options = self.env.context.get("step", {"minutes": 5})
+        line_step_options = options.get("step", {"minutes": 5})
         line_step = relativedelta(**line_step_options)
-        expand_by = self.env.context.get("expand_by", 0)
+        expand_by = options.get("expand_by", 0)
         # Override date_since and date_until from context.
-        override_date_since = self.env.context.get("override_date_since", date_since)
-        override_date_until = self.env.context.get("override_date_until", date_until)
+        override_date_since = options.get("override_date_since", date_since)
+        override_date_until = options.get("override_date_until", date_until)
         override_date_since -= expand_by * line_step
         override_date_until += expand_by * line_step
 
-        balance_start = self.env.context.get(
-            "balance_start", randrange(-10000, 10000, 1) * 0.1
-        )
+        balance_start = options.get("balance_start", randrange(-10000, 10000, 1) * 0.1)
         balance = balance_start
 
-        tz = self.env.context.get("tz")
+        tz = options.get("tz")
         if tz:
             tz = timezone(tz)
 
-        timestamp_mode = self.env.context.get("timestamp_mode")
+        timestamp_mode = options.get("timestamp_mode")
 
         lines = []
         date = override_date_since
         while date < override_date_until:
-            amount = self.env.context.get("amount", randrange(-100, 100, 1) * 0.1)
+            amount = options.get("amount", randrange(-100, 100, 1) * 0.1)
             transaction_date = date.replace(tzinfo=tz)
             if timestamp_mode == "date":
                 transaction_date = transaction_date.date()
@@ -71,7 +89,7 @@ class OnlineBankStatementProviderDummy(models.Model):
             date += line_step
         balance_end = balance
         statement = {}
-        if self.env.context.get("balance", True):
+        if options.get("balance", True):
             statement.update(
                 {"balance_start": balance_start, "balance_end_real": balance_end}
             )
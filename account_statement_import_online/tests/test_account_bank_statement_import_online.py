@@ -93,6 +93,49 @@ class TestAccountBankAccountStatementImportOnline(common.TransactionCase):
         self.provider.with_context(step={"hours": 8})._scheduled_pull()
         self._getExpectedStatements(1)
 
+    def test_pull_high_water_mark(self):
+        scheduled_provider = self.provider.with_context(
+            scheduled=True, step={"hours": 8}
+        )
+        scheduled_provider._pull(datetime(2024, 5, 1), datetime(2024, 5, 3))
+        last_date = datetime(2024, 5, 2, 16)
+        self.assertEqual(self.provider.last_transaction_date, last_date)
+        self.assertEqual(
+            self.provider.last_transaction_ref,
+            str(int((last_date - datetime(1970, 1, 1)).total_seconds())),
+        )
+        statement = self.AccountBankStatement.search(
+            [("name", "=", "BANK/2024-05-02")]
+        )
+        balance_start = statement.balance_start
+        late_line = dict(
+            self._get_statement_line_data(datetime(2024, 5, 2, 20))[0][0],
+            unique_import_id="late",
+        )
+        with mock.patch(mock_obtain_statement_data) as mock_data:
+            mock_data.side_effect = [
+                ([late_line], {"balance_start": 12345.0}),
+                ([], {}),
+            ]
+            scheduled_provider._pull(datetime(2024, 5, 1), datetime(2024, 5, 4))
+        # Only the transactions from the last one minus the overlap are
+        # requested, and the start balance of the statement is kept.
+        self.assertEqual(
+            [call.args for call in mock_data.call_args_list],
+            [
+                (datetime(2024, 5, 2, 15), datetime(2024, 5, 3)),
+                (datetime(2024, 5, 3), datetime(2024, 5, 4)),
+            ],
+        )
+        self.assertEqual(len(statement.line_ids), 4)
+        self.assertEqual(statement.balance_start, balance_start)
+        self.assertEqual(self.provider.last_transaction_ref, "late")
+        # Manual pulls still request the whole period
+        with mock.patch(mock_obtain_statement_data) as mock_data:
+            mock_data.return_value = ([], {})
+            self.provider._pull(datetime(2024, 5, 2), datetime(2024, 5, 3))
+        mock_data.assert_called_once_with(datetime(2024, 5, 2), datetime(2024, 5, 3))
+
     def test_pull_skip_duplicates_by_unique_import_id(self):
         self.provider.statement_creation_mode = "weekly"
         # Get for two weeks of data.
@@ -128,6 +171,39 @@ class TestAccountBankAccountStatementImportOnline(common.TransactionCase):
         )
         self._getExpectedLines(expected_count)
 
+    def test_pull_skip_duplicates_within_data(self):
+        lines, values = self._get_statement_line_data(date(2021, 8, 10))
+        with mock.patch(mock_obtain_statement_data) as mock_data:
+            mock_data.side_effect = [(lines + [dict(lines[0])], values)]
+            self.provider._pull(datetime(2021, 8, 10), datetime(2021, 8, 11))
+        self._getExpectedLines(1)
+
+    def test_pull_partner_bank_cache(self):
+        speeddict = self.journal._statement_line_import_speeddict()
+        self.assertNotIn("XX00000000000000", speeddict["account_number"])
+        partner = self.env["res.partner"].create({"name": "John Doe"})
+        partner_bank = self.env["res.partner.bank"].create(
+            {"acc_number": "XX00 0000 0000 0000", "partner_id": partner.id}
+        )
+        # Not cached before the version is bumped, when committing
+        speeddict = self.journal._statement_line_import_speeddict()
+        self.assertEqual(
+            speeddict["account_number"]["XX00000000000000"]["partner_bank_id"],
+            partner_bank.id,
+        )
+        self.env.cr.flush()
+        self.journal._statement_line_import_speeddict()
+        with self.assertQueryCount(0):
+            self.journal._statement_line_import_speeddict()
+        with mock.patch(mock_obtain_statement_data) as mock_data:
+            mock_data.return_value = self._get_statement_line_data(date(2021, 8, 10))
+            self.provider._pull(datetime(2021, 8, 10), datetime(2021, 8, 11))
+        self.assertEqual(self._getExpectedLines(1).partner_id, partner)
+        partner_bank.unlink()
+        self.env.cr.flush()
+        speeddict = self.journal._statement_line_import_speeddict()
+        self.assertNotIn("XX00000000000000", speeddict["account_number"])
+
     def test_interval_type_minutes(self):
         self.provider.interval_type = "minutes"
         self.provider._compute_update_schedule()
@@ -156,6 +232,51 @@ class TestAccountBankAccountStatementImportOnline(common.TransactionCase):
             )
         self._getExpectedStatements(0)
 
+    def test_pull_circuit_breaker(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "account_statement_import_online.failure_threshold", 2
+        )
+        scheduled_provider = self.provider.with_context(crash=True, scheduled=True)
+        with mute_logger(
+            "odoo.addons.account_statement_import_online.models"
+            ".online_bank_statement_provider"
+        ):
+            scheduled_provider._pull(self.now - relativedelta(hours=1), self.now)
+            self.assertEqual(self.provider.health_state, "failing")
+            scheduled_provider._pull(self.now - relativedelta(hours=1), self.now)
+        self.assertEqual(self.provider.health_state, "paused")
+        self.assertEqual(self.provider.consecutive_failures, 2)
+        self.assertEqual(self.provider.last_failure_message, "Expected")
+        # Paused providers are skipped by the cron
+        self.provider.next_run = self.now - relativedelta(hours=1)
+        with mock.patch.object(
+            type(self.provider), "_pull", autospec=True
+        ) as mock_pull:
+            self.OnlineBankStatementProvider._scheduled_pull()
+        self.assertNotIn(
+            self.provider, [call.args[0] for call in mock_pull.call_args_list]
+        )
+        self.provider.action_resume_scheduled_pull()
+        self.assertEqual(self.provider.health_state, "healthy")
+
+    def test_pull_retry_after(self):
+        error = HTTPError(
+            "https://bank", 429, "Too Many Requests", {"Retry-After": "7200"}, None
+        )
+        with mute_logger(
+            "odoo.addons.account_statement_import_online.models"
+            ".online_bank_statement_provider"
+        ):
+            self.provider.with_context(
+                crash=True, exception=error, scheduled=True
+            )._pull(self.now - relativedelta(hours=1), self.now)
+        # Paused as asked by the bank, before reaching the failure threshold
+        self.assertEqual(self.provider.consecutive_failures, 1)
+        self.assertEqual(self.provider.health_state, "paused")
+        self.assertGreater(
+            self.provider.paused_until, self.now + relativedelta(hours=1)
+        )
+
     def test_pull_crash(self):
         self.provider.statement_creation_mode = "weekly"
         with self.assertRaisesRegex(Exception, "Expected"):
@@ -164,6 +285,64 @@ class TestAccountBankAccountStatementImportOnline(common.TransactionCase):
                 self.now,
             )
 
+    def _create_other_provider(self):
+        journal = self.AccountJournal.create(
+            {
+                "name": "Other Bank",
+                "type": "bank",
+                "code": "OBANK",
+                "bank_statements_source": "online",
+            }
+        )
+        return journal, self.OnlineBankStatementProvider.create(
+            {
+                "name": "Other Dummy Provider",
+                "service": "dummy",
+                "journal_id": journal.id,
+                "statement_creation_mode": "daily",
+            }
+        )
+
+    def test_pull_concurrent(self):
+        other_journal, other_provider = self._create_other_provider()
+        self.env["ir.config_parameter"].sudo().set_param(
+            "account_statement_import_online.pull_workers", 2
+        )
+        providers = self.provider | other_provider
+        with mock.patch.object(
+            type(self.provider),
+            "_pull_sequential",
+            autospec=True,
+            return_value=[],
+        ) as pull_sequential:
+            providers.with_context(step={"hours": 2})._pull(
+                self.now - relativedelta(days=1),
+                self.now,
+            )
+        pull_sequential.assert_called_once()
+        self.assertFalse(pull_sequential.call_args.args[0])
+        self._getExpectedStatements(2)
+        self.assertEqual(
+            self.AccountBankStatement.search_count(
+                [("journal_id", "=", other_journal.id)]
+            ),
+            2,
+        )
+        self.assertTrue(self.provider.last_fetch_duration)
+        self.assertTrue(other_provider.last_apply_duration)
+
+    def test_pull_concurrent_crash(self):
+        _other_journal, other_provider = self._create_other_provider()
+        self.env["ir.config_parameter"].sudo().set_param(
+            "account_statement_import_online.pull_workers", 2
+        )
+        providers = self.provider | other_provider
+        with self.assertRaisesRegex(Exception, "Expected"):
+            providers.with_context(crash=True)._pull(
+                self.now - relativedelta(hours=1),
+                self.now,
+            )
+
     def test_pull_httperror(self):
         self.provider.statement_creation_mode = "weekly"
         with self.assertRaises(HTTPError):
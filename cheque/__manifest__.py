@@ -28,9 +28,14 @@
         'wizards/cheque_bulk_state_update_view.xml',
         'wizards/cheque_deposit_wizard.xml',
         'wizards/cheque_transfer_wizard.xml',
+        'wizards/cheque_intake_wizard.xml',
         'views/account_payment_view.xml',
         'views/account_journal_view.xml',
+        'views/res_partner_view.xml',
         'views/cheque_view.xml',
+        'views/account_cheque_audit_view.xml',
+        'views/account_cheque_maturity_view.xml',
+        'views/account_cheque_transition_stat_view.xml',
         'wizards/account_payment_register_views.xml',
         'reports/payment_receipt_with_cheques.xml',
     ],
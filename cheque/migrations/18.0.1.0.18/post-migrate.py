@@ -2,6 +2,14 @@
 
 Merges migrations 1.0.5 through 1.0.18 into a single file.
 Each step runs in strict order — same result as running them separately.
+
+The migration only schedules the steps for databases coming from an older
+version: the cheque migration cron applies them after the upgrade, one step
+after the other and one chunk of cheques per run, see
+cheque.migration.state. The data is only fixed once the cron is done.
+Run them without applying anything with::
+
+    env['cheque.migration.state'].action_dry_run()
 """
 import logging
 
@@ -11,7 +19,7 @@ _logger = logging.getLogger(__name__)
 # ═══════════════════════════════════════════════════════════════════════════════
 # Step 1 — originally 18.0.1.0.5
 # ═══════════════════════════════════════════════════════════════════════════════
-def _migrate_1_0_5(env):
+def _migrate_1_0_5(env, scope):
     """Fix cheques reconciled via bank reconciliation that still show state='deposit'.
 
     For each deposited cheque whose outstanding_line_id is already fully reconciled
@@ -22,7 +30,7 @@ def _migrate_1_0_5(env):
     """
     from odoo import fields
 
-    cheques = env['account.cheque'].search([
+    cheques = env['account.cheque'].search(scope + [
         ('state', '=', 'deposit'),
         ('outstanding_line_id', '!=', False),
         ('outstanding_line_id.reconciled', '=', True),
@@ -89,7 +97,7 @@ def _migrate_1_0_5(env):
 # ═══════════════════════════════════════════════════════════════════════════════
 # Step 2 — originally 18.0.1.0.6
 # ═══════════════════════════════════════════════════════════════════════════════
-def _migrate_1_0_6(env):
+def _migrate_1_0_6(env, scope):
     """Fix stale outstanding_line_id from legacy deposits (pre-collection_line_id era).
 
     Follows the partial reconcile to find the correct collection line from the
@@ -98,7 +106,7 @@ def _migrate_1_0_6(env):
     """
     from odoo import fields
 
-    cheques = env['account.cheque'].search([
+    cheques = env['account.cheque'].search(scope + [
         ('state', '=', 'deposit'),
         ('outstanding_line_id', '!=', False),
         ('outstanding_line_id.reconciled', '=', True),
@@ -206,13 +214,13 @@ def _migrate_1_0_6(env):
 # ═══════════════════════════════════════════════════════════════════════════════
 # Step 3 — originally 18.0.1.0.8
 # ═══════════════════════════════════════════════════════════════════════════════
-def _migrate_1_0_8(env):
+def _migrate_1_0_8(env, scope):
     """Fix deposited cheques with NULL outstanding_line_id.
 
     Locates the deposit JE via deposit_journal_id + ref pattern and sets
     outstanding_line_id to the collection account line.
     """
-    cheques = env['account.cheque'].search([
+    cheques = env['account.cheque'].search(scope + [
         ('state', '=', 'deposit'),
         ('outstanding_line_id', '=', False),
     ])
@@ -304,14 +312,14 @@ def _migrate_1_0_8(env):
 # ═══════════════════════════════════════════════════════════════════════════════
 # Step 4 — originally 18.0.1.0.9
 # ═══════════════════════════════════════════════════════════════════════════════
-def _migrate_1_0_9(env):
+def _migrate_1_0_9(env, scope):
     """Fix cashed cheques whose outstanding_line_id points to EXCH entries.
 
     Locate the real deposit JE via journal + ref pattern, find the collection
     line, follow its full_reconcile_id to the real bank line (asset_cash), and
     update outstanding_line_id.
     """
-    all_cashed = env['account.cheque'].search([
+    all_cashed = env['account.cheque'].search(scope + [
         ('state', '=', 'cashed'),
         ('outstanding_line_id', '!=', False),
     ])
@@ -446,7 +454,7 @@ def _migrate_1_0_9(env):
 # ═══════════════════════════════════════════════════════════════════════════════
 # Step 5 — originally 18.0.1.0.10
 # ═══════════════════════════════════════════════════════════════════════════════
-def _migrate_1_0_10(env):
+def _migrate_1_0_10(env, scope):
     """Fix broken cashed cheques with wrong outstanding_line_id.
 
     Cases:
@@ -455,7 +463,7 @@ def _migrate_1_0_10(env):
            BUT first check if a bank statement line exists for this cheque
       C) outstanding_line_id on 101010                  → revert state to 'paid'/'deposit'
     """
-    cashed = env['account.cheque'].search([
+    cashed = env['account.cheque'].search(scope + [
         ('state', '=', 'cashed'),
         ('outstanding_line_id', '!=', False),
     ])
@@ -572,13 +580,13 @@ def _migrate_1_0_10(env):
 # ═══════════════════════════════════════════════════════════════════════════════
 # Step 6 — originally 18.0.1.0.11
 # ═══════════════════════════════════════════════════════════════════════════════
-def _migrate_1_0_11(env):
+def _migrate_1_0_11(env, scope):
     """Fix deposited cheques whose outstanding_line_id points to an EXCH move.
 
     Also picks up deposited cheques with NULL outstanding_line_id.
     Locates the real deposit JE, finds the collection line, and sets outstanding_line_id.
     """
-    deposited = env['account.cheque'].search([
+    deposited = env['account.cheque'].search(scope + [
         ('state', '=', 'deposit'),
         ('outstanding_line_id', '!=', False),
     ])
@@ -587,7 +595,7 @@ def _migrate_1_0_11(env):
         lambda c: (c.outstanding_line_id.move_id.name or '').startswith('EXCH/')
     )
 
-    null_outstanding = env['account.cheque'].search([
+    null_outstanding = env['account.cheque'].search(scope + [
         ('state', '=', 'deposit'),
         ('outstanding_line_id', '=', False),
     ])
@@ -683,14 +691,14 @@ def _migrate_1_0_11(env):
 # ═══════════════════════════════════════════════════════════════════════════════
 # Step 7 — originally 18.0.1.0.12
 # ═══════════════════════════════════════════════════════════════════════════════
-def _migrate_1_0_12(env):
+def _migrate_1_0_12(env, scope):
     """Fix remaining deposited cheques that were cashed via bank reconciliation.
 
     Searches account.bank.statement.line by payment_ref matching the cheque
     number (without leading zeros). If a BSL confirms the cheque was cleared,
     updates state → 'cashed' with the bank line from the BSL move.
     """
-    deposited = env['account.cheque'].search([('state', '=', 'deposit')])
+    deposited = env['account.cheque'].search(scope + [('state', '=', 'deposit')])
     if not deposited:
         _logger.info("Migration 18.0.1.0.12: no deposited cheques found.")
         return
@@ -760,14 +768,14 @@ def _migrate_1_0_12(env):
 # ═══════════════════════════════════════════════════════════════════════════════
 # Step 8 — originally 18.0.1.0.13
 # ═══════════════════════════════════════════════════════════════════════════════
-def _migrate_1_0_13(env):
+def _migrate_1_0_13(env, scope):
     """Fix outstanding_line_id on existing voided cheques.
 
     Two-path strategy:
     - Path A: outstanding_line_id exists and is reconciled → navigate via full_reconcile_id
     - Path B: outstanding_line_id is False or unreconciled → search void move by ref
     """
-    voided = env['account.cheque'].search([('state', '=', 'voided')])
+    voided = env['account.cheque'].search(scope + [('state', '=', 'voided')])
     if not voided:
         _logger.info("Migration 18.0.1.0.13: no voided cheques found.")
         return
@@ -850,7 +858,7 @@ def _migrate_1_0_13(env):
 # ═══════════════════════════════════════════════════════════════════════════════
 # Step 9 — originally 18.0.1.0.14
 # ═══════════════════════════════════════════════════════════════════════════════
-def _migrate_1_0_14(env):
+def _migrate_1_0_14(env, scope):
     """Fix deposited cheques with outstanding_line_id = False (Group B).
 
     For each cheque, follows the reconciliation chain to determine correct state:
@@ -859,7 +867,7 @@ def _migrate_1_0_14(env):
     """
     from odoo import fields
 
-    cheques = env['account.cheque'].search([
+    cheques = env['account.cheque'].search(scope + [
         ('state', '=', 'deposit'),
         ('outstanding_line_id', '=', False),
     ])
@@ -972,7 +980,7 @@ def _migrate_1_0_14(env):
 # ═══════════════════════════════════════════════════════════════════════════════
 # Step 10 — originally 18.0.1.0.15
 # ═══════════════════════════════════════════════════════════════════════════════
-def _migrate_1_0_15(env):
+def _migrate_1_0_15(env, scope):
     """Fix deposited cheques with NULL outstanding_line_id — warranty state.
 
     Identifies the correct path:
@@ -982,7 +990,7 @@ def _migrate_1_0_15(env):
     """
     from odoo import fields
 
-    cheques = env['account.cheque'].search([
+    cheques = env['account.cheque'].search(scope + [
         ('state', '=', 'deposit'),
         ('outstanding_line_id', '=', False),
     ])
@@ -1117,7 +1125,7 @@ def _migrate_1_0_15(env):
 # ═══════════════════════════════════════════════════════════════════════════════
 # Step 11 — originally 18.0.1.0.16
 # ═══════════════════════════════════════════════════════════════════════════════
-def _migrate_1_0_16(env):
+def _migrate_1_0_16(env, scope):
     """Fix deposited cheques whose outstanding_line_id points to an EXCH move (Group A).
 
     Traces the reconciliation chain from the real collection line in the deposit
@@ -1125,7 +1133,7 @@ def _migrate_1_0_16(env):
     """
     from odoo import fields
 
-    deposited = env['account.cheque'].search([
+    deposited = env['account.cheque'].search(scope + [
         ('state', '=', 'deposit'),
         ('outstanding_line_id', '!=', False),
     ])
@@ -1241,14 +1249,14 @@ def _migrate_1_0_16(env):
 # ═══════════════════════════════════════════════════════════════════════════════
 # Step 12 — originally 18.0.1.0.17
 # ═══════════════════════════════════════════════════════════════════════════════
-def _migrate_1_0_17(env):
+def _migrate_1_0_17(env, scope):
     """Fix deposited cheques with EXCH outstanding_line_id skipped by mig16.
 
     These are warranty cases: deposit JE debited 126000 (warranty) / credited
     101010 (outstanding). Apply WARRANTY path — set state to 'warranty', point
     outstanding_line_id to the 126000 line, and rename the deposit JE ref.
     """
-    deposited = env['account.cheque'].search([
+    deposited = env['account.cheque'].search(scope + [
         ('state', '=', 'deposit'),
         ('outstanding_line_id', '!=', False),
     ])
@@ -1336,7 +1344,7 @@ def _migrate_1_0_17(env):
 # ═══════════════════════════════════════════════════════════════════════════════
 # Step 13 — originally 18.0.1.0.18
 # ═══════════════════════════════════════════════════════════════════════════════
-def _migrate_1_0_18(env):
+def _migrate_1_0_18(env, scope):
     """Fix deposited cheques whose outstanding_line_id points to the reconciled credit line.
 
     For each affected cheque:
@@ -1344,7 +1352,7 @@ def _migrate_1_0_18(env):
       - Pick the unreconciled debit line on that move
       - Update outstanding_line_id
     """
-    broken = env['account.cheque'].search([
+    broken = env['account.cheque'].search(scope + [
         ('state', '=', 'deposit'),
         ('outstanding_line_id', '!=', False),
         ('outstanding_line_id.reconciled', '=', True),
@@ -1397,27 +1405,30 @@ def _migrate_1_0_18(env):
 # ═══════════════════════════════════════════════════════════════════════════════
 # Main entry point
 # ═══════════════════════════════════════════════════════════════════════════════
+# Steps in execution order. Each step only looks at the cheques matching the
+# ``scope`` domain it receives, so the runner can process them chunk by chunk.
+STEPS = [
+    _migrate_1_0_5,
+    _migrate_1_0_6,
+    _migrate_1_0_8,
+    _migrate_1_0_9,
+    _migrate_1_0_10,
+    _migrate_1_0_11,
+    _migrate_1_0_12,
+    _migrate_1_0_13,
+    _migrate_1_0_14,
+    _migrate_1_0_15,
+    _migrate_1_0_16,
+    _migrate_1_0_17,
+    _migrate_1_0_18,
+]
+
+
 def migrate(cr, version):
     from odoo import api, SUPERUSER_ID
+    from odoo.tools import parse_version
 
+    if not version or parse_version(version) >= parse_version('18.0.1.0.18'):
+        return
     env = api.Environment(cr, SUPERUSER_ID, {})
-
-    steps = [
-        _migrate_1_0_5,
-        _migrate_1_0_6,
-        _migrate_1_0_8,
-        _migrate_1_0_9,
-        _migrate_1_0_10,
-        _migrate_1_0_11,
-        _migrate_1_0_12,
-        _migrate_1_0_13,
-        _migrate_1_0_14,
-        _migrate_1_0_15,
-        _migrate_1_0_16,
-        _migrate_1_0_17,
-        _migrate_1_0_18,
-    ]
-    for step in steps:
-        _logger.info("Running %s...", step.__name__)
-        step(env)
-        env.invalidate_all()  # clear ORM cache between steps
+    env['cheque.migration.state']._schedule_steps()
@@ -6,3 +6,10 @@ from . import account_move
 from . import account_move_line
 from . import account_journal
 from . import cheque_state_option
+from . import account_cheque_audit
+from . import account_partial_reconcile
+from . import account_cheque_maturity
+from . import account_cheque_transition_stat
+from . import cheque_migration_state
+from . import account_cheque_partner_exposure
+from . import res_partner
@@ -8,8 +8,14 @@ from odoo import models, fields, api, Command, _
 _logger = logging.getLogger(__name__)
 from odoo.exceptions import UserError, ValidationError
 from odoo.tools import index_exists
+from .account_cheque_transition_stat import track_transition
 from .mixins import ChequeIssuerMixin
 
+# Fields grouped by the cheque maturity summary
+MATURITY_FIELDS = {'state', 'amount', 'payment_date', 'bank_id', 'payment_id'}
+# Fields grouped by the partner open cheque exposure
+EXPOSURE_FIELDS = {'state', 'amount', 'payment_date', 'payment_id', 'outstanding_line_id'}
+
 
 class AccountPaymentCheque(ChequeIssuerMixin, models.Model):
     _name = 'account.cheque'
@@ -48,6 +54,8 @@ class AccountPaymentCheque(ChequeIssuerMixin, models.Model):
         string='Issuer VAT',
         compute='_compute_issuer_vat', store=True, readonly=False,
     )
+    bank_branch = fields.Char(string='Branch')
+    bank_account_number = fields.Char(string='Bank Account Number')
     payment_date = fields.Date(readonly=False, required=True)
     amount = fields.Monetary()
     outstanding_line_id = fields.Many2one('account.move.line', readonly=True, check_company=True)
@@ -113,6 +121,66 @@ class AccountPaymentCheque(ChequeIssuerMixin, models.Model):
                     ON account_cheque(name, payment_method_line_id)
                 WHERE outstanding_line_id IS NOT NULL
             """)
+        if not index_exists(self.env.cr, 'account_cheque_company_state_type_date_idx'):
+            # Supports the portfolio searches of the bulk state wizard
+            self.env.cr.execute("""
+                CREATE INDEX account_cheque_company_state_type_date_idx
+                    ON account_cheque(company_id, state, payment_type, payment_date)
+            """)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        cheques = super().create(vals_list)
+        maturity = self.env['account.cheque.maturity']
+        maturity._refresh_keys(maturity._get_keys(cheques))
+        exposure = self.env['account.cheque.partner.exposure']
+        exposure._refresh_partners(exposure._get_partners(cheques))
+        return cheques
+
+    def write(self, vals):
+        if self.env.context.get('cheque_skip_refresh'):
+            # The caller refreshes once for all its writes, see _write_transition()
+            return super().write(vals)
+        maturity = self.env['account.cheque.maturity']
+        refresh_maturity = not MATURITY_FIELDS.isdisjoint(vals)
+        maturity_keys = maturity._get_keys(self) if refresh_maturity else set()
+        exposure = self.env['account.cheque.partner.exposure']
+        refresh_exposure = not EXPOSURE_FIELDS.isdisjoint(vals)
+        exposure_partners = exposure._get_partners(self) if refresh_exposure else self.env['res.partner']
+        res = super().write(vals)
+        if refresh_maturity:
+            maturity._refresh_keys(maturity_keys | maturity._get_keys(self))
+        if refresh_exposure:
+            exposure._refresh_partners(exposure_partners | exposure._get_partners(self))
+        if 'state' in vals or 'outstanding_line_id' in vals:
+            self.env['mis.cash_flow']._schedule_refresh()
+        return res
+
+    def _write_transition(self, vals, outstanding_lines):
+        """Write vals on all cheques in self and the outstanding line of each
+        cheque, given as dict cheque id -> line, then refresh the maturity,
+        exposure and cash flow reports once for all of them.
+        """
+        maturity = self.env['account.cheque.maturity']
+        exposure = self.env['account.cheque.partner.exposure']
+        cheques = self.with_context(cheque_skip_refresh=True)
+        cheques.write(vals)
+        for cheque in cheques:
+            if cheque.id in outstanding_lines:
+                cheque.outstanding_line_id = outstanding_lines[cheque.id]
+        maturity._refresh_keys(maturity._get_keys(self))
+        exposure._refresh_partners(exposure._get_partners(self))
+        self.env['mis.cash_flow']._schedule_refresh()
+
+    def unlink(self):
+        maturity = self.env['account.cheque.maturity']
+        maturity_keys = maturity._get_keys(self)
+        exposure = self.env['account.cheque.partner.exposure']
+        exposure_partners = exposure._get_partners(self)
+        res = super().unlink()
+        maturity._refresh_keys(maturity_keys)
+        exposure._refresh_partners(exposure_partners)
+        return res
 
 
     def _get_move_amounts(self):
@@ -143,8 +211,36 @@ class AccountPaymentCheque(ChequeIssuerMixin, models.Model):
             'amount_currency': sign * payment_amount,
             'currency_id': currency_id,
             'date_maturity': self.payment_date,
+            'transition_cheque_id': self.id,
         }
 
+    def _check_transition_reconcile_line(self, reconcile_line):
+        """Raise if reconcile_line cannot be closed by a new transition move."""
+        if not reconcile_line:
+            return
+        if reconcile_line.reconciled:
+            raise UserError(_(
+                'Cannot process cheque "%s": the linked accounting line '
+                '(ID: %s, account: %s) is already fully reconciled.\n'
+                'Possible causes:\n'
+                '- This line was reconciled via Odoo\'s bank reconciliation '
+                '(cheque state should have updated automatically).\n'
+                '- The outstanding_line_id was not updated correctly after a '
+                'previous operation (legacy data issue).\n'
+                'Please verify the accounting entries for this cheque.'
+            ) % (self.name, reconcile_line.id, reconcile_line.account_id.display_name))
+        if reconcile_line.move_id.state != 'posted':
+            raise UserError(_(
+                'Cannot process cheque "%s": the linked journal entry (ID: %s, ref: "%s") '
+                'is not posted (current state: "%s"). '
+                'Please re-post that journal entry before continuing.'
+            ) % (
+                self.name,
+                reconcile_line.move_id.id,
+                reconcile_line.move_id.ref or reconcile_line.move_id.name,
+                reconcile_line.move_id.state,
+            ))
+
     def _create_transition_move(self, debit_account, credit_account, journal_id, date, label, reconcile_line=None):
         """Create, post, and optionally reconcile a two-line cheque lifecycle journal entry.
 
@@ -159,17 +255,7 @@ class AccountPaymentCheque(ChequeIssuerMixin, models.Model):
         :param reconcile_line: account.move.line to reconcile with (optional)
         :return: posted account.move
         """
-        if reconcile_line and reconcile_line.reconciled:
-            raise UserError(_(
-                'Cannot process cheque "%s": the linked accounting line '
-                '(ID: %s, account: %s) is already fully reconciled.\n'
-                'Possible causes:\n'
-                '- This line was reconciled via Odoo\'s bank reconciliation '
-                '(cheque state should have updated automatically).\n'
-                '- The outstanding_line_id was not updated correctly after a '
-                'previous operation (legacy data issue).\n'
-                'Please verify the accounting entries for this cheque.'
-            ) % (self.name, reconcile_line.id, reconcile_line.account_id.display_name))
+        self._check_transition_reconcile_line(reconcile_line)
         company_amount, payment_amount, line_currency_id = self._get_move_amounts()
         debit  = self._build_move_line_vals(debit_account.id,  label, company_amount, payment_amount, line_currency_id, True)
         credit = self._build_move_line_vals(credit_account.id, label, company_amount, payment_amount, line_currency_id, False)
@@ -181,17 +267,6 @@ class AccountPaymentCheque(ChequeIssuerMixin, models.Model):
         })
         move.action_post()
         if reconcile_line:
-            if reconcile_line.move_id.state != 'posted':
-                raise UserError(_(
-                    'Cannot process cheque "%s": the linked journal entry (ID: %s, ref: "%s") '
-                    'is not posted (current state: "%s"). '
-                    'Please re-post that journal entry before continuing.'
-                ) % (
-                    self.name,
-                    reconcile_line.move_id.id,
-                    reconcile_line.move_id.ref or reconcile_line.move_id.name,
-                    reconcile_line.move_id.state,
-                ))
             (move.line_ids + reconcile_line).flush_recordset(['parent_state'])
             target = move.line_ids.filtered(lambda l: l.account_id == reconcile_line.account_id)
 
@@ -223,6 +298,115 @@ class AccountPaymentCheque(ChequeIssuerMixin, models.Model):
             (target + reconcile_line).reconcile()
         return move
 
+    def _prepare_transition(self, debit_account, credit_account, journal_id, date, label, reconcile_line=None):
+        """Return one transition for _create_transition_moves(), same arguments as _create_transition_move()."""
+        self.ensure_one()
+        return {
+            'cheque': self,
+            'debit_account': debit_account,
+            'credit_account': credit_account,
+            'journal_id': journal_id,
+            'date': date or fields.Date.today(),
+            'label': label,
+            'reconcile_line': reconcile_line or self.env['account.move.line'],
+        }
+
+    @api.model
+    def _create_transition_moves(self, transitions, grouping='cheque'):
+        """Create, post and reconcile the journal entries of many cheque transitions at once.
+
+        The entries are created with a single create(), posted with a single
+        action_post() and reconciled with a single _reconcile_plan(). When
+        the batch fails, it is replayed cheque by cheque in savepoints so one
+        bad cheque does not block the others.
+
+        :param transitions: list of dicts from _prepare_transition()
+        :param grouping: 'cheque' for one entry per cheque, 'journal' for one
+            entry per journal and date holding the lines of all its cheques
+        :return: tuple (results, failures) where results maps a cheque id to
+            {'move', 'debit_line', 'credit_line'} and failures maps a cheque
+            id to an error message
+        """
+        results, failures = {}, {}
+        valid_transitions = []
+        for transition in transitions:
+            try:
+                transition['cheque']._check_transition_reconcile_line(transition['reconcile_line'])
+            except UserError as error:
+                failures[transition['cheque'].id] = str(error)
+                continue
+            valid_transitions.append(transition)
+        if not valid_transitions:
+            return results, failures
+        try:
+            with self.env.cr.savepoint():
+                results.update(self._create_transition_moves_batch(valid_transitions, grouping))
+        except (UserError, ValidationError) as batch_error:
+            _logger.warning("Cheque transitions: batch of %d failed (%s), retrying one by one",
+                            len(valid_transitions), batch_error)
+            for transition in valid_transitions:
+                try:
+                    with self.env.cr.savepoint():
+                        results.update(self._create_transition_moves_batch([transition], 'cheque'))
+                except (UserError, ValidationError) as error:
+                    failures[transition['cheque'].id] = str(error)
+        return results, failures
+
+    @api.model
+    def _create_transition_moves_batch(self, transitions, grouping):
+        groups = {}
+        for transition in transitions:
+            if grouping == 'journal':
+                key = (transition['journal_id'], transition['date'])
+            else:
+                key = transition['cheque'].id
+            groups.setdefault(key, []).append(transition)
+
+        move_vals_list = []
+        for group in groups.values():
+            line_commands = []
+            for transition in group:
+                cheque = transition['cheque']
+                company_amount, payment_amount, currency_id = cheque._get_move_amounts()
+                line_commands += [
+                    Command.create(cheque._build_move_line_vals(
+                        transition['debit_account'].id, transition['label'],
+                        company_amount, payment_amount, currency_id, True)),
+                    Command.create(cheque._build_move_line_vals(
+                        transition['credit_account'].id, transition['label'],
+                        company_amount, payment_amount, currency_id, False)),
+                ]
+            move_vals_list.append({
+                'date': group[0]['date'],
+                'journal_id': group[0]['journal_id'],
+                'ref': group[0]['label'] if len(group) == 1 else _('Cheque operations (%s cheques)') % len(group),
+                'line_ids': line_commands,
+            })
+        moves = self.env['account.move'].create(move_vals_list)
+        moves.action_post()
+
+        results = {}
+        reconciliation_plan = []
+        for move, group in zip(moves, groups.values()):
+            for transition in group:
+                cheque = transition['cheque']
+                cheque_lines = move.line_ids.filtered(lambda l: l.transition_cheque_id == cheque)
+                debit_line = cheque_lines.filtered(lambda l: l.account_id == transition['debit_account'])[:1]
+                credit_line = (cheque_lines - debit_line)[:1]
+                results[cheque.id] = {
+                    'move': move,
+                    'debit_line': debit_line,
+                    'credit_line': credit_line,
+                }
+                reconcile_line = transition['reconcile_line']
+                if reconcile_line:
+                    target = (debit_line + credit_line).filtered(
+                        lambda l: l.account_id == reconcile_line.account_id)
+                    reconciliation_plan.append(target + reconcile_line)
+        if reconciliation_plan:
+            self.env['account.move.line']._reconcile_plan(reconciliation_plan)
+        return results
+
     def _get_issuer_method_code(self):
         return self.payment_method_line_id.code
 
@@ -264,6 +448,7 @@ class AccountPaymentCheque(ChequeIssuerMixin, models.Model):
             ],
         }
 
+    @track_transition('void', journal=lambda cheques: cheques.payment_id.journal_id)
     def action_void(self):
         """Void cheque - cancels the check and reopens the original debt."""
         voided = self.env['account.cheque']
@@ -319,6 +504,7 @@ class AccountPaymentCheque(ChequeIssuerMixin, models.Model):
         if voided:
             voided.write({'state': 'voided'})
 
+    @track_transition('bounce', journal=lambda cheque: cheque.deposit_journal_id)
     def action_bounce(self):
         """
         Bounce a deposited cheque - reverses the deposit move
@@ -474,6 +660,12 @@ class AccountPaymentCheque(ChequeIssuerMixin, models.Model):
         self.ensure_one()
         return self.write({'state': 'draft'})
 
+    @track_transition(
+        'deposit',
+        journal=lambda cheque, bank_journal_id=None, deposit_date=None: cheque.env['account.journal'].browse(bank_journal_id),
+        # Without a journal the wizard is opened, nothing to measure
+        cheques=lambda cheque, bank_journal_id=None, deposit_date=None: cheque if bank_journal_id else cheque.browse(),
+    )
     def action_deposit(self, bank_journal_id=None, deposit_date=None):
         """
         Deposit the cheque to a bank journal - creates accounting move
@@ -611,6 +803,7 @@ class AccountPaymentCheque(ChequeIssuerMixin, models.Model):
         if any(check.payment_id.state != 'draft' for check in self):
             raise UserError(_("Can't delete a cheque if payment is In Process!"))
 
+    @track_transition('cash', journal=lambda cheque, *args, **kwargs: cheque.deposit_journal_id or cheque.original_journal_id)
     def action_cash(self, bank_account_id, cashed_date):
         """
         Cash the cheque - create journal entry to move from collection to bank account
@@ -650,65 +843,136 @@ class AccountPaymentCheque(ChequeIssuerMixin, models.Model):
 
         return True
 
-    def _audit_outstanding_consistency(self):
-        """Return a list of dicts for cheques whose outstanding_line_id is
-        inconsistent with their state.
+    @track_transition('deposit', journal=lambda cheques, bank_journal, *args, **kwargs: bank_journal)
+    def _batch_deposit(self, bank_journal, deposit_date, grouping='cheque'):
+        """Deposit all cheques in self at once, see action_deposit().
 
-        Covers:
-          - state='deposit' + outstanding_line_id missing
-          - state='deposit' + outstanding_line_id.reconciled=True (stale pointer)
+        :return: dict cheque id -> error message for the cheques not deposited
         """
-        issues = []
-        deposit_cheques = self.search([('state', '=', 'deposit')])
-        for cheque in deposit_cheques:
-            line = cheque.outstanding_line_id
-            if not line:
-                issues.append({
-                    'cheque': cheque,
-                    'type': 'missing_outstanding',
-                    'detail': 'No outstanding_line_id while state=deposit',
-                })
-            elif line.reconciled:
-                issues.append({
-                    'cheque': cheque,
-                    'type': 'stale_outstanding',
-                    'detail': (
-                        'outstanding_line_id=%s (account=%s) '
-                        'is reconciled — stale pointer'
-                    ) % (line.id, line.account_id.name),
-                })
-        return issues
+        transitions, failures = [], {}
+        for cheque in self:
+            collection_account = cheque.original_journal_id.cheque_collection_account_id
+            if not collection_account:
+                failures[cheque.id] = _('Please configure "Cheques Under Collection Account" on journal "%s".') % cheque.original_journal_id.name
+                continue
+            outstanding_account = cheque.outstanding_line_id.account_id if cheque.outstanding_line_id else cheque.payment_id.outstanding_account_id
+            transitions.append(cheque._prepare_transition(
+                debit_account=collection_account,
+                credit_account=outstanding_account,
+                journal_id=bank_journal.id,
+                date=deposit_date,
+                label=_('Deposit: %s') % cheque.name,
+                reconcile_line=cheque.outstanding_line_id,
+            ))
+        results, move_failures = self._create_transition_moves(transitions, grouping)
+        failures.update(move_failures)
+        self.browse(list(results))._write_transition({
+            'state': 'deposit',
+            'deposit_journal_id': bank_journal.id,
+            'deposit_date': deposit_date,
+        }, {cheque_id: result['debit_line'] for cheque_id, result in results.items()})
+        return failures
+
+    @track_transition('cash', journal=lambda cheques, *args, **kwargs: cheques.deposit_journal_id or cheques.original_journal_id)
+    def _batch_cash(self, bank_account, cashed_date, grouping='cheque'):
+        """Cash all cheques in self at once, see action_cash().
+
+        :return: dict cheque id -> error message for the cheques not cashed
+        """
+        transitions = []
+        for cheque in self:
+            collection_account = cheque.outstanding_line_id.account_id if cheque.outstanding_line_id else cheque.payment_id.outstanding_account_id
+            if cheque.payment_type == 'inbound':
+                debit_account, credit_account = bank_account, collection_account
+            else:
+                debit_account, credit_account = collection_account, bank_account
+            transitions.append(cheque._prepare_transition(
+                debit_account=debit_account,
+                credit_account=credit_account,
+                journal_id=cheque.deposit_journal_id.id or cheque.original_journal_id.id,
+                date=cashed_date,
+                label=_('Cashed: %s') % cheque.name,
+                reconcile_line=cheque.outstanding_line_id,
+            ))
+        results, failures = self._create_transition_moves(transitions, grouping)
+        bank_lines = {
+            cheque_id: (result['debit_line'] + result['credit_line']).filtered(lambda l: l.account_id == bank_account)
+            for cheque_id, result in results.items()
+        }
+        self.browse(list(results))._write_transition({'cashed_date': cashed_date, 'state': 'cashed'}, bank_lines)
+        return failures
+
+    @track_transition('bounce', journal=lambda cheques, *args, **kwargs: cheques.deposit_journal_id)
+    def _batch_bounce(self, grouping='cheque'):
+        """Bounce all cheques in self at once, see action_bounce().
+
+        :return: dict cheque id -> error message for the cheques not bounced
+        """
+        deposited = self.filtered(lambda c: c.state == 'deposit' and c.deposit_journal_id)
+        transitions = []
+        for cheque in deposited:
+            if cheque.outstanding_line_id:
+                collection_account = cheque.outstanding_line_id.account_id
+            else:
+                # Fallback for old cheques
+                collection_account = cheque.deposit_journal_id.default_account_id
+            transitions.append(cheque._prepare_transition(
+                debit_account=cheque.payment_id.outstanding_account_id,
+                credit_account=collection_account,
+                journal_id=cheque.deposit_journal_id.id,
+                date=fields.Date.today(),
+                label=_('Bounce: %s') % cheque.name,
+                reconcile_line=cheque.outstanding_line_id,
+            ))
+        results, failures = self._create_transition_moves(transitions, grouping)
+        bounced = (self - deposited) | self.browse(list(results))
+        bounced._write_transition({'state': 'bounce'}, {cheque_id: result['debit_line'] for cheque_id, result in results.items()})
+        return failures
+
+    def _audit_outstanding_consistency(self):
+        """Return the cheques whose outstanding_line_id is inconsistent with
+        their state, as a dict rule -> list of cheque ids.
+
+        All rules run as a single SQL query:
+          - missing_outstanding: state='deposit' without outstanding_line_id
+          - stale_outstanding: cheque still in portfolio (register, deposit,
+            bounce) but its outstanding line is reconciled
+          - unposted_outstanding: the outstanding line belongs to a move that
+            is not posted
+        """
+        self.env['account.cheque'].flush_model(['state', 'outstanding_line_id'])
+        self.env['account.move.line'].flush_model(['reconciled', 'parent_state'])
+        self.env.cr.execute("""
+            SELECT 'missing_outstanding', c.id
+              FROM account_cheque c
+             WHERE c.state = 'deposit'
+               AND c.outstanding_line_id IS NULL
+            UNION ALL
+            SELECT 'stale_outstanding', c.id
+              FROM account_cheque c
+              JOIN account_move_line aml ON aml.id = c.outstanding_line_id
+             WHERE c.state IN ('register', 'deposit', 'bounce')
+               AND aml.reconciled
+            UNION ALL
+            SELECT 'unposted_outstanding', c.id
+              FROM account_cheque c
+              JOIN account_move_line aml ON aml.id = c.outstanding_line_id
+             WHERE c.state NOT IN ('draft', 'voided')
+               AND aml.parent_state != 'posted'
+        """)
+        findings = {}
+        for rule, cheque_id in self.env.cr.fetchall():
+            findings.setdefault(rule, []).append(cheque_id)
+        return findings
 
     def _cron_audit_outstanding(self):
-        """Cron entry point: audit and log outstanding_line_id anomalies."""
-        issues = self._audit_outstanding_consistency()
-        if not issues:
-            _logger.info("Cheque cron audit: no anomalies found.")
-            return
-        for issue in issues:
-            _logger.warning(
-                "Cheque cron audit: %s (ID=%s) — %s: %s",
-                issue['cheque'].name, issue['cheque'].id,
-                issue['type'], issue['detail'],
-            )
-        _logger.warning("Cheque cron audit: %d anomalies found.", len(issues))
+        """Cron entry point: audit outstanding_line_id consistency and store the result."""
+        audits = self.env['account.cheque.audit']._record_findings(self._audit_outstanding_consistency())
+        _logger.info("Cheque cron audit: %d anomalies found.", sum(audits.mapped('cheque_count')))
 
     def action_audit_outstanding(self):
-        """Server action entry point: audit and log outstanding_line_id anomalies."""
-        issues = self._audit_outstanding_consistency()
-        if not issues:
-            _logger.info("Cheque audit: no outstanding_line_id anomalies found.")
-            raise UserError(_('No anomalies found. All deposited cheques have consistent outstanding lines.'))
-        for issue in issues:
-            _logger.warning(
-                "Cheque audit: %s (ID=%s) — %s: %s",
-                issue['cheque'].name, issue['cheque'].id,
-                issue['type'], issue['detail'],
-            )
-        summary = '\n'.join(
-            '• %s (ID %s): %s' % (i['cheque'].name, i['cheque'].id, i['detail'])
-            for i in issues
-        )
-        raise UserError(_(
-            'Found %d anomalous cheque(s):\n\n%s'
-        ) % (len(issues), summary))
+        """Server action entry point: audit outstanding_line_id consistency and show the result."""
+        audits = self.env['account.cheque.audit']._record_findings(self._audit_outstanding_consistency())
+        action = self.env['ir.actions.act_window']._for_xml_id('cheque.action_account_cheque_audit')
+        action['domain'] = [('id', 'in', audits.ids)]
+        return action
@@ -0,0 +1,48 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from datetime import timedelta
+
+from odoo import models, fields, api, Command
+
+AUDIT_RULES = [
+    ('missing_outstanding', 'Deposited without outstanding line'),
+    ('stale_outstanding', 'Outstanding line reconciled while in portfolio'),
+    ('unposted_outstanding', 'Outstanding line not posted'),
+]
+
+
+class AccountChequeAudit(models.Model):
+    _name = 'account.cheque.audit'
+    _description = 'Cheque Outstanding Line Audit Result'
+    _order = 'date desc, id'
+
+    date = fields.Datetime(required=True, readonly=True, default=fields.Datetime.now)
+    rule = fields.Selection(AUDIT_RULES, required=True, readonly=True)
+    cheque_count = fields.Integer(string='Cheques', readonly=True)
+    cheque_ids = fields.Many2many(
+        'account.cheque',
+        relation='account_cheque_audit_cheque_rel',
+        column1='audit_id',
+        column2='cheque_id',
+        string='Inconsistent Cheques',
+        readonly=True,
+    )
+
+    @api.model
+    def _record_findings(self, findings):
+        """Store one result per rule for an audit run.
+
+        :param findings: dict rule -> list of cheque ids, as returned by
+            account.cheque._audit_outstanding_consistency()
+        :return: the created account.cheque.audit records
+        """
+        now = fields.Datetime.now()
+        return self.sudo().create([{
+            'date': now,
+            'rule': rule,
+            'cheque_count': len(findings.get(rule, [])),
+            'cheque_ids': [Command.set(findings.get(rule, []))],
+        } for rule, _label in AUDIT_RULES])
+
+    @api.autovacuum
+    def _gc_audit_results(self):
+        self.search([('date', '<', fields.Datetime.now() - timedelta(days=90))]).unlink()
@@ -0,0 +1,95 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from datetime import timedelta
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+
+class AccountChequeMaturity(models.Model):
+    """Cheque amounts and counts per company, currency, direction, state,
+    maturity week and bank.
+
+    Rows are recomputed with SQL for the (company, week) pairs touched by a
+    created, modified or deleted cheque, so the maturity dashboard reads a
+    small pre-aggregated table instead of grouping account.cheque.
+    """
+    _name = 'account.cheque.maturity'
+    _description = 'Cheque Maturity Summary'
+    _order = 'maturity_week, company_id'
+
+    company_id = fields.Many2one('res.company', readonly=True)
+    currency_id = fields.Many2one('res.currency', readonly=True)
+    direction = fields.Selection(
+        selection=[('inbound', 'Received'), ('outbound', 'Issued')],
+        readonly=True,
+    )
+    state = fields.Selection(
+        selection=lambda self: self.env['account.cheque']._fields['state'].selection,
+        string='Status',
+        readonly=True,
+    )
+    maturity_week = fields.Date(string='Maturity Week', readonly=True)
+    bank_id = fields.Many2one('res.bank', readonly=True)
+    amount = fields.Monetary(readonly=True)
+    cheque_count = fields.Integer(string='Cheques', readonly=True)
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS account_cheque_maturity_company_week_idx
+            ON account_cheque_maturity (company_id, maturity_week)
+        """)
+        self.env.cr.execute("SELECT 1 FROM account_cheque_maturity LIMIT 1")
+        if not self.env.cr.rowcount:
+            self._refresh(SQL("TRUE"), SQL("TRUE"))
+
+    @api.model
+    def _get_keys(self, cheques):
+        """Return the (company id, maturity week) pairs of the given cheques."""
+        return {
+            (cheque.company_id.id, cheque.payment_date - timedelta(days=cheque.payment_date.weekday()))
+            for cheque in cheques
+            if cheque.company_id and cheque.payment_date
+        }
+
+    @api.model
+    def _refresh_keys(self, keys):
+        """Recompute the rows of the given (company id, maturity week) pairs."""
+        if not keys:
+            return
+        keys = tuple(keys)
+        self._refresh(
+            SQL("(m.company_id, m.maturity_week) IN %s", keys),
+            SQL("(c.company_id, date_trunc('week', c.payment_date)::date) IN %s", keys),
+        )
+
+    @api.model
+    def _refresh(self, summary_condition, cheque_condition):
+        self.env['account.cheque'].flush_model(['company_id', 'payment_date', 'payment_type', 'state', 'bank_id', 'amount'])
+        self.env['account.payment'].flush_model(['currency_id'])
+        self.env.cr.execute(SQL("DELETE FROM account_cheque_maturity m WHERE %s", summary_condition))
+        self.env.cr.execute(SQL("""
+            INSERT INTO account_cheque_maturity (
+                company_id, currency_id, direction, state, maturity_week, bank_id,
+                amount, cheque_count,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT
+                c.company_id,
+                ap.currency_id,
+                c.payment_type,
+                c.state,
+                date_trunc('week', c.payment_date)::date,
+                c.bank_id,
+                SUM(c.amount),
+                COUNT(*),
+                %(uid)s, NOW() AT TIME ZONE 'UTC',
+                %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM account_cheque c
+            JOIN account_payment ap ON ap.id = c.payment_id
+            WHERE c.state != 'draft'
+              AND c.payment_date IS NOT NULL
+              AND %(cheque_condition)s
+            GROUP BY c.company_id, ap.currency_id, c.payment_type, c.state,
+                     date_trunc('week', c.payment_date)::date, c.bank_id
+        """, uid=self.env.uid, cheque_condition=cheque_condition))
+        self.invalidate_model()
@@ -0,0 +1,124 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+# Cheque states counted as open exposure
+EXPOSURE_STATES = ('register', 'deposit', 'bounce')
+
+
+class AccountChequePartnerExposure(models.Model):
+    """Open received cheques per partner, company, currency, status and
+    maturity bucket.
+
+    Rows of a partner are recomputed with SQL when one of its cheques is
+    created, modified or deleted, and all rows are recomputed daily by a
+    cron since the maturity buckets are relative to today.
+    """
+    _name = 'account.cheque.partner.exposure'
+    _description = 'Partner Open Cheque Exposure'
+    _order = 'partner_id, currency_id, status, bucket'
+
+    partner_id = fields.Many2one('res.partner', readonly=True, index=True)
+    company_id = fields.Many2one('res.company', readonly=True)
+    currency_id = fields.Many2one('res.currency', readonly=True)
+    company_currency_id = fields.Many2one(related='company_id.currency_id')
+    status = fields.Selection(
+        selection=[
+            ('portfolio', 'In Portfolio'),
+            ('deposited', 'Deposited'),
+            ('bounced', 'Bounced'),
+        ],
+        readonly=True,
+    )
+    bucket = fields.Selection(
+        selection=[
+            ('overdue', 'Overdue'),
+            ('0_30', '0-30 Days'),
+            ('31_60', '31-60 Days'),
+            ('61_90', '61-90 Days'),
+            ('over_90', 'Over 90 Days'),
+        ],
+        string='Maturity',
+        readonly=True,
+    )
+    amount = fields.Monetary(readonly=True)
+    amount_company = fields.Monetary(string='Amount in Company Currency', currency_field='company_currency_id', readonly=True)
+    cheque_count = fields.Integer(string='Cheques', readonly=True)
+
+    def init(self):
+        self.env.cr.execute("SELECT 1 FROM account_cheque_partner_exposure LIMIT 1")
+        if not self.env.cr.rowcount:
+            self._refresh(SQL("TRUE"), SQL("TRUE"))
+
+    @api.model
+    def _get_partners(self, cheques):
+        return cheques.filtered(lambda c: c.payment_type == 'inbound').partner_id.commercial_partner_id
+
+    @api.model
+    def _refresh_partners(self, partners):
+        """Recompute the rows of the given commercial partners."""
+        if not partners:
+            return
+        partner_ids = tuple(partners.ids)
+        self._refresh(
+            SQL("e.partner_id IN %s", partner_ids),
+            SQL("p.commercial_partner_id IN %s", partner_ids),
+        )
+
+    @api.model
+    def _cron_refresh(self):
+        self._refresh(SQL("TRUE"), SQL("TRUE"))
+
+    @api.model
+    def _refresh(self, exposure_condition, cheque_condition):
+        self.env['account.cheque'].flush_model(['state', 'amount', 'payment_date', 'payment_type', 'company_id', 'outstanding_line_id'])
+        self.env['account.payment'].flush_model(['partner_id', 'currency_id', 'amount', 'amount_company_currency_signed'])
+        self.env['res.partner'].flush_model(['commercial_partner_id'])
+        self.env.cr.execute(SQL("DELETE FROM account_cheque_partner_exposure e WHERE %s", exposure_condition))
+        today = fields.Date.context_today(self)
+        self.env.cr.execute(SQL("""
+            INSERT INTO account_cheque_partner_exposure (
+                partner_id, company_id, currency_id, status, bucket,
+                amount, amount_company, cheque_count,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT
+                p.commercial_partner_id,
+                c.company_id,
+                ap.currency_id,
+                CASE c.state
+                    WHEN 'register' THEN 'portfolio'
+                    WHEN 'deposit' THEN 'deposited'
+                    ELSE 'bounced'
+                END,
+                CASE
+                    WHEN c.payment_date < %(today)s THEN 'overdue'
+                    WHEN c.payment_date <= %(today)s + 30 THEN '0_30'
+                    WHEN c.payment_date <= %(today)s + 60 THEN '31_60'
+                    WHEN c.payment_date <= %(today)s + 90 THEN '61_90'
+                    ELSE 'over_90'
+                END AS bucket,
+                SUM(c.amount),
+                -- Without an outstanding line, the cheque share of the payment in company currency
+                SUM(COALESCE(
+                    ol.debit + ol.credit,
+                    ABS(ap.amount_company_currency_signed) * c.amount / NULLIF(ap.amount, 0)
+                )),
+                COUNT(*),
+                %(uid)s, NOW() AT TIME ZONE 'UTC',
+                %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM account_cheque c
+            JOIN account_payment ap ON ap.id = c.payment_id
+            JOIN res_partner p ON p.id = ap.partner_id
+            LEFT JOIN account_move_line ol ON ol.id = c.outstanding_line_id
+            WHERE c.payment_type = 'inbound'
+              AND c.state IN %(states)s
+              AND %(cheque_condition)s
+            GROUP BY p.commercial_partner_id, c.company_id, ap.currency_id, c.state, bucket
+        """,
+            today=today,
+            uid=self.env.uid,
+            states=EXPOSURE_STATES,
+            cheque_condition=cheque_condition,
+        ))
+        self.invalidate_model()
@@ -0,0 +1,158 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+import functools
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from odoo import models, fields, api, tools
+
+# System parameter enabling the statistics, off by default
+TRACKING_PARAM = 'cheque.track_transitions'
+
+TRANSITION_ACTIONS = [
+    ('deposit', 'Deposit'),
+    ('cash', 'Cash'),
+    ('bounce', 'Bounce'),
+    ('void', 'Void'),
+    ('endorse', 'Endorse'),
+]
+
+
+def track_transition(action, journal=None, cheques=None):
+    """Decorate a cheque action to store one statistic row per call, see _track().
+
+    journal and cheques are called with the arguments of the action and
+    return its journal and the cheques it handles, the records themselves by
+    default. Nothing is measured without cheques or when the
+    cheque.track_transitions system parameter is not set.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            stat = self.env['account.cheque.transition.stat']
+            if not stat._is_tracking_enabled():
+                return method(self, *args, **kwargs)
+            tracked = cheques(self, *args, **kwargs) if cheques else self
+            if not tracked:
+                return method(self, *args, **kwargs)
+            with stat._track(action, journal(self, *args, **kwargs) if journal else None, len(tracked)):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class AccountChequeTransitionStat(models.Model):
+    """One row per executed cheque action, with its duration, SQL query
+    count and the number of journal entries and items it created.
+
+    Rows are only recorded while the cheque.track_transitions system
+    parameter is set, measuring adds queries to every action.
+    """
+    _name = 'account.cheque.transition.stat'
+    _description = 'Cheque Transition Statistics'
+    _order = 'date desc, id desc'
+    _log_access = False
+
+    date = fields.Datetime(required=True, readonly=True, default=fields.Datetime.now, index=True)
+    action = fields.Selection(TRANSITION_ACTIONS, required=True, readonly=True)
+    journal_id = fields.Many2one('account.journal', readonly=True)
+    company_id = fields.Many2one('res.company', readonly=True)
+    cheque_count = fields.Integer(string='Cheques', readonly=True)
+    duration = fields.Float(string='Duration (ms)', readonly=True)
+    query_count = fields.Integer(string='Queries', readonly=True)
+    move_count = fields.Integer(string='Journal Entries', readonly=True)
+    line_count = fields.Integer(string='Journal Items', readonly=True)
+
+    @api.model
+    def _is_tracking_enabled(self):
+        return tools.str2bool(self.env['ir.config_parameter'].sudo().get_param(TRACKING_PARAM, 'False'))
+
+    @contextmanager
+    def _track(self, action, journal=None, cheque_count=1):
+        """Measure the block and store one statistic row if it succeeds.
+
+        Journal entries created by the block are those above the highest
+        account_move id seen when entering it, the transaction snapshot
+        hides the ones of concurrent transactions.
+        """
+        cr = self.env.cr
+        cr.execute("SELECT COALESCE(MAX(id), 0) FROM account_move")
+        last_move_id = cr.fetchone()[0]
+        query_count = cr.sql_log_count
+        start = time.perf_counter()
+        yield
+        self.env.flush_all()
+        duration = (time.perf_counter() - start) * 1000
+        query_count = cr.sql_log_count - query_count
+        cr.execute("""
+            SELECT COUNT(DISTINCT m.id), COUNT(l.id)
+              FROM account_move m
+              LEFT JOIN account_move_line l ON l.move_id = m.id
+             WHERE m.id > %s
+        """, [last_move_id])
+        move_count, line_count = cr.fetchone()
+        journal = journal or self.env['account.journal']
+        self.sudo().create({
+            'action': action,
+            'journal_id': journal[:1].id,
+            'company_id': (journal[:1].company_id or self.env.company).id,
+            'cheque_count': cheque_count,
+            'duration': duration,
+            'query_count': query_count,
+            'move_count': move_count,
+            'line_count': line_count,
+        })
+
+    @api.autovacuum
+    def _gc_transition_stats(self):
+        self.search([('date', '<', fields.Datetime.now() - timedelta(days=180))]).unlink()
+
+
+class AccountChequeTransitionStatReport(models.Model):
+    """Duration and query count percentiles per action, journal and week."""
+    _name = 'account.cheque.transition.stat.report'
+    _description = 'Cheque Transition Statistics Percentiles'
+    _auto = False
+    _order = 'week desc, action, journal_id'
+
+    week = fields.Date(readonly=True)
+    action = fields.Selection(TRANSITION_ACTIONS, readonly=True)
+    journal_id = fields.Many2one('account.journal', readonly=True)
+    company_id = fields.Many2one('res.company', readonly=True)
+    sample_count = fields.Integer(string='Runs', readonly=True)
+    cheque_count = fields.Integer(string='Cheques', readonly=True)
+    duration_p50 = fields.Float(string='Duration p50 (ms)', readonly=True)
+    duration_p90 = fields.Float(string='Duration p90 (ms)', readonly=True)
+    duration_p99 = fields.Float(string='Duration p99 (ms)', readonly=True)
+    duration_per_cheque = fields.Float(string='Duration per Cheque (ms)', readonly=True)
+    query_p50 = fields.Float(string='Queries p50', readonly=True)
+    query_p90 = fields.Float(string='Queries p90', readonly=True)
+    query_per_cheque = fields.Float(string='Queries per Cheque', readonly=True)
+    move_count = fields.Integer(string='Journal Entries', readonly=True)
+    line_count = fields.Integer(string='Journal Items', readonly=True)
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""
+            CREATE OR REPLACE VIEW account_cheque_transition_stat_report AS (
+                SELECT
+                    MIN(s.id)                                                   AS id,
+                    date_trunc('week', s.date)::date                            AS week,
+                    s.action,
+                    s.journal_id,
+                    s.company_id,
+                    COUNT(*)                                                    AS sample_count,
+                    SUM(s.cheque_count)                                         AS cheque_count,
+                    percentile_cont(0.5) WITHIN GROUP (ORDER BY s.duration)     AS duration_p50,
+                    percentile_cont(0.9) WITHIN GROUP (ORDER BY s.duration)     AS duration_p90,
+                    percentile_cont(0.99) WITHIN GROUP (ORDER BY s.duration)    AS duration_p99,
+                    SUM(s.duration) / NULLIF(SUM(s.cheque_count), 0)            AS duration_per_cheque,
+                    percentile_cont(0.5) WITHIN GROUP (ORDER BY s.query_count)  AS query_p50,
+                    percentile_cont(0.9) WITHIN GROUP (ORDER BY s.query_count)  AS query_p90,
+                    SUM(s.query_count)::float / NULLIF(SUM(s.cheque_count), 0)  AS query_per_cheque,
+                    SUM(s.move_count)                                           AS move_count,
+                    SUM(s.line_count)                                           AS line_count
+                FROM account_cheque_transition_stat s
+                GROUP BY date_trunc('week', s.date)::date, s.action, s.journal_id, s.company_id
+            )
+        """)
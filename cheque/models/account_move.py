@@ -12,6 +12,7 @@ class AccountMove(models.Model):
             # Clear outstanding line references for all cheques when move goes to draft
             cheques = move.origin_payment_id._get_cheques()
             cheques.write({'outstanding_line_id': False})
+        self.env['mis.cash_flow']._schedule_refresh()
 
     def action_post(self):
         res = super().action_post()
@@ -37,3 +38,8 @@ class AccountMove(models.Model):
                 if new_line:
                     cheque.outstanding_line_id = new_line.id
         return res
+
+    def _post(self, soft=True):
+        posted = super()._post(soft=soft)
+        self.env['mis.cash_flow']._schedule_refresh()
+        return posted
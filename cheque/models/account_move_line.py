@@ -11,6 +11,14 @@ class AccountMoveLine(models.Model):
     _inherit = 'account.move.line'
 
     cheque_ids = fields.One2many('account.cheque', 'outstanding_line_id', string='Checks')
+    transition_cheque_id = fields.Many2one(
+        'account.cheque',
+        string='Cheque Operation',
+        readonly=True,
+        copy=False,
+        index='btree_not_null',
+        help='Cheque whose lifecycle operation created this line',
+    )
 
     def reconcile(self):
         result = super().reconcile()
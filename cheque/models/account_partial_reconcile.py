@@ -0,0 +1,19 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo import api, models
+
+
+class AccountPartialReconcile(models.Model):
+
+    _inherit = 'account.partial.reconcile'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partials = super().create(vals_list)
+        # Residual amounts changed, the materialised cash flow must follow
+        self.env['mis.cash_flow']._schedule_refresh()
+        return partials
+
+    def unlink(self):
+        res = super().unlink()
+        self.env['mis.cash_flow']._schedule_refresh()
+        return res
@@ -2,6 +2,12 @@ from odoo import fields, models, api, Command, _
 from odoo.exceptions import UserError, ValidationError
 from odoo.tools.misc import format_date
 from ..constants import CHEQUE_NEW_CODES, CHEQUE_MOVE_CODES, CHEQUE_ALL_CODES
+from .account_cheque_transition_stat import track_transition
+
+# Payment fields the cheque maturity summary depends on, through related or computed cheque fields
+MATURITY_FIELDS = {'partner_id', 'payment_method_line_id', 'currency_id', 'company_id', 'payment_type'}
+# Payment fields grouped by the partner open cheque exposure
+EXPOSURE_FIELDS = {'partner_id', 'currency_id', 'company_id', 'payment_type', 'amount'}
 
 
 class AccountPayment(models.Model):
@@ -38,6 +44,25 @@ class AccountPayment(models.Model):
             if checks:
                 rec.amount = sum(checks.mapped('amount'))
 
+    def write(self, vals):
+        maturity = self.env['account.cheque.maturity']
+        refresh_maturity = not MATURITY_FIELDS.isdisjoint(vals)
+        exposure = self.env['account.cheque.partner.exposure']
+        refresh_exposure = not EXPOSURE_FIELDS.isdisjoint(vals)
+        # Draft cheques are not summarized
+        if refresh_maturity or refresh_exposure:
+            cheques = self.new_cheque_ids.filtered(lambda c: c.state != 'draft')
+        else:
+            cheques = self.env['account.cheque']
+        maturity_keys = maturity._get_keys(cheques) if refresh_maturity else set()
+        exposure_partners = exposure._get_partners(cheques) if refresh_exposure else self.env['res.partner']
+        res = super().write(vals)
+        if cheques and refresh_maturity:
+            maturity._refresh_keys(maturity_keys | maturity._get_keys(cheques))
+        if cheques and refresh_exposure:
+            exposure._refresh_partners(exposure_partners | exposure._get_partners(cheques))
+        return res
+
     def _is_cheque_payment(self, check_subtype=False):
         if check_subtype == 'move_check':
             return self.payment_method_code in CHEQUE_MOVE_CODES
@@ -45,6 +70,14 @@ class AccountPayment(models.Model):
             return self.payment_method_code in CHEQUE_NEW_CODES
         return self.payment_method_code in CHEQUE_ALL_CODES
 
+    def _get_endorsements(self):
+        return self.filtered(lambda p: p.payment_method_code == 'cheque_existing_out' and p.move_cheque_ids)
+
+    @track_transition(
+        'endorse',
+        journal=lambda payments: payments._get_endorsements().journal_id,
+        cheques=lambda payments: payments._get_endorsements().move_cheque_ids,
+    )
     def action_post(self):
         # unlink checks if payment method code is not for checks. We do it on post and not when changing payment
         # method so that the user don't loose checks data in case of changing payment method and coming back again
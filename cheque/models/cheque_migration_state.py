@@ -0,0 +1,155 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+import logging
+
+from odoo import models, fields, api, tools
+from odoo.modules.migration import load_script
+
+_logger = logging.getLogger(__name__)
+
+POST_MIGRATE_SCRIPT = 'cheque/migrations/18.0.1.0.18/post-migrate.py'
+
+# Cheque columns compared before and after a chunk to count affected rows
+TRACKED_COLUMNS = ('state', 'outstanding_line_id', 'cashed_date', 'deposit_journal_id', 'deposit_date')
+
+
+class DryRunRollback(Exception):
+    """Raised to roll back the savepoint of a dry-run chunk."""
+
+
+class ChequeMigrationState(models.Model):
+    """Progress of the chunked cheque data migrations, one row per step."""
+    _name = 'cheque.migration.state'
+    _description = 'Cheque Migration Progress'
+    _order = 'id'
+
+    step = fields.Char(required=True, readonly=True)
+    state = fields.Selection(
+        selection=[('running', 'Running'), ('error', 'Error'), ('done', 'Done')],
+        default='running',
+        required=True,
+        readonly=True,
+    )
+    last_cheque_id = fields.Integer(readonly=True, help='Last cheque id of the last applied chunk')
+    chunk_count = fields.Integer(readonly=True)
+    affected_count = fields.Integer(readonly=True)
+    error = fields.Text(readonly=True, help='Error raised by the step on the chunk after the last applied one')
+
+    _sql_constraints = [
+        ('step_unique', 'unique(step)', 'A migration step can only be tracked once!')
+    ]
+
+    @api.model
+    def _get_steps(self):
+        return load_script(tools.file_path(POST_MIGRATE_SCRIPT), 'cheque').STEPS
+
+    @api.model
+    def _schedule_steps(self):
+        """Track the post-migration steps that are not tracked yet.
+
+        Called by the migration script: the steps are applied afterwards by
+        the cheque migration cron, not inside the module upgrade. Steps that
+        already ran are never run again.
+        """
+        known_steps = set(self.search([]).mapped('step'))
+        self.create([{'step': step.__name__} for step in self._get_steps() if step.__name__ not in known_steps])
+        cron = self.env.ref('cheque.ir_cron_cheque_migration', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    @api.model
+    def _cron_run_steps(self, chunk_size=500):
+        """Apply the first unfinished step to its next chunk of cheques.
+
+        Steps run one after the other over all cheques, in the order of the
+        migration script, a step only starts once the previous one is done.
+        A run handles a single chunk in a savepoint: a failing chunk is
+        rolled back, its error is stored and the step is left in error, so
+        the next runs do not retry it until action_retry() is called.
+        """
+        progress_by_step = {progress.step: progress for progress in self.search([])}
+        pending = [
+            (step, progress_by_step[step.__name__])
+            for step in self._get_steps()
+            if step.__name__ in progress_by_step and progress_by_step[step.__name__].state != 'done'
+        ]
+        if not pending:
+            return
+        step, progress = pending[0]
+        if progress.state == 'error':
+            _logger.warning("Cheque migration %s is in error, see its progress row.", progress.step)
+            return
+        chunk_ids = self._get_chunk(progress.last_cheque_id, chunk_size)
+        if not chunk_ids:
+            progress.state = 'done'
+            _logger.info("Cheque migration %s: %d cheque(s) affected.", progress.step, progress.affected_count)
+            remaining = self.env['account.cheque'].search_count([]) * (len(pending) - 1)
+            self.env['ir.cron']._notify_progress(done=0, remaining=remaining)
+            return
+        try:
+            with self.env.cr.savepoint():
+                affected = self._run_step(step, chunk_ids)
+        except Exception as e:
+            self.env.invalidate_all()
+            _logger.warning("Cheque migration %s failed after cheque %d: %s", progress.step, progress.last_cheque_id, e)
+            progress.write({'state': 'error', 'error': str(e)})
+            return
+        progress.write({
+            'last_cheque_id': chunk_ids[-1],
+            'chunk_count': progress.chunk_count + 1,
+            'affected_count': progress.affected_count + affected,
+        })
+        remaining = self.env['account.cheque'].search_count([('id', '>', chunk_ids[-1])])
+        remaining += self.env['account.cheque'].search_count([]) * (len(pending) - 1)
+        # Makes the cron run again right away while cheques remain
+        self.env['ir.cron']._notify_progress(done=len(chunk_ids), remaining=remaining)
+
+    def action_retry(self):
+        """Run the steps in error again from their failed chunk."""
+        self.filtered(lambda p: p.state == 'error').write({'state': 'running', 'error': False})
+        self.env.ref('cheque.ir_cron_cheque_migration')._trigger()
+
+    @api.model
+    def _get_chunk(self, last_id, chunk_size):
+        return self.env['account.cheque'].search([('id', '>', last_id)], order='id', limit=chunk_size).ids
+
+    @api.model
+    def _run_step(self, step, cheque_ids):
+        """Run one step on the given cheques and return how many of them changed."""
+        before = self._read_tracked_columns(cheque_ids)
+        step(self.env, [('id', 'in', cheque_ids)])
+        self.env.flush_all()
+        after = self._read_tracked_columns(cheque_ids)
+        self.env.invalidate_all()
+        return sum(1 for cheque_id, values in after.items() if before.get(cheque_id) != values)
+
+    @api.model
+    def _read_tracked_columns(self, cheque_ids):
+        self.env.cr.execute(
+            "SELECT id, %s FROM account_cheque WHERE id IN %%s" % ', '.join(TRACKED_COLUMNS),
+            [tuple(cheque_ids)],
+        )
+        return {row[0]: row[1:] for row in self.env.cr.fetchall()}
+
+    @api.model
+    def action_dry_run(self, chunk_size=500):
+        """Report the cheques each post-migration step would change, without applying anything.
+
+        Steps run one after the other over the chunks of cheques like the
+        cron does, in a savepoint rolled back once all steps ran.
+
+        :return: dict step name -> number of affected cheques
+        """
+        steps = self._get_steps()
+        report = dict.fromkeys((step.__name__ for step in steps), 0)
+        try:
+            with self.env.cr.savepoint():
+                for step in steps:
+                    last_id = 0
+                    while chunk_ids := self._get_chunk(last_id, chunk_size):
+                        report[step.__name__] += self._run_step(step, chunk_ids)
+                        last_id = chunk_ids[-1]
+                raise DryRunRollback()
+        except DryRunRollback:
+            self.env.invalidate_all()
+        _logger.info("Cheque migration dry run: %s", report)
+        return report
@@ -0,0 +1,78 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo import models, fields, api
+
+
+class ResPartner(models.Model):
+
+    _inherit = 'res.partner'
+
+    cheque_exposure_ids = fields.One2many(
+        'account.cheque.partner.exposure',
+        'partner_id',
+        string='Open Cheques',
+        readonly=True,
+    )
+    cheque_portfolio_amount = fields.Monetary(
+        compute='_compute_cheque_exposure',
+        string='Cheques in Portfolio',
+        currency_field='cheque_exposure_currency_id',
+        help='Received cheques not deposited yet, in company currency.',
+    )
+    cheque_deposited_amount = fields.Monetary(
+        compute='_compute_cheque_exposure',
+        string='Cheques Deposited',
+        currency_field='cheque_exposure_currency_id',
+        help='Received cheques deposited but not cleared yet, in company currency.',
+    )
+    cheque_bounced_amount = fields.Monetary(
+        compute='_compute_cheque_exposure',
+        string='Cheques Bounced',
+        currency_field='cheque_exposure_currency_id',
+        help='Received cheques that bounced, in company currency.',
+    )
+    cheque_exposure_amount = fields.Monetary(
+        compute='_compute_cheque_exposure',
+        string='Open Cheques',
+        currency_field='cheque_exposure_currency_id',
+        help='Total of the received cheques in portfolio, deposited or bounced, in company currency.',
+    )
+    cheque_exposure_currency_id = fields.Many2one(
+        'res.currency',
+        compute='_compute_cheque_exposure',
+    )
+
+    @api.depends_context('company')
+    def _compute_cheque_exposure(self):
+        """Read the maintained exposure rows, never the cheques themselves."""
+        amounts = {
+            (partner.id, status): amount
+            for partner, status, amount in self.env['account.cheque.partner.exposure']._read_group(
+                [('partner_id', 'in', self.commercial_partner_id.ids), ('company_id', '=', self.env.company.id)],
+                ['partner_id', 'status'],
+                ['amount_company:sum'],
+            )
+        }
+        for partner in self:
+            commercial_id = partner.commercial_partner_id.id
+            partner.cheque_portfolio_amount = amounts.get((commercial_id, 'portfolio'), 0.0)
+            partner.cheque_deposited_amount = amounts.get((commercial_id, 'deposited'), 0.0)
+            partner.cheque_bounced_amount = amounts.get((commercial_id, 'bounced'), 0.0)
+            partner.cheque_exposure_amount = (
+                partner.cheque_portfolio_amount + partner.cheque_deposited_amount + partner.cheque_bounced_amount
+            )
+            partner.cheque_exposure_currency_id = self.env.company.currency_id
+
+    def _get_cheque_exposure_by_currency(self):
+        """Return the open cheques of the partner per currency name, as
+        {currency: {'symbol', 'amount', 'buckets': {bucket: amount}}}."""
+        self.ensure_one()
+        result = {}
+        for currency, bucket, amount in self.env['account.cheque.partner.exposure']._read_group(
+            [('partner_id', '=', self.commercial_partner_id.id), ('company_id', 'in', self.env.companies.ids)],
+            ['currency_id', 'bucket'],
+            ['amount:sum'],
+        ):
+            values = result.setdefault(currency.name, {'symbol': currency.symbol, 'amount': 0.0, 'buckets': {}})
+            values['amount'] += amount
+            values['buckets'][bucket] = amount
+        return result
@@ -1,11 +1,59 @@
 from psycopg2.extensions import AsIs
 
-from odoo import models, tools
+from odoo import api, models, tools
+
+MATERIALIZED_PARAM = "cheque.mis_cash_flow_materialized"
+REFRESH_PRECOMMIT_KEY = "mis_cash_flow_refresh"
 
 
 class MisCashFlow(models.Model):
     _inherit = "mis.cash_flow"
 
+    @api.model
+    def _is_materialized(self):
+        """The view is materialised when the system parameter
+        cheque.mis_cash_flow_materialized is set, see _set_materialized()."""
+        return tools.str2bool(
+            self.env["ir.config_parameter"].sudo().get_param(MATERIALIZED_PARAM, "False")
+        )
+
+    @api.model
+    def _set_materialized(self, materialized):
+        self.env["ir.config_parameter"].sudo().set_param(MATERIALIZED_PARAM, materialized)
+        self.init()
+
+    @api.model
+    def _schedule_refresh(self):
+        """Flag the materialised view as stale, once per transaction.
+
+        The refresh itself runs in the cron, out of the user's transaction:
+        the pending cron trigger is the dirty flag.
+        """
+        if not self._is_materialized():
+            return
+        precommit_data = self.env.cr.precommit.data
+        if precommit_data.get(REFRESH_PRECOMMIT_KEY):
+            return
+        precommit_data[REFRESH_PRECOMMIT_KEY] = True
+        cron = self.env.ref(
+            "cheque.ir_cron_refresh_mis_cash_flow", raise_if_not_found=False
+        )
+        if cron:
+            cron.sudo()._trigger()
+
+    @api.model
+    def _cron_refresh_materialized(self):
+        if self._is_materialized():
+            self._refresh_materialized()
+
+    @api.model
+    def _refresh_materialized(self):
+        self.env.flush_all()
+        self._cr.execute(
+            "REFRESH MATERIALIZED VIEW CONCURRENTLY %s", (AsIs(self._table),)
+        )
+        self.invalidate_model()
+
     def init(self):
         query = """
             -- Branch 1: AML lines (original logic + exclusion of open-cheque lines)
@@ -27,11 +75,11 @@ class MisCashFlow(models.Model):
                 COALESCE(aml.date_maturity, aml.date)       AS date
             FROM account_move_line AS aml
             WHERE aml.parent_state != 'cancel'
-              AND aml.id NOT IN (
-                  SELECT outstanding_line_id
-                  FROM account_cheque
-                  WHERE state IN ('register', 'deposit', 'cashed')
-                    AND outstanding_line_id IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1
+                  FROM account_cheque c
+                  WHERE c.outstanding_line_id = aml.id
+                    AND c.state IN ('register', 'deposit', 'cashed')
               )
 
             UNION ALL
@@ -85,6 +133,40 @@ class MisCashFlow(models.Model):
               AND COALESCE(ol.debit + ol.credit, c.amount) > 0
         """
         tools.drop_view_if_exists(self.env.cr, self._table)
+        if not self._is_materialized():
+            self._cr.execute(
+                "CREATE OR REPLACE VIEW %s AS (%s)", (AsIs(self._table), AsIs(query))
+            )
+            return
+        self._cr.execute(
+            "CREATE MATERIALIZED VIEW %s AS (%s)", (AsIs(self._table), AsIs(query))
+        )
+        # The unique index is required by REFRESH ... CONCURRENTLY
+        self._cr.execute(
+            "CREATE UNIQUE INDEX %s_id_idx ON %s (id)",
+            (AsIs(self._table), AsIs(self._table)),
+        )
         self._cr.execute(
-            "CREATE OR REPLACE VIEW %s AS (%s)", (AsIs(self._table), AsIs(query))
+            "CREATE INDEX %s_company_account_date_idx ON %s (company_id, account_id, date)",
+            (AsIs(self._table), AsIs(self._table)),
         )
+
+
+class MisCashFlowForecastLine(models.Model):
+    _inherit = "mis.cash_flow.forecast_line"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env["mis.cash_flow"]._schedule_refresh()
+        return lines
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env["mis.cash_flow"]._schedule_refresh()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env["mis.cash_flow"]._schedule_refresh()
+        return res
@@ -1,3 +1,12 @@
 from . import common
 from . import test_own_checks
 from . import test_third_party_checks
+from . import test_cheque_lifecycle_benchmark
+from . import test_transition_moves
+from . import test_cheque_audit
+from . import test_mis_cash_flow
+from . import test_cheque_maturity
+from . import test_transition_stat
+from . import test_cheque_migration_state
+from . import test_cheque_intake_wizard
+from . import test_cheque_partner_exposure
@@ -0,0 +1,74 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from itertools import count
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo import fields, Command
+
+# Cheque numbers must stay unique per payment method line
+CHEQUE_NUMBERS = count(1)
+
+
+class ChequeTestCommon(AccountTestInvoicingCommon):
+    """Cheque journals, banks and helpers to receive or issue cheques."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.today = fields.Date.today()
+        cls.cheque_bank = cls.env['res.bank'].create({'name': 'Cheque Bank'})
+        cls.cheque_partner = cls.env['res.partner'].create({'name': 'Cheque Partner'})
+        cls.collection_account = cls.env['account.account'].create({
+            'name': 'Cheques Under Collection',
+            'code': '101980',
+            'account_type': 'asset_current',
+            'reconcile': True,
+        })
+        cls.cheque_journal = cls.env['account.journal'].create({
+            'name': 'Cheques',
+            'code': 'CHQ',
+            'type': 'cash',
+            'cheque_collection_account_id': cls.collection_account.id,
+        })
+        cls.deposit_journal = cls.env['account.journal'].create({
+            'name': 'Cheque Deposits',
+            'code': 'CHD',
+            'type': 'bank',
+        })
+
+    @classmethod
+    def _get_method_line(cls, journal, payment_type, code):
+        method_line = journal._get_available_payment_method_lines(payment_type).filtered(lambda l: l.code == code)
+        if not method_line:
+            lines_field = '%s_payment_method_line_ids' % payment_type
+            journal[lines_field] = [Command.create({
+                'payment_method_id': cls.env['account.payment.method'].search([
+                    ('code', '=', code), ('payment_type', '=', payment_type),
+                ], limit=1).id,
+            })]
+            method_line = journal[lines_field].filtered(lambda l: l.code == code)
+        return method_line[:1]
+
+    @classmethod
+    def _create_cheques(cls, amounts, partner=None, currency=None, payment_type='inbound', journal=None, post=True):
+        """Create one cheque payment per amount and return the cheques."""
+        if payment_type == 'inbound':
+            journal, code = journal or cls.cheque_journal, 'cheque_incoming'
+        else:
+            journal, code = journal or cls.deposit_journal, 'cheque_outgoing'
+        payments = cls.env['account.payment'].create([{
+            'partner_id': (partner or cls.cheque_partner).id,
+            'payment_type': payment_type,
+            'journal_id': journal.id,
+            'payment_method_line_id': cls._get_method_line(journal, payment_type, code).id,
+            'currency_id': (currency or cls.env.company.currency_id).id,
+            'date': cls.today,
+            'new_cheque_ids': [Command.create({
+                'name': 'T%07d' % next(CHEQUE_NUMBERS),
+                'bank_id': cls.cheque_bank.id,
+                'payment_date': fields.Date.add(cls.today, days=index),
+                'amount': amount,
+            })],
+        } for index, amount in enumerate(amounts)])
+        if post:
+            payments.action_post()
+        return payments.new_cheque_ids
@@ -0,0 +1,65 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo.tests.common import tagged
+from odoo import Command
+
+from .cheque_common import ChequeTestCommon
+
+
+@tagged('post_install', '-at_install')
+class TestChequeAudit(ChequeTestCommon):
+
+    def _findings(self, rule):
+        return self.env['account.cheque']._audit_outstanding_consistency().get(rule, [])
+
+    def test_missing_outstanding(self):
+        deposited, registered = self._create_cheques([100.0, 200.0])
+        deposited.action_deposit(self.deposit_journal.id, self.today)
+        (deposited | registered).write({'outstanding_line_id': False})
+
+        findings = self._findings('missing_outstanding')
+        self.assertIn(deposited.id, findings)
+        self.assertNotIn(registered.id, findings, "Only deposited cheques need an outstanding line")
+
+    def test_stale_outstanding(self):
+        cheques = self._create_cheques([100.0, 200.0, 300.0, 400.0])
+        receipt_lines = cheques.outstanding_line_id
+        cheques._batch_deposit(self.deposit_journal, self.today)
+        self.assertTrue(all(receipt_lines.mapped('reconciled')))
+        self.assertFalse(set(self._findings('stale_outstanding')) & set(cheques.ids))
+
+        # Point every cheque back to its receipt line, reconciled by the deposit
+        for cheque, line, state in zip(cheques, receipt_lines, ('register', 'deposit', 'bounce', 'cashed')):
+            cheque.write({'state': state, 'outstanding_line_id': line.id})
+
+        findings = self._findings('stale_outstanding')
+        for cheque in cheques[:3]:
+            self.assertIn(cheque.id, findings, "A %s cheque keeps an open line" % cheque.state)
+        self.assertNotIn(cheques[3].id, findings, "The line of a cashed cheque is reconciled")
+
+    def test_unposted_outstanding(self):
+        registered, voided = self._create_cheques([100.0, 200.0])
+        draft_move = self.env['account.move'].create({
+            'journal_id': self.deposit_journal.id,
+            'line_ids': [
+                Command.create({'account_id': self.collection_account.id, 'debit': 300.0}),
+                Command.create({'account_id': self.company_data['default_account_revenue'].id, 'credit': 300.0}),
+            ],
+        })
+        registered.outstanding_line_id = draft_move.line_ids[0]
+        voided.write({'state': 'voided', 'outstanding_line_id': draft_move.line_ids[0].id})
+
+        findings = self._findings('unposted_outstanding')
+        self.assertIn(registered.id, findings)
+        self.assertNotIn(voided.id, findings)
+
+        draft_move.action_post()
+        self.assertNotIn(registered.id, self._findings('unposted_outstanding'))
+
+    def test_record_findings(self):
+        cheques = self._create_cheques([100.0, 200.0])
+        audits = self.env['account.cheque.audit']._record_findings({'stale_outstanding': cheques.ids})
+        self.assertEqual(len(audits), 3, "One result per rule, even without findings")
+        stale = audits.filtered(lambda a: a.rule == 'stale_outstanding')
+        self.assertEqual(stale.cheque_count, 2)
+        self.assertEqual(stale.cheque_ids, cheques)
+        self.assertEqual(sum(audits.mapped('cheque_count')), 2)
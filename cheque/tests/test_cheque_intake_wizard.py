@@ -0,0 +1,80 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+import base64
+
+from odoo.tests.common import tagged
+
+from .cheque_common import ChequeTestCommon
+
+
+@tagged('post_install', '-at_install')
+class TestChequeIntakeWizard(ChequeTestCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._get_method_line(cls.cheque_journal, 'inbound', 'cheque_incoming')
+        cls.env['res.lang']._activate_lang('tr_TR')
+
+    def _import(self, lines, **values):
+        wizard = self.env['cheque.intake.wizard'].create({
+            'file': base64.b64encode('\n'.join(lines).encode()),
+            'filename': 'cheques.csv',
+            'journal_id': self.cheque_journal.id,
+            'partner_id': self.cheque_partner.id,
+            **values,
+        })
+        wizard.action_import()
+        return wizard
+
+    def test_parse_amount(self):
+        wizard = self.env['cheque.intake.wizard']
+        for lang, value, amount in (
+            ('en_US', '1,234.56', 1234.56),
+            ('tr_TR', '1.234,56', 1234.56),
+            ('en_US', '1.234', 1.234),
+            ('tr_TR', '1.234', 1234.0),
+            ('tr_TR', '1,5', 1.5),
+            ('en_US', '1,234', 1234.0),
+            ('en_US', '1.234.567', 1234567.0),
+            ('tr_TR', '250', 250.0),
+        ):
+            with self.subTest(lang=lang, value=value):
+                self.env.user.lang = lang
+                self.assertEqual(wizard._parse_amount(value), amount)
+        for lang, value in (('tr_TR', '1.5'), ('en_US', '1,5'), ('en_US', '1,2345')):
+            with self.subTest(lang=lang, value=value):
+                self.env.user.lang = lang
+                with self.assertRaises(ValueError):
+                    wizard._parse_amount(value)
+
+    def test_import(self):
+        self.env.user.lang = 'tr_TR'
+        wizard = self._import([
+            'Cheque Number;Bank;Amount;Maturity;VAT',
+            '101;Cheque Bank;1.234,50;2030-01-15;',
+            '102;Cheque Bank;1.250;15.02.2030;',
+        ])
+
+        self.assertEqual(wizard.state, 'done')
+        self.assertRecordValues(wizard.cheque_ids.sorted('name'), [
+            {'name': '00000101', 'amount': 1234.5, 'state': 'register', 'partner_id': self.cheque_partner.id},
+            {'name': '00000102', 'amount': 1250.0, 'state': 'register', 'partner_id': self.cheque_partner.id},
+        ])
+
+    def test_import_errors_keep_file_row_numbers(self):
+        self.env.user.lang = 'tr_TR'
+        wizard = self._import([
+            'Cheque Number;Bank;Amount;Maturity;VAT',
+            '',
+            '201;Cheque Bank;100;2030-01-15;',
+            ';;;;',
+            '202;Unknown Bank;100;2030-01-15;',
+            '201;Cheque Bank;1.5;2030-01-15;',
+            ' ;Cheque Bank;100;2030-01-15;',
+        ])
+
+        self.assertEqual(len(wizard.cheque_ids), 1)
+        self.assertIn('Row 5: unknown bank "Unknown Bank"', wizard.error_report)
+        self.assertIn('Row 6: cheque number 00000201 is repeated in the file, invalid amount "1.5"', wizard.error_report)
+        self.assertIn('Row 7: missing cheque number', wizard.error_report)
+        self.assertNotIn('00000000', wizard.error_report)
@@ -0,0 +1,231 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+"""Load test of the cheque lifecycle.
+
+Received and issued cheques are generated across several journals and
+currencies, then driven through portfolio, deposit, bounce, return and
+collection, half of them with the bulk state wizard and half with the
+individual actions. Cheques per second, queries per cheque and the time spent
+waiting on row locks are reported per phase as JSON.
+
+The benchmark is not part of the standard test run, launch it with::
+
+    odoo-bin -d db -i cheque --test-tags cheque_benchmark
+
+``CHEQUE_BENCHMARK_SIZE`` sets the number of received cheques (issued ones are
+half of it), ``CHEQUE_BENCHMARK_GROUPING`` the wizard entry grouping (cheque or
+journal) and ``CHEQUE_BENCHMARK_OUTPUT`` a file to write the report to. Lock
+waits only show up when other workers use the same database meanwhile.
+"""
+import json
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from odoo.sql_db import Cursor
+from odoo.tests.common import tagged
+from odoo import fields, Command
+
+from .cheque_common import ChequeTestCommon
+
+_logger = logging.getLogger(__name__)
+
+# Statements that can wait on a lock held by another transaction
+LOCK_QUERY_RE = re.compile(r'\bFOR\s+(NO\s+KEY\s+)?UPDATE\b|\bFOR\s+SHARE\b|\bLOCK\s+TABLE\b', re.IGNORECASE)
+
+
+@tagged('post_install', '-at_install', '-standard', 'cheque_benchmark')
+class TestChequeLifecycleBenchmark(ChequeTestCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.size = int(os.environ.get('CHEQUE_BENCHMARK_SIZE', 200))
+        cls.grouping = os.environ.get('CHEQUE_BENCHMARK_GROUPING', 'cheque')
+        cls.currencies = [
+            cls.env.company.currency_id,
+            cls.setup_other_currency('EUR'),
+            cls.setup_other_currency('CHF', rates=[('2016-01-01', 2.0)]),
+        ]
+        cls.banks = cls.env['res.bank'].create([{'name': 'Bank %s' % i} for i in range(3)])
+        cls.partners = cls.env['res.partner'].create([{'name': 'Cheque Partner %s' % i} for i in range(10)])
+        cls.cheque_journals = cls.env['account.journal'].create([
+            {
+                'name': 'Cheques %s' % i,
+                'code': 'CHQ%s' % i,
+                'type': 'cash',
+                'cheque_collection_account_id': cls.env['account.account'].create({
+                    'name': 'Cheques Under Collection %s' % i,
+                    'code': '10199%s' % i,
+                    'account_type': 'asset_current',
+                    'reconcile': True,
+                }).id,
+            }
+            for i in range(2)
+        ])
+        cls.bank_journals = cls.env['account.journal'].create([
+            {'name': 'Cheque Bank %s' % i, 'code': 'CHB%s' % i, 'type': 'bank'}
+            for i in range(2)
+        ])
+
+    def _prepare_payment_vals(self, count, payment_type, journals, code, prefix):
+        today = fields.Date.context_today(self.env.user)
+        vals_list = []
+        for i in range(count):
+            journal = journals[i % len(journals)]
+            vals_list.append({
+                'partner_id': self.partners[i % len(self.partners)].id,
+                'payment_type': payment_type,
+                'journal_id': journal.id,
+                'payment_method_line_id': self._get_method_line(journal, payment_type, code).id,
+                'currency_id': self.currencies[i % len(self.currencies)].id,
+                'date': today,
+                'new_cheque_ids': [Command.create({
+                    'name': '%s%07d' % (prefix, i),
+                    'bank_id': self.banks[i % len(self.banks)].id,
+                    'payment_date': fields.Date.add(today, days=i % 120),
+                    'amount': 100.0 + i,
+                })],
+            })
+        return vals_list
+
+    @contextmanager
+    def _lock_timer(self):
+        """Sum the time spent in statements that acquire row or table locks."""
+        timer = {'lock_wait': 0.0}
+        execute = Cursor.execute
+
+        def timed_execute(cr, query, params=None, log_exceptions=True):
+            if not LOCK_QUERY_RE.search(str(getattr(query, 'code', query))):
+                return execute(cr, query, params, log_exceptions)
+            start = time.perf_counter()
+            try:
+                return execute(cr, query, params, log_exceptions)
+            finally:
+                timer['lock_wait'] += time.perf_counter() - start
+
+        with patch.object(Cursor, 'execute', timed_execute):
+            yield timer
+
+    def _measure(self, function, cheque_count):
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = self.env.cr.sql_log_count
+        with self._lock_timer() as timer:
+            start = time.perf_counter()
+            function()
+            self.env.flush_all()
+            duration = time.perf_counter() - start
+        queries = self.env.cr.sql_log_count - queries
+        return {
+            'cheques': cheque_count,
+            'duration': duration,
+            'cheques_per_second': cheque_count / duration if duration else 0.0,
+            'queries_per_cheque': queries / cheque_count if cheque_count else 0.0,
+            'lock_wait': timer['lock_wait'],
+        }
+
+    def _run_wizard(self, cheques, state_xmlid, **line_vals):
+        """Apply a transition through the bulk state wizard."""
+        wizard = self.env['cheque.bulk.state.update'].create({
+            'move_grouping': self.grouping,
+            'line_ids': [Command.create({
+                'cheque_ids': [Command.set(cheques.ids)],
+                'current_state': cheques[:1].state,
+                'state_id': self.env.ref(state_xmlid).id,
+                **line_vals,
+            })],
+        })
+        wizard.action_confirm()
+
+    def _split(self, cheques):
+        """Half of the cheques go through the wizard, half through the actions."""
+        return cheques[::2], cheques[1::2]
+
+    def test_cheque_lifecycle_benchmark(self):
+        today = fields.Date.context_today(self.env.user)
+        bank_journal = self.bank_journals[0]
+        bank_account = bank_journal.default_account_id
+        report = {}
+        payments = self.env['account.payment']
+
+        def receive():
+            nonlocal payments
+            payments = self.env['account.payment'].create(self._prepare_payment_vals(
+                self.size, 'inbound', self.cheque_journals, 'cheque_incoming', 'R'))
+            payments.action_post()
+
+        report['portfolio'] = self._measure(receive, self.size)
+        received = payments.new_cheque_ids
+
+        def issue():
+            nonlocal payments
+            payments = self.env['account.payment'].create(self._prepare_payment_vals(
+                self.size // 2, 'outbound', self.bank_journals, 'cheque_outgoing', 'I'))
+            payments.action_post()
+
+        report['issue'] = self._measure(issue, self.size // 2)
+        issued = payments.new_cheque_ids
+
+        def deposit():
+            bulk, single = self._split(received)
+            self._run_wizard(bulk, 'cheque.state_deposit', deposit_journal_id=bank_journal.id, deposit_date=today)
+            for cheque in single:
+                cheque.action_deposit(bank_journal.id, today)
+
+        report['deposit'] = self._measure(deposit, len(received))
+
+        # One cheque out of five bounces and is returned to the portfolio
+        bouncing = received[::5]
+
+        def bounce():
+            bulk, single = self._split(bouncing)
+            self._run_wizard(bulk, 'cheque.state_bounce')
+            for cheque in single:
+                cheque.action_bounce()
+
+        report['bounce'] = self._measure(bounce, len(bouncing))
+
+        def give_back():
+            for cheque in bouncing:
+                cheque.action_reset_to_register()
+
+        report['return'] = self._measure(give_back, len(bouncing))
+
+        collected = received - bouncing
+
+        def collect():
+            bulk, single = self._split(collected)
+            self._run_wizard(bulk, 'cheque.state_cashed', bank_account_id=bank_account.id, cashed_date=today)
+            for cheque in single:
+                cheque.action_cash(bank_account.id, today)
+            for cheque in issued:
+                cheque.action_cash(cheque.original_journal_id.default_account_id.id, today)
+
+        report['collection'] = self._measure(collect, len(collected) + len(issued))
+
+        phases = list(report.values())
+        duration = sum(phase['duration'] for phase in phases)
+        transitions = sum(phase['cheques'] for phase in phases)
+        report['total'] = {
+            'cheques': len(received) + len(issued),
+            'transitions': transitions,
+            'duration': duration,
+            'cheques_per_second': transitions / duration if duration else 0.0,
+            'queries_per_cheque': sum(phase['queries_per_cheque'] * phase['cheques'] for phase in phases) / transitions,
+            'lock_wait': sum(phase['lock_wait'] for phase in phases),
+            'grouping': self.grouping,
+        }
+
+        output = json.dumps(report, indent=2)
+        output_path = os.environ.get('CHEQUE_BENCHMARK_OUTPUT')
+        if output_path:
+            with open(output_path, 'w') as output_file:
+                output_file.write(output)
+        _logger.info('Cheque lifecycle benchmark:\n%s', output)
+
+        self.assertEqual(set(bouncing.mapped('state')), {'register'})
+        self.assertEqual(set(collected.mapped('state')), {'cashed'})
+        self.assertEqual(set(issued.mapped('state')), {'cashed'})
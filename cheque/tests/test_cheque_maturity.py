@@ -0,0 +1,59 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo.tests.common import tagged
+from odoo import fields, Command
+
+from .cheque_common import ChequeTestCommon
+
+
+@tagged('post_install', '-at_install')
+class TestChequeMaturity(ChequeTestCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.other_currency = cls.setup_other_currency('EUR')
+        cls.other_bank = cls.env['res.bank'].create({'name': 'Other Cheque Bank'})
+        cls.other_partner = cls.env['res.partner'].create({
+            'name': 'Other Cheque Partner',
+            'bank_ids': [Command.create({'acc_number': 'CHQ-0001', 'bank_id': cls.other_bank.id})],
+        })
+
+    def _get_rows(self, cheque):
+        maturity = self.env['account.cheque.maturity']
+        company_id, week = next(iter(maturity._get_keys(cheque)))
+        return maturity.search([('company_id', '=', company_id), ('maturity_week', '=', week)])
+
+    def test_refresh_on_cheque_changes(self):
+        cheque = self._create_cheques([100.0])
+        rows = self._get_rows(cheque)
+        self.assertRecordValues(rows, [{'state': 'register', 'amount': 100.0, 'cheque_count': 1}])
+
+        cheque.action_deposit(self.deposit_journal.id, self.today)
+        self.assertRecordValues(self._get_rows(cheque), [{'state': 'deposit', 'amount': 100.0, 'cheque_count': 1}])
+
+        old_rows = self._get_rows(cheque)
+        cheque.payment_date = fields.Date.add(self.today, years=1)
+        self.assertFalse(old_rows.exists(), "The old maturity week is emptied")
+        self.assertEqual(self._get_rows(cheque).amount, 100.0)
+
+    def test_refresh_on_payment_changes(self):
+        cheque = self._create_cheques([100.0], post=False)
+        cheque.state = 'register'
+        self.assertRecordValues(self._get_rows(cheque), [{
+            'currency_id': self.env.company.currency_id.id,
+            'bank_id': self.cheque_bank.id,
+        }])
+
+        # The currency is related and the bank computed from the payment partner
+        cheque.payment_id.write({'currency_id': self.other_currency.id, 'partner_id': self.other_partner.id})
+        self.assertRecordValues(self._get_rows(cheque), [{
+            'currency_id': self.other_currency.id,
+            'bank_id': self.other_bank.id,
+            'amount': 100.0,
+        }])
+
+    def test_draft_cheques_skip_refresh(self):
+        cheque = self._create_cheques([100.0], post=False)
+        self.assertFalse(self._get_rows(cheque))
+        cheque.payment_id.currency_id = self.other_currency
+        self.assertFalse(self._get_rows(cheque))
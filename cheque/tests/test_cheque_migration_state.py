@@ -0,0 +1,83 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from unittest.mock import patch
+
+from odoo.tests.common import tagged
+
+from .cheque_common import ChequeTestCommon
+
+
+@tagged('post_install', '-at_install')
+class TestChequeMigrationState(ChequeTestCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # A deposited cheque that lost its outstanding line, fixed by _migrate_1_0_8
+        cls.cheque = cls._create_cheques([100.0])
+        cls.cheque.action_deposit(cls.deposit_journal.id, cls.today)
+        cls.collection_line = cls.cheque.outstanding_line_id
+        cls.cheque.outstanding_line_id = False
+        cls.migration = cls.env['cheque.migration.state']
+
+    def test_dry_run(self):
+        report = self.migration.action_dry_run(chunk_size=2)
+
+        self.assertEqual(list(report), [step.__name__ for step in self.migration._get_steps()])
+        self.assertEqual(report['_migrate_1_0_8'], 1)
+        # The later steps see the cheque fixed by _migrate_1_0_8
+        self.assertEqual(sum(report.values()), 1)
+        self.assertFalse(self.cheque.outstanding_line_id, "Nothing is applied")
+        self.assertFalse(self.migration.search([]), "Nothing is recorded")
+
+    def _run_cron(self, chunk_size=1):
+        cheque_count = self.env['account.cheque'].search_count([])
+        for _run in range(len(self.migration._get_steps()) * (cheque_count + 1)):
+            self.migration._cron_run_steps(chunk_size=chunk_size)
+
+    def test_run_steps_from_cron(self):
+        self.migration._schedule_steps()
+        progress = self.migration.search([])
+        self.assertEqual(set(progress.mapped('state')), {'running'})
+        self.assertFalse(self.cheque.outstanding_line_id, "The upgrade itself applies nothing")
+
+        # The first step runs over all cheques before the second one starts
+        self.migration._cron_run_steps(chunk_size=1)
+        self.assertEqual(progress[0].chunk_count, 1)
+        self.assertFalse(progress[1:].filtered('chunk_count'))
+
+        self._run_cron()
+
+        self.assertEqual(set(progress.mapped('state')), {'done'})
+        self.assertEqual(self.cheque.outstanding_line_id, self.collection_line)
+        self.assertEqual(progress.filtered(lambda p: p.step == '_migrate_1_0_8').affected_count, 1)
+
+        # Steps that already ran are not scheduled again
+        self.migration._schedule_steps()
+        self.assertEqual(self.migration.search([]), progress)
+        self.assertEqual(set(progress.mapped('state')), {'done'})
+
+    def test_failing_step(self):
+        self.migration._schedule_steps()
+        progress = self.migration.search([])
+        steps = self.migration._get_steps()
+
+        def failing_step(env, scope):
+            env['account.cheque'].search(scope).write({'state': 'cashed'})
+            raise ValueError("Broken cheque")
+
+        with patch.object(type(self.migration), '_get_steps', lambda self: [failing_step, *steps[1:]]):
+            progress[0].step = 'failing_step'
+            self._run_cron()
+
+        self.assertEqual(progress[0].state, 'error')
+        self.assertIn("Broken cheque", progress[0].error)
+        self.assertFalse(progress[0].chunk_count)
+        self.assertEqual(self.cheque.state, 'deposit', "The failing chunk is rolled back")
+        self.assertEqual(set(progress[1:].mapped('state')), {'running'}, "The next steps wait")
+        self.assertFalse(progress[1:].filtered('chunk_count'))
+
+        progress[0].step = steps[0].__name__
+        progress.action_retry()
+        self._run_cron()
+        self.assertEqual(set(progress.mapped('state')), {'done'})
+        self.assertEqual(self.cheque.outstanding_line_id, self.collection_line)
@@ -0,0 +1,52 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo.tests.common import tagged
+
+from .cheque_common import ChequeTestCommon
+
+
+@tagged('post_install', '-at_install')
+class TestChequePartnerExposure(ChequeTestCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # One company currency unit is two EUR
+        cls.other_currency = cls.setup_other_currency('EUR', rates=[('2016-01-01', 2.0)])
+        cls.other_partner = cls.env['res.partner'].create({'name': 'Other Cheque Partner'})
+
+    def _get_rows(self, partner):
+        return self.env['account.cheque.partner.exposure'].search([('partner_id', '=', partner.id)])
+
+    def test_refresh_on_cheque_changes(self):
+        cheques = self._create_cheques([100.0, 200.0])
+        self.assertEqual(sum(self._get_rows(self.cheque_partner).mapped('amount')), 300.0)
+
+        cheques[0].action_deposit(self.deposit_journal.id, self.today)
+        self.assertEqual(
+            sorted(self._get_rows(self.cheque_partner).mapped('status')),
+            ['deposited', 'portfolio'],
+        )
+
+        cheques[0].action_cash(self.deposit_journal.default_account_id.id, self.today)
+        self.assertRecordValues(self._get_rows(self.cheque_partner), [{'status': 'portfolio', 'amount': 200.0}])
+
+    def test_amount_in_company_currency(self):
+        cheque = self._create_cheques([100.0], currency=self.other_currency)
+        self.assertRecordValues(self._get_rows(self.cheque_partner), [{
+            'currency_id': self.other_currency.id,
+            'amount': 100.0,
+            'amount_company': 50.0,
+        }])
+
+        # Legacy cheques without outstanding line use their share of the payment
+        cheque.outstanding_line_id = False
+        self.assertRecordValues(self._get_rows(self.cheque_partner), [{'amount': 100.0, 'amount_company': 50.0}])
+
+    def test_refresh_on_payment_partner_change(self):
+        cheque = self._create_cheques([100.0], post=False)
+        cheque.state = 'register'
+        self.assertEqual(self._get_rows(self.cheque_partner).amount, 100.0)
+
+        cheque.payment_id.partner_id = self.other_partner
+        self.assertFalse(self._get_rows(self.cheque_partner))
+        self.assertEqual(self._get_rows(self.other_partner).amount, 100.0)
@@ -0,0 +1,76 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo.tests.common import tagged
+
+from .cheque_common import ChequeTestCommon
+
+
+@tagged('post_install', '-at_install')
+class TestMisCashFlow(ChequeTestCommon):
+
+    def _cash_flow_ids(self, line):
+        self.env.flush_all()
+        return set(self.env['mis.cash_flow'].search([('move_line_id', '=', line.id)]).ids)
+
+    def _cheque_row_id(self, cheque):
+        return -(cheque.id + 2000000000)
+
+    def test_open_cheque_replaces_its_line(self):
+        cheque = self._create_cheques([150.0])
+        line = cheque.outstanding_line_id
+
+        self.assertEqual(self._cash_flow_ids(line), {self._cheque_row_id(cheque)})
+        row = self.env['mis.cash_flow'].browse(self._cheque_row_id(cheque))
+        self.assertEqual(row.debit, 150.0)
+        self.assertEqual(row.date, cheque.payment_date)
+
+        # A closed cheque hands the line back to the journal items branch
+        cheque.state = 'voided'
+        self.assertEqual(self._cash_flow_ids(line), {-line.id})
+
+    def test_materialized_refresh_deferred_to_cron(self):
+        cash_flow = self.env['mis.cash_flow']
+        cash_flow._set_materialized(True)
+        cron = self.env.ref('cheque.ir_cron_refresh_mis_cash_flow')
+        triggers = self.env['ir.cron.trigger'].search([('cron_id', '=', cron.id)])
+
+        cheque = self._create_cheques([150.0])
+        line = cheque.outstanding_line_id
+
+        # The user's transaction only flags the view, once
+        new_triggers = self.env['ir.cron.trigger'].search([('cron_id', '=', cron.id)]) - triggers
+        self.assertEqual(len(new_triggers), 1)
+        self.assertFalse(self._cash_flow_ids(line), "The view is refreshed by the cron only")
+
+        cash_flow._cron_refresh_materialized()
+        self.assertEqual(self._cash_flow_ids(line), {self._cheque_row_id(cheque)})
+
+        cash_flow._set_materialized(False)
+        self.assertEqual(self._cash_flow_ids(line), {self._cheque_row_id(cheque)})
+
+    def test_materialized_refresh_on_forecast_lines(self):
+        cash_flow = self.env['mis.cash_flow']
+        cash_flow._set_materialized(True)
+        cron = self.env.ref('cheque.ir_cron_refresh_mis_cash_flow')
+        triggers = self.env['ir.cron.trigger'].search([('cron_id', '=', cron.id)])
+
+        forecast_line = self.env['mis.cash_flow.forecast_line'].create({
+            'date': self.today,
+            'account_id': self.collection_account.id,
+            'name': 'Forecast',
+            'balance': 500.0,
+        })
+        forecast_line.balance = 600.0
+
+        new_triggers = self.env['ir.cron.trigger'].search([('cron_id', '=', cron.id)]) - triggers
+        self.assertEqual(len(new_triggers), 1)
+        self.env.flush_all()
+        self.assertFalse(cash_flow.search([('line_type', '=', 'forecast_line'), ('id', '=', forecast_line.id)]))
+
+        cash_flow._cron_refresh_materialized()
+        row = cash_flow.search([('line_type', '=', 'forecast_line'), ('id', '=', forecast_line.id)])
+        self.assertEqual(row.debit, 600.0)
+
+        forecast_line.unlink()
+        cash_flow._cron_refresh_materialized()
+        self.assertFalse(cash_flow.search([('line_type', '=', 'forecast_line'), ('id', '=', forecast_line.id)]))
+        cash_flow._set_materialized(False)
@@ -0,0 +1,80 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from unittest.mock import patch
+
+from odoo.tests.common import tagged
+
+from .cheque_common import ChequeTestCommon
+
+
+@tagged('post_install', '-at_install')
+class TestTransitionMoves(ChequeTestCommon):
+
+    def _assert_deposited(self, cheques):
+        for cheque in cheques:
+            line = cheque.outstanding_line_id
+            self.assertEqual(cheque.state, 'deposit')
+            self.assertEqual(line.transition_cheque_id, cheque)
+            self.assertEqual(line.account_id, self.collection_account)
+            self.assertEqual(line.debit, cheque.amount)
+            self.assertEqual(line.date_maturity, cheque.payment_date)
+
+    def test_batch_deposit_grouped_by_journal(self):
+        cheques = self._create_cheques([100.0, 250.0, 75.0])
+        receipt_lines = cheques.outstanding_line_id
+
+        failures = cheques._batch_deposit(self.deposit_journal, self.today, grouping='journal')
+
+        self.assertFalse(failures)
+        move = cheques.outstanding_line_id.move_id
+        self.assertEqual(len(move), 1, "All the cheques share one entry")
+        self.assertEqual(len(move.line_ids), 6)
+        self.assertEqual(move.state, 'posted')
+        self._assert_deposited(cheques)
+        # The reconcile plan closes every receipt line with the credit line of its own cheque
+        for receipt_line, cheque in zip(receipt_lines, cheques):
+            self.assertTrue(receipt_line.reconciled)
+            credit_line = move.line_ids.filtered(lambda l: l.transition_cheque_id == cheque and l.credit)
+            self.assertEqual(receipt_line.full_reconcile_id, credit_line.full_reconcile_id)
+
+    def test_batch_deposit_grouped_by_cheque(self):
+        cheques = self._create_cheques([100.0, 250.0, 75.0])
+
+        failures = cheques._batch_deposit(self.deposit_journal, self.today, grouping='cheque')
+
+        self.assertFalse(failures)
+        self.assertEqual(len(cheques.outstanding_line_id.move_id), 3)
+        self._assert_deposited(cheques)
+
+    def test_batch_deposit_refreshes_reports_once(self):
+        cheques = self._create_cheques([100.0, 250.0, 75.0])
+        exposure = self.env['account.cheque.partner.exposure']
+        maturity = self.env['account.cheque.maturity']
+
+        with patch.object(type(exposure), '_refresh_partners', autospec=True, side_effect=type(exposure)._refresh_partners) as refresh_partners, \
+                patch.object(type(maturity), '_refresh_keys', autospec=True, side_effect=type(maturity)._refresh_keys) as refresh_keys:
+            cheques._batch_deposit(self.deposit_journal, self.today, grouping='cheque')
+
+        self.assertEqual(refresh_partners.call_count, 1)
+        self.assertEqual(refresh_keys.call_count, 1)
+        self._assert_deposited(cheques)
+
+    def test_batch_failure_rolls_back_to_single_cheques(self):
+        deprecated_account = self.collection_account.copy({'code': '101981', 'deprecated': True})
+        failing_journal = self.cheque_journal.copy({
+            'code': 'CHF',
+            'cheque_collection_account_id': deprecated_account.id,
+        })
+        cheques = self._create_cheques([100.0, 250.0])
+        failing = self._create_cheques([75.0], journal=failing_journal)
+        failing_line = failing.outstanding_line_id
+
+        failures = (cheques | failing)._batch_deposit(self.deposit_journal, self.today, grouping='journal')
+
+        self.assertEqual(list(failures), failing.ids)
+        self._assert_deposited(cheques)
+        self.assertEqual(len(cheques.outstanding_line_id.move_id), 2, "The cheques are replayed one by one")
+        # Nothing of the failed batch survives the savepoint
+        self.assertFalse(self.env['account.move.line'].search([('transition_cheque_id', '=', failing.id)]))
+        self.assertEqual(failing.state, 'register')
+        self.assertEqual(failing.outstanding_line_id, failing_line)
+        self.assertFalse(failing_line.reconciled)
@@ -0,0 +1,46 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo.tests.common import tagged
+
+from .cheque_common import ChequeTestCommon
+
+
+@tagged('post_install', '-at_install')
+class TestTransitionStat(ChequeTestCommon):
+
+    def _new_stats(self, action):
+        return self.env['account.cheque.transition.stat'].search([('action', '=', action)]) - self.stats
+
+    def setUp(self):
+        super().setUp()
+        self.stats = self.env['account.cheque.transition.stat'].search([])
+
+    def test_disabled_by_default(self):
+        cheque = self._create_cheques([100.0])
+        cheque.action_deposit(self.deposit_journal.id, self.today)
+        self.assertEqual(cheque.state, 'deposit')
+        self.assertFalse(self._new_stats('deposit'))
+
+    def test_tracked_actions(self):
+        self.env['ir.config_parameter'].sudo().set_param('cheque.track_transitions', True)
+        cheques = self._create_cheques([100.0, 200.0, 300.0, 400.0])
+        cheque, batch = cheques[0], cheques[1:]
+
+        cheque.action_deposit()
+        self.assertFalse(self._new_stats('deposit'), "Opening the wizard is not measured")
+
+        cheque.action_deposit(self.deposit_journal.id, self.today)
+        self.assertRecordValues(self._new_stats('deposit'), [{
+            'journal_id': self.deposit_journal.id,
+            'company_id': self.env.company.id,
+            'cheque_count': 1,
+            'move_count': 1,
+            'line_count': 2,
+        }])
+
+        self.stats |= self._new_stats('deposit')
+        batch._batch_deposit(self.deposit_journal, self.today, grouping='journal')
+        self.assertRecordValues(self._new_stats('deposit'), [{
+            'cheque_count': 3,
+            'move_count': 1,
+            'line_count': 6,
+        }])
@@ -6,3 +6,4 @@ from . import cheque_cash_wizard
 from . import cheque_bulk_state_update
 from . import cheque_deposit_wizard
 from . import cheque_transfer_wizard
+from . import cheque_intake_wizard
@@ -21,6 +21,17 @@ class ChequeBulkStateUpdate(models.TransientModel):
         string='Update Lines',
         required=True
     )
+    move_grouping = fields.Selection(
+        selection=[
+            ('cheque', 'One Entry per Cheque'),
+            ('journal', 'One Entry per Journal'),
+        ],
+        string='Journal Entries',
+        default='cheque',
+        required=True,
+        help='Create one journal entry per cheque, or a single entry per journal and date '
+             'holding the lines of all its cheques.'
+    )
 
     @api.model
     def default_get(self, fields_list):
@@ -178,6 +189,7 @@ class ChequeBulkStateUpdate(models.TransientModel):
         self._validate_all_operations()
 
         updated_cheques = self.env['account.cheque']
+        failures = {}
 
         for line in self.line_ids:
             if not line.cheque_ids:
@@ -185,39 +197,38 @@ class ChequeBulkStateUpdate(models.TransientModel):
 
             # Use appropriate action method based on state
             if line.state == 'cashed':
-                # Cash each cheque using the model's action_cash method
-                for cheque in line.cheque_ids:
-                    cheque.action_cash(line.bank_account_id.id, line.cashed_date)
+                line_failures = line.cheque_ids._batch_cash(line.bank_account_id, line.cashed_date, self.move_grouping)
             elif line.state == 'voided':
                 # Void/return creates journal entries to reverse outstanding line
                 line.cheque_ids.action_void()
+                line_failures = {}
             elif line.state == 'deposit':
-                # Deposit action - creates accounting move
-                for cheque in line.cheque_ids:
-                    cheque.action_deposit(
-                        bank_journal_id=line.deposit_journal_id.id,
-                        deposit_date=line.deposit_date
-                    )
+                line_failures = line.cheque_ids._batch_deposit(line.deposit_journal_id, line.deposit_date, self.move_grouping)
             elif line.state == 'bounce':
-                # Bounce action
-                for cheque in line.cheque_ids:
-                    cheque.action_bounce()
+                line_failures = line.cheque_ids._batch_bounce(self.move_grouping)
             else:
                 # Simple state update for other states
                 line.cheque_ids.write({'state': line.state})
+                line_failures = {}
 
-            updated_cheques |= line.cheque_ids
+            failures.update(line_failures)
+            updated_cheques |= line.cheque_ids.filtered(lambda c: c.id not in line_failures)
 
-        # Send success notification
+        # Send notification, listing the cheques that could not be processed
         message = _('%s cheque(s) updated successfully.') % len(updated_cheques)
+        if failures:
+            failed_cheques = self.env['account.cheque'].browse(list(failures))
+            message += '\n' + _('%s cheque(s) failed:') % len(failed_cheques) + '\n' + '\n'.join(
+                '- %s: %s' % (cheque.name, failures[cheque.id]) for cheque in failed_cheques
+            )
         self.env['bus.bus']._sendone(
             self.env.user.partner_id,
             'simple_notification',
             {
-                'type': 'success',
-                'title': _('Success'),
+                'type': 'warning' if failures else 'success',
+                'title': _('Partially Processed') if failures else _('Success'),
                 'message': message,
-                'sticky': False,
+                'sticky': bool(failures),
             }
         )
 
@@ -305,13 +316,10 @@ class ChequeBulkStateUpdateLine(models.TransientModel):
         string='Available Cheques'
     )
 
-    available_cheque_ids = fields.Many2many(
-        'account.cheque',
-        relation='bulk_update_line_available_cheque_rel',
-        column1='line_id',
-        column2='cheque_id',
-        compute='_compute_available_cheque_ids',
-        string='Available Cheques'
+    available_cheque_domain = fields.Binary(
+        compute='_compute_available_cheque_domain',
+        readonly=True,
+        store=False,
     )
 
     @api.depends('current_state')
@@ -343,15 +351,10 @@ class ChequeBulkStateUpdateLine(models.TransientModel):
                 line.available_state_ids = all_states
 
     @api.depends('state', 'wizard_id.line_ids.cheque_ids', 'wizard_id.line_ids.state')
-    def _compute_available_cheque_ids(self):
-        """Compute available cheques based on state and excluding already selected ones"""
+    def _compute_available_cheque_domain(self):
+        """Domain of the cheques that can be selected, searched lazily by the client"""
         for line in self:
-            if not line.state:
-                line.available_cheque_ids = self.env['account.cheque']
-                continue
-
-            domain = line._get_allowed_domain()
-            line.available_cheque_ids = self.env['account.cheque'].search(domain)
+            line.available_cheque_domain = line._get_allowed_domain() if line.state else [('id', '=', False)]
 
     @api.depends('state', 'wizard_id.line_ids.cheque_ids')
     def _compute_allowed_cheque_count(self):
@@ -364,25 +367,12 @@ class ChequeBulkStateUpdateLine(models.TransientModel):
             domain = line._get_allowed_domain()
             line.allowed_cheque_count = self.env['account.cheque'].search_count(domain)
 
-    @api.onchange('state_id')
-    def _onchange_state_id(self):
-        """Return domain for cheque_ids based on selected state"""
-        result = {}
-
-        # Domain for cheque_ids
-        if self.state:
-            result['domain'] = {'cheque_ids': self._get_allowed_domain()}
-        else:
-            result['domain'] = {'cheque_ids': []}
-
-        return result
-
     def _get_allowed_domain(self):
         """Get domain for allowed cheques based on target state"""
         self.ensure_one()
 
-        # Base domain - only incoming cheques
-        base_domain = [('payment_method_code', '=', 'cheque_incoming')]
+        # Base domain - only incoming cheques (stored and indexed, unlike payment_method_code)
+        base_domain = [('payment_type', '=', 'inbound')]
 
         # State-specific domains based on button visibility conditions
         state_domains = {
@@ -412,8 +402,8 @@ class ChequeBulkStateUpdateLine(models.TransientModel):
         if not self.cheque_ids:
             return
 
-        # Check each cheque against allowed domain
-        allowed_domain = self._get_allowed_domain()
+        # Check the selected cheques against allowed domain
+        allowed_domain = self._get_allowed_domain() + [('id', 'in', self.cheque_ids.ids)]
         allowed_cheques = self.env['account.cheque'].search(allowed_domain)
 
         invalid_cheques = self.cheque_ids - allowed_cheques
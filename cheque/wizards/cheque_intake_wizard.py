@@ -0,0 +1,332 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+import base64
+import csv
+import datetime
+import io
+import logging
+
+import stdnum
+
+from odoo import models, fields, api, Command, _
+from odoo.exceptions import UserError, ValidationError
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Accepted header names per column, compared lower-cased
+INTAKE_COLUMNS = {
+    'number': ('cheque number', 'number', 'cheque no', 'no'),
+    'bank': ('bank',),
+    'branch': ('branch',),
+    'account': ('account', 'account number'),
+    'amount': ('amount',),
+    'currency': ('currency',),
+    'maturity': ('maturity', 'maturity date', 'due date'),
+    'vat': ('drawer vat', 'vat', 'issuer vat'),
+}
+INTAKE_BATCH_SIZE = 100
+
+
+class ChequeIntakeWizard(models.TransientModel):
+    _name = 'cheque.intake.wizard'
+    _description = 'Bulk Cheque Intake'
+
+    file = fields.Binary(string='File', required=True, help='CSV or XLSX file with one cheque per row')
+    filename = fields.Char()
+    journal_id = fields.Many2one(
+        'account.journal',
+        string='Journal',
+        required=True,
+        domain="[('type', 'in', ('bank', 'cash')), ('company_id', '=', company_id)]",
+        help='Journal receiving the cheques, it needs the incoming cheque payment method'
+    )
+    date = fields.Date(
+        string='Receipt Date',
+        required=True,
+        default=fields.Date.context_today,
+    )
+    partner_id = fields.Many2one(
+        'res.partner',
+        string='Customer',
+        help='Customer handing over the cheques. When empty, each cheque is received '
+             'from the partner matching its drawer VAT.'
+    )
+    company_id = fields.Many2one(
+        'res.company',
+        required=True,
+        default=lambda self: self.env.company
+    )
+    state = fields.Selection(
+        selection=[('draft', 'Draft'), ('done', 'Done')],
+        default='draft',
+    )
+    cheque_ids = fields.Many2many('account.cheque', string='Created Cheques', readonly=True)
+    error_report = fields.Text(readonly=True)
+
+    # ------------------------------------------------------------------
+    # File reading
+    # ------------------------------------------------------------------
+
+    def _read_rows(self):
+        """Return the rows of the file as dicts keyed by INTAKE_COLUMNS, plus
+        'row_number' holding their row number in the file."""
+        self.ensure_one()
+        data = base64.b64decode(self.file)
+        if (self.filename or '').lower().endswith('.xlsx'):
+            if openpyxl is None:
+                raise UserError(_('Reading XLSX files requires the openpyxl Python library.'))
+            sheet = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True).active
+            rows = [list(row) for row in sheet.iter_rows(values_only=True)]
+        else:
+            text = data.decode('utf-8-sig')
+            try:
+                dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t')
+            except csv.Error:
+                dialect = csv.excel
+            rows = list(csv.reader(io.StringIO(text), dialect))
+        if not rows:
+            raise UserError(_('The file is empty.'))
+
+        aliases = {alias: key for key, names in INTAKE_COLUMNS.items() for alias in names}
+        header = [aliases.get(str(name or '').strip().lower()) for name in rows[0]]
+        missing = set(INTAKE_COLUMNS) - set(header) - {'branch', 'account', 'currency'}
+        if missing:
+            raise UserError(_('Missing column(s) in the file: %s') % ', '.join(sorted(missing)))
+        return [
+            dict({key: value for key, value in zip(header, row) if key}, row_number=row_number)
+            for row_number, row in enumerate(rows[1:], start=2)
+            if any(value not in (None, '') for value in row)
+        ]
+
+    @api.model
+    def _parse_amount(self, value):
+        """Parse an amount written with the separators of the user's language.
+
+        With both separators the last one is the decimal one (1.234,56 or
+        1,234.56). A single separator follows the language, so 1.234 is 1234
+        in Turkish and 1.234 in English, and values the language cannot
+        explain, such as 1.5 with a '.' thousands separator, are rejected.
+        """
+        if isinstance(value, (int, float)):
+            return float(value)
+        value = str(value or '').strip().replace(' ', '').replace('\xa0', '')
+        if ',' in value and '.' in value:
+            thousands = '.' if value.rfind(',') > value.rfind('.') else ','
+            return float(value.replace(thousands, '').replace(',', '.'))
+        separator = ',' if ',' in value else '.' if '.' in value else None
+        if not separator:
+            return float(value)
+        lang = self.env['res.lang']._lang_get(self.env.user.lang)
+        integer, *groups = value.split(separator)
+        if len(groups) == 1 and separator == (lang.decimal_point or '.'):
+            return float(value.replace(separator, '.'))
+        if (len(groups) > 1 or separator == lang.thousands_sep) and all(len(group) == 3 and group.isdigit() for group in groups):
+            return float(integer + ''.join(groups))
+        raise ValueError(value)
+
+    @api.model
+    def _parse_date(self, value):
+        if isinstance(value, datetime.datetime):
+            return value.date()
+        if isinstance(value, datetime.date):
+            return value
+        value = str(value or '').strip()
+        for date_format in ('%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y'):
+            try:
+                return datetime.datetime.strptime(value, date_format).date()
+            except ValueError:
+                continue
+        raise ValueError(value)
+
+    def _compact_vat(self, vat):
+        vat = str(vat or '').strip().upper()
+        country_code = self.company_id.country_id.code
+        if vat and country_code:
+            stdnum_vat = stdnum.util.get_cc_module(country_code, 'vat')
+            if vat.startswith(country_code):
+                vat = vat[len(country_code):]
+            if hasattr(stdnum_vat, 'compact'):
+                vat = stdnum_vat.compact(vat)
+        return vat
+
+    # ------------------------------------------------------------------
+    # Lookup maps
+    # ------------------------------------------------------------------
+
+    def _get_bank_map(self):
+        bank_map = {}
+        for bank in self.env['res.bank'].search_read([], ['name', 'bic']):
+            bank_map[bank['name'].strip().lower()] = bank['id']
+            if bank['bic']:
+                bank_map[bank['bic'].strip().lower()] = bank['id']
+        return bank_map
+
+    def _get_currency_map(self):
+        return {currency['name']: currency['id'] for currency in self.env['res.currency'].search_read([], ['name'])}
+
+    def _get_partner_map(self, vats):
+        if not vats:
+            return {}
+        country_code = self.company_id.country_id.code or ''
+        candidates = list(vats) + [country_code + vat for vat in vats]
+        partners = self.env['res.partner'].search([
+            ('vat', 'in', candidates),
+            ('company_id', 'in', (False, self.company_id.id)),
+        ])
+        return {self._compact_vat(partner.vat): partner.commercial_partner_id.id for partner in partners}
+
+    def _get_existing_numbers(self, payment_method_line, numbers):
+        """Cheque numbers already taken for this payment method, as enforced by the cheque_unique index."""
+        if not numbers:
+            return set()
+        self.env['account.cheque'].flush_model(['name', 'payment_method_line_id', 'outstanding_line_id'])
+        self.env.cr.execute("""
+            SELECT name
+              FROM account_cheque
+             WHERE payment_method_line_id = %s
+               AND name IN %s
+               AND outstanding_line_id IS NOT NULL
+        """, [payment_method_line.id, tuple(numbers)])
+        return {name for name, in self.env.cr.fetchall()}
+
+    # ------------------------------------------------------------------
+    # Import
+    # ------------------------------------------------------------------
+
+    def _prepare_payment_vals(self, rows):
+        """Validate the rows and return (payment vals by row number, errors by row number)."""
+        payment_method_line = self.journal_id.inbound_payment_method_line_ids.filtered(
+            lambda l: l.code == 'cheque_incoming'
+        )[:1]
+        if not payment_method_line:
+            raise UserError(_('Journal "%s" has no incoming cheque payment method.') % self.journal_id.display_name)
+
+        bank_map = self._get_bank_map()
+        currency_map = self._get_currency_map()
+        default_currency = self.journal_id.currency_id or self.company_id.currency_id
+        for row in rows:
+            number = str(row.get('number') or '').strip()
+            # A blank number must not be padded into a valid looking 00000000
+            row['number'] = number.zfill(8) if number else ''
+            row['vat'] = self._compact_vat(row.get('vat'))
+        partner_map = {} if self.partner_id else self._get_partner_map({row['vat'] for row in rows if row['vat']})
+        existing_numbers = self._get_existing_numbers(payment_method_line, {row['number'] for row in rows if row['number']})
+
+        vals_by_row, errors, seen_numbers = {}, {}, set()
+        for row in rows:
+            row_number = row['row_number']
+            row_errors = []
+            if not row['number']:
+                row_errors.append(_('missing cheque number'))
+            elif row['number'] in existing_numbers:
+                row_errors.append(_('cheque number %s already exists') % row['number'])
+            elif row['number'] in seen_numbers:
+                row_errors.append(_('cheque number %s is repeated in the file') % row['number'])
+            seen_numbers.add(row['number'])
+            bank_id = bank_map.get(str(row.get('bank') or '').strip().lower())
+            if not bank_id:
+                row_errors.append(_('unknown bank "%s"') % (row.get('bank') or ''))
+            currency_code = str(row.get('currency') or '').strip().upper()
+            currency_id = currency_map.get(currency_code) if currency_code else default_currency.id
+            if not currency_id:
+                row_errors.append(_('unknown currency "%s"') % currency_code)
+            try:
+                amount = self._parse_amount(row.get('amount'))
+                if amount <= 0:
+                    raise ValueError(amount)
+            except ValueError:
+                row_errors.append(_('invalid amount "%s"') % (row.get('amount') or ''))
+            try:
+                maturity = self._parse_date(row.get('maturity'))
+            except ValueError:
+                row_errors.append(_('invalid maturity date "%s"') % (row.get('maturity') or ''))
+            partner_id = self.partner_id.id or partner_map.get(row['vat'])
+            if not partner_id:
+                row_errors.append(_('no partner with VAT "%s"') % row['vat'])
+            if row_errors:
+                errors[row_number] = ', '.join(row_errors)
+                continue
+            vals_by_row[row_number] = {
+                'payment_type': 'inbound',
+                'partner_type': 'customer',
+                'partner_id': partner_id,
+                'journal_id': self.journal_id.id,
+                'payment_method_line_id': payment_method_line.id,
+                'currency_id': currency_id,
+                'date': self.date,
+                'amount': amount,
+                'new_cheque_ids': [Command.create({
+                    'name': row['number'],
+                    'bank_id': bank_id,
+                    'bank_branch': str(row.get('branch') or '').strip() or False,
+                    'bank_account_number': str(row.get('account') or '').strip() or False,
+                    'issuer_vat': row['vat'] or False,
+                    'payment_date': maturity,
+                    'amount': amount,
+                })],
+            }
+        return vals_by_row, errors
+
+    def _create_payments(self, vals_by_row):
+        """Create and post the payments in batches, falling back to one row at a
+        time when a batch fails. Return (payments, errors by row number)."""
+        payments = self.env['account.payment']
+        errors = {}
+        row_numbers = list(vals_by_row)
+        for start in range(0, len(row_numbers), INTAKE_BATCH_SIZE):
+            batch = row_numbers[start:start + INTAKE_BATCH_SIZE]
+            try:
+                with self.env.cr.savepoint():
+                    batch_payments = self.env['account.payment'].create([vals_by_row[n] for n in batch])
+                    batch_payments.action_post()
+                payments |= batch_payments
+                continue
+            except (UserError, ValidationError) as batch_error:
+                _logger.info("Cheque intake: batch of %d rows failed (%s), retrying row by row", len(batch), batch_error)
+            for row_number in batch:
+                try:
+                    with self.env.cr.savepoint():
+                        payment = self.env['account.payment'].create(vals_by_row[row_number])
+                        payment.action_post()
+                    payments |= payment
+                except (UserError, ValidationError) as error:
+                    errors[row_number] = str(error)
+        return payments, errors
+
+    def action_import(self):
+        self.ensure_one()
+        vals_by_row, errors = self._prepare_payment_vals(self._read_rows())
+        payments, creation_errors = self._create_payments(vals_by_row)
+        errors.update(creation_errors)
+        report = _('%s cheque(s) created.') % len(payments.new_cheque_ids)
+        if errors:
+            report += '\n' + _('%s row(s) rejected:') % len(errors) + '\n' + '\n'.join(
+                _('Row %(row)s: %(error)s', row=row_number, error=errors[row_number])
+                for row_number in sorted(errors)
+            )
+        self.write({
+            'state': 'done',
+            'cheque_ids': [Command.set(payments.new_cheque_ids.ids)],
+            'error_report': report,
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def action_open_cheques(self):
+        self.ensure_one()
+        return {
+            'name': _('Imported Cheques'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'account.cheque',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', self.cheque_ids.ids)],
+        }
@@ -0,0 +1,13 @@
+{
+    'name': 'Cheque Management - Financial Risk',
+    'version': '18.0.1.0.0',
+    'category': 'Accounting',
+    'summary': 'Count open received cheques in the partner financial risk',
+    'author': 'Yaser Akhras',
+    'website': 'https://www.yaserakhras.com',
+    'license': 'LGPL-3',
+    'depends': ['cheque', 'account_financial_risk'],
+    'data': ['views/res_partner_view.xml'],
+    'installable': True,
+    'auto_install': True,
+}
@@ -0,0 +1,66 @@
+from odoo import models, fields, api
+
+
+class ResPartner(models.Model):
+
+    _inherit = 'res.partner'
+
+    risk_cheque_include = fields.Boolean(
+        string='Include Open Cheques',
+        help='Full risk computation.\n'
+        'Received cheques of the partner in portfolio, deposited but not '
+        'cleared yet or bounced.',
+    )
+    risk_cheque_limit = fields.Monetary(
+        string='Limit In Open Cheques',
+        currency_field='risk_currency_id',
+        help='Set 0 if it is not locked',
+    )
+    risk_cheque = fields.Monetary(
+        compute='_compute_risk_cheque',
+        compute_sudo=True,
+        string='Total Open Cheques',
+        currency_field='risk_currency_id',
+        help='Received cheques of the partner in portfolio, deposited but not '
+        'cleared yet or bounced.',
+    )
+
+    @api.depends_context('company', 'allowed_company_ids')
+    def _compute_risk_cheque(self):
+        """Sum the maintained cheque exposure rows in the risk currency."""
+        groups = self.env['account.cheque.partner.exposure']._read_group(
+            self._get_risk_company_domain() + [('partner_id', 'in', self.commercial_partner_id.ids)],
+            ['partner_id', 'currency_id', 'company_id'],
+            ['amount:sum', 'amount_company:sum'],
+        )
+        today = fields.Date.context_today(self)
+        for partner in self:
+            amount = 0.0
+            for commercial_partner, currency, company, amount_currency, amount_company in groups:
+                if commercial_partner != partner.commercial_partner_id:
+                    continue
+                if currency == partner.risk_currency_id:
+                    amount += amount_currency
+                elif company.currency_id == partner.risk_currency_id:
+                    amount += amount_company
+                else:
+                    amount += currency._convert(amount_currency, partner.risk_currency_id, company, today, round=False)
+            partner.risk_cheque = amount
+
+    @api.model
+    def _risk_field_list(self):
+        res = super()._risk_field_list()
+        res.append(('risk_cheque', 'risk_cheque_limit', 'risk_cheque_include'))
+        return res
+
+    def _get_field_risk_model_domain(self, field_name):
+        if field_name == 'risk_cheque':
+            return 'account.cheque.partner.exposure', self._get_risk_company_domain() + [
+                ('partner_id', 'in', self.commercial_partner_id.ids),
+            ]
+        return super()._get_field_risk_model_domain(field_name)
+
+    def _get_financial_risk_lines(self):
+        res = super()._get_financial_risk_lines()
+        res.append((self.risk_cheque_include, self.risk_cheque, self._fields['risk_cheque'].string))
+        return res
@@ -0,0 +1 @@
+from . import test_cheque_financial_risk
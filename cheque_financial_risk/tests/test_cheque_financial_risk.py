@@ -0,0 +1,40 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo.addons.cheque.tests.cheque_common import ChequeTestCommon
+from odoo.tests.common import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestChequeFinancialRisk(ChequeTestCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env.user.groups_id |= cls.env.ref('account_financial_risk.group_account_financial_risk_manager')
+        # One company currency unit is two EUR
+        cls.other_currency = cls.setup_other_currency('EUR', rates=[('2016-01-01', 2.0)])
+        cls.contact = cls.env['res.partner'].create({'name': 'Cheque Contact', 'parent_id': cls.cheque_partner.id})
+        cls.cheque_partner.write({'risk_cheque_include': True, 'risk_cheque_limit': 120.0})
+
+    def test_risk_cheque(self):
+        self._create_cheques([100.0])
+        self._create_cheques([100.0], partner=self.contact, currency=self.other_currency)
+        self.env.invalidate_all()
+
+        # The EUR cheque counts for its company currency amount
+        self.assertRecordValues(self.cheque_partner, [{
+            'risk_cheque': 150.0,
+            'risk_total': 150.0,
+            'risk_exception': True,
+        }])
+        self.assertEqual(self.contact.risk_cheque, 150.0, "Contacts share the risk of their company")
+
+    def test_risk_cheque_closed(self):
+        cheque = self._create_cheques([100.0])
+        cheque.action_deposit(self.deposit_journal.id, self.today)
+        self.env.invalidate_all()
+        self.assertEqual(self.cheque_partner.risk_cheque, 100.0, "Deposited cheques are not cleared yet")
+
+        cheque.action_cash(self.deposit_journal.default_account_id.id, self.today)
+        self.env.invalidate_all()
+        self.assertEqual(self.cheque_partner.risk_cheque, 0.0)
+        self.assertFalse(self.cheque_partner.risk_exception)
@@ -7,17 +7,19 @@ import dateutil.parser
 from decimal import Decimal
 import json
 import logging
+from collections import defaultdict
 from datetime import datetime
-from dateutil.relativedelta import relativedelta
 from odoo.addons.account_statement_import_online.models.online_bank_statement_provider import OnlineBankStatementProvider as ProviderVomsis
 
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError
 
+from ..vomsis_client import get_client, get_error_message
+
 _logger = logging.getLogger(__name__)
 
-TIMEOUT = 20
-VOMSIS_API_BASE = "https://developers.vomsis.com/api/v2"
+# Width of the date windows transactions are requested in
+VOMSIS_INTERVAL_DAYS = 7
 
 class ProviderVomsis(models.Model):
     _inherit = "online.bank.statement.provider"
@@ -38,86 +40,154 @@ class ProviderVomsis(models.Model):
                 date_since, date_until,
             ) 
 
+        params = self._prepare_fetch_params()
+        if not params:
+            return False
+        date_since, date_until = self._vomsis_utc_range(date_since, date_until)
+
+        # Geriye dönük vomsisten ne kadar sürelik data çekilebilecek?
+        #if date_since < datetime.utcnow() - relativedelta(days=7):
+        #    raise UserError(
+        #        _(
+        #            "Vomsis sadece 7 günlük kayıtları veriyor"
+        #        )
+        #    )
+
+        return self._vomsis_statement_data(
+            self._vomsis_iter_transaction_pages(params["currency"], date_since, date_until, lastId=params["last_id"]),
+            lambda: self._vomsis_get_account_balance(params["account_vomsis_id"]),
+        )
+
+    def _supports_concurrent_fetch(self):
+        return self.service == "vomsis" or super()._supports_concurrent_fetch()
+
+    def _prepare_fetch_params(self):
+        params = super()._prepare_fetch_params()
+        if self.service != "vomsis":
+            return params
+
         # MULTI-COMPANY FIX: Bank account kontrolü
         bank_account = self.journal_id.bank_account_id
         if not bank_account:
             raise UserError('Bu journal\'ın bank account\'u bulunamadı!')
-            
+
         account_vomsis_id = bank_account.vomsis_id
         if account_vomsis_id == 0:
             _logger.exception("%s adlı banka hesabının vomsiste kaydı bulunamadı!", bank_account.bank_name)
-            return False
+            return None
             #raise UserError('Bu banka hesabının vomsisde bir kaydı bulunamadı!')
 
-        currency = (self.currency_id or self.company_id.currency_id).name
+        params.update(self._prepare_vomsis_payload())
+        params.update({
+            "api_base": self.api_base,
+            "account_vomsis_id": account_vomsis_id,
+            "currency": (self.currency_id or self.company_id.currency_id).name,
+            "last_id": self._vomsis_get_last_id(),
+        })
+        return params
+
+    def _vomsis_get_last_id(self):
+        """lastId of the scheduled pulls: Vomsis ids only grow, so the
+        transactions after the high-water mark are the ones with a bigger id,
+        including the ones the bank posted late."""
+        self.ensure_one()
+        if self.env.context.get("scheduled") and (self.last_transaction_ref or '').isdigit():
+            return int(self.last_transaction_ref)
+        return None
+
+    def _is_partial_statement_data(self, date_since, statement_date_since):
+        # The transactions before the lastId cursor are left out, even when
+        # the whole statement is requested
+        if self.service == "vomsis" and self._vomsis_get_last_id() is not None:
+            return True
+        return super()._is_partial_statement_data(date_since, statement_date_since)
+
+    def _get_high_water_mark(self, data, date_until):
+        reference, date = super()._get_high_water_mark(data, date_until)
+        if self.service == "vomsis" and date:
+            # Keep the biggest id as the reference, see _vomsis_get_last_id()
+            reference = str(max(
+                int(line["unique_import_id"])
+                for line in data[0]
+                if self._get_line_utc_date(line) < date_until
+            ))
+        return reference, date
+
+    def _fetch_statement_data(self, params, date_since, date_until):
+        """Runs in a pull worker thread, only the HTTP client is used here."""
+        if params["service"] != "vomsis":
+            return super()._fetch_statement_data(params, date_since, date_until)
+        client = get_client(params["app_key"], params["app_secret"], params["api_base"])
+        date_since, date_until = self._vomsis_utc_range(date_since, date_until)
+        try:
+            pages = list(client.iter_transaction_pages(
+                params["account_vomsis_id"], date_since, date_until, VOMSIS_INTERVAL_DAYS,
+                last_id=params["last_id"],
+            ))
+            account = None
+            if not pages:
+                account = client.get_json("accounts/%s" % params["account_vomsis_id"])
+        except requests.HTTPError as e:
+            error = get_error_message(e)
+            if not error:
+                raise
+            # No translation here, the worker thread has no environment
+            raise UserError("Vomsis: %s" % error) from e
+        return {"pages": pages, "account": account}
+
+    def _parse_statement_data(self, raw_data, date_since, date_until):
+        if self.service != "vomsis":
+            return super()._parse_statement_data(raw_data, date_since, date_until)
+        return self._vomsis_statement_data(
+            (self._vomsis_preparse_page(*page) for page in raw_data["pages"]),
+            lambda: self._vomsis_account_balance(raw_data["account"]),
+        )
 
+    @api.model
+    def _vomsis_utc_range(self, date_since, date_until):
         if date_since.tzinfo:
             date_since = date_since.astimezone(pytz.utc).replace(tzinfo=None)
         if date_until.tzinfo:
             date_until = date_until.astimezone(pytz.utc).replace(tzinfo=None)
-
-        # Geriye dönük vomsisten ne kadar sürelik data çekilebilecek?
-        #if date_since < datetime.utcnow() - relativedelta(days=7):
-        #    raise UserError(
-        #        _(
-        #            "Vomsis sadece 7 günlük kayıtları veriyor"
-        #        )
-        #    )
-
-        token = self._vomsis_get_token()
-        transactions = self._vomsis_get_transactions(
-            token, currency, date_since, date_until
-        )
-        if not transactions:
-            balance = self._vomsis_get_account_balance(account_vomsis_id)
+        return date_since, date_until
+
+    def _vomsis_statement_data(self, pages, get_balance):
+        """Turn pages of preparsed transactions into (lines, statement values).
+
+        Only the lines and the two boundary transactions are kept, so memory
+        does not grow with the size of the raw API responses.
+        """
+        lines = []
+        first_transaction = last_transaction = None
+        for page in pages:
+            partner_index = self._vomsis_partner_index(page)
+            for transaction in page:
+                transaction_date = self._vomsis_get_transaction_date(transaction)
+                if first_transaction is None or transaction_date < self._vomsis_get_transaction_date(first_transaction):
+                    first_transaction = transaction
+                if last_transaction is None or transaction_date >= self._vomsis_get_transaction_date(last_transaction):
+                    last_transaction = transaction
+                lines += self._vomsis_transaction_to_lines(transaction, partner_index)
+
+        if first_transaction is None:
+            balance = get_balance()
             return [], {"balance_start": balance, "balance_end_real": balance}
 
-        transactions = list(
-            sorted(
-                transactions,
-                key=lambda transaction: self._vomsis_get_transaction_date(transaction),
-            )
-        )
-        lines = list(
-            itertools.chain.from_iterable(
-                map(lambda x: self._vomsis_transaction_to_lines(x), transactions)
-            )
-        )
+        lines.sort(key=lambda line: line["date"])
+        balance_start = self._vomsis_get_transaction_ending_balance(first_transaction)
+        balance_start -= self._vomsis_get_transaction_total_amount(first_transaction)
+        balance_end = self._vomsis_get_transaction_ending_balance(last_transaction)
+        return lines, {"balance_start": balance_start, "balance_end_real": balance_end}
 
-        if transactions:
-            first_transaction = transactions[0]
-            first_transaction_id = first_transaction["id"]
-            first_transaction_date = self._vomsis_get_transaction_date(first_transaction)
-
-            if not first_transaction:
-                raise UserError(
-                    _("Başlangıç kaydı bulunamadı %s (%s)")
-                    % (first_transaction_id, first_transaction_date)
-                )
-            balance_start = self._vomsis_get_transaction_ending_balance(first_transaction)
-            balance_start -= self._vomsis_get_transaction_total_amount(first_transaction)
-
-            last_transaction = transactions[-1]
-            last_transaction_id = last_transaction["id"]
-            last_transaction_date = self._vomsis_get_transaction_date(last_transaction)
-
-            if not last_transaction:
-                raise UserError(
-                    _("Son ekstre kaydı bulunamadı %s (%s)")
-                    % (last_transaction_id, last_transaction_date)
-                )
-            balance_end = self._vomsis_get_transaction_ending_balance(last_transaction)
-            return lines, {"balance_start": balance_start, "balance_end_real": balance_end}
+    def _vomsis_client(self):
+        """Shared HTTP client of the provider credentials, see vomsis_client."""
+        self.ensure_one()
+        payload = self._prepare_vomsis_payload()
+        return get_client(payload["app_key"], payload["app_secret"], self.api_base)
 
     def _vomsis_get_token(self):
         self.ensure_one()
-        url = self.api_base or VOMSIS_API_BASE + "/authenticate"
-        payload = self._prepare_vomsis_payload()
-        request = requests.post(url, json=payload)
-        response = json.loads(request.text)
-        if not response.get('status') == 'success':
-            raise UserError(response.get('message'))
-        return f"Bearer {response.get('token')}"
+        return self._vomsis_client().get_token()
 
     def _prepare_vomsis_payload(self):
         data={
@@ -128,50 +198,35 @@ class ProviderVomsis(models.Model):
 
     def _vomsis_get_transactions(self, token, currency, since, until, lastId=None, dateType=None, types=None, bankName=None):
         self.ensure_one()
-        interval_step = relativedelta(days=7)
-        interval_start = since
-        transactions = []
-        while interval_start < until:
-            interval_end = min(interval_start + interval_step, until)
-            try:
-                url = self.api_base or VOMSIS_API_BASE + "/accounts/"+str(self.journal_id.bank_account_id.vomsis_id)+"/transactions"
-                headers = {
-                    'Authorization': token
-                }
-                params = {
-                    'beginDate': since.strftime("%d-%m-%Y %H:%M:%S"),
-                    'endDate': until.strftime("%d-%m-%Y %H:%M:%S"),
-                    'lastId': lastId,
-                    'dateType': dateType,
-                    'types': types,
-                    'bankName': bankName,
-                }                
-
-                status, response, asktime = self._do_request(url, params=params, headers=headers, type='GET')
-                interval_transactions = map(
-                    lambda transaction: self._vomsis_preparse_transaction(transaction),
-                    response['transactions'],
-                )
-                transactions += list(
-                    filter(
-                        lambda transaction: interval_start
-                        <= self._vomsis_get_transaction_date(transaction)
-                        < interval_end,
-                        interval_transactions,
-                    )
-                )
-                interval_start += interval_step
-                return transactions
-            except requests.HTTPError as e:
-                try:
-                    response = e.response.json()
-                    error = response.get('errors', [])[0].get('message')
-                except Exception:
-                    error = None
-                if not error:
-                    raise e
-                message = _("Hata oluştu. %s") % (error)
-                raise UserError(message)
+        return list(itertools.chain.from_iterable(self._vomsis_iter_transaction_pages(
+            currency, since, until, lastId=lastId, dateType=dateType, types=types, bankName=bankName,
+        )))
+
+    def _vomsis_iter_transaction_pages(self, currency, since, until, lastId=None, dateType=None, types=None, bankName=None):
+        """Yield the preparsed transactions of [since, until) page by page,
+        see VomsisClient.iter_transaction_pages()."""
+        self.ensure_one()
+        pages = self._vomsis_client().iter_transaction_pages(
+            self.journal_id.bank_account_id.vomsis_id, since, until, VOMSIS_INTERVAL_DAYS,
+            last_id=lastId, dateType=dateType, types=types, bankName=bankName,
+        )
+        try:
+            for page in pages:
+                yield self._vomsis_preparse_page(*page)
+        except requests.HTTPError as e:
+            error = get_error_message(e)
+            if not error:
+                raise e
+            message = _("Hata oluştu. %s") % (error)
+            raise UserError(message)
+
+    @api.model
+    def _vomsis_preparse_page(self, window_start, window_end, transactions):
+        return [
+            transaction
+            for transaction in map(self._vomsis_preparse_transaction, transactions)
+            if window_start <= self._vomsis_get_transaction_date(transaction) < window_end
+        ]
 
     @api.model
     def _vomsis_get_transaction_date(self, transaction):
@@ -208,8 +263,16 @@ class ProviderVomsis(models.Model):
             return Decimal()
         return Decimal(transaction_amount)
 
-    @api.model
-    def _vomsis_transaction_to_lines(self, transaction):
+    def _vomsis_partner_index(self, transactions):
+        """Partners of the IBAN and tax numbers of the transactions, loaded
+        at once for the whole page, see _statement_line_import_partner_index."""
+        self.ensure_one()
+        return self.journal_id._statement_line_import_partner_index(
+            [transaction["sender_iban"] for transaction in transactions if transaction["sender_iban"]],
+            [transaction["sender_taxno"] or transaction["payer_tax_no"] for transaction in transactions],
+        )
+
+    def _vomsis_transaction_to_lines(self, transaction, partner_index=None):
         transaction_id = transaction["id"]
         bank_account_id = transaction["bank_account_id"]
         transaction_type = transaction["transaction_type"]
@@ -259,29 +322,24 @@ class ProviderVomsis(models.Model):
         if sender_name:
             sender_info += f'''{sender_name} '''
 
-        # MULTI-COMPANY FIX: Partner search'leri company-aware yap
+        if partner_index is None:
+            partner_index = self._vomsis_partner_index([transaction])
+        journal = self.journal_id
+
+        # MULTI-COMPANY FIX: Partner index'i company-aware
         if sender_taxno or payer_tax_no:
             sender_info += f'''Vergi No: {sender_taxno or payer_tax_no} '''
-            partner_id = self.env['res.partner'].search([
-                ('vat', '=', sender_taxno or payer_tax_no),
-                '|', ('company_id', '=', self.journal_id.company_id.id), ('company_id', '=', False)
-            ], limit=1)
+            partner_id = partner_index["vat"].get(journal._sanitize_vat(sender_taxno or payer_tax_no))
         
         if sender_iban:
             sender_info += f'''Iban: {sender_iban}'''
             if not partner_id:
-                res_partner_bank_id = self.env['res.partner.bank'].search([
-                    ('acc_number', '=', sender_iban),
-                    '|', ('company_id', '=', self.journal_id.company_id.id), ('company_id', '=', False)
-                ], limit=1)
-                partner_id = (res_partner_bank_id and res_partner_bank_id.partner_id) or False
+                partner_bank = partner_index["account_number"].get(journal._sanitize_bank_account_number(sender_iban))
+                if partner_bank:
+                    partner_id = self.env['res.partner'].browse(partner_bank["partner_id"]).commercial_partner_id.id
         
         if partner_id:
-            # MULTI-COMPANY FIX: Partner ID list problemi çöz
-            if hasattr(partner_id, 'commercial_partner_id'):
-                line.update({"partner_id": partner_id.commercial_partner_id.id})
-            else:
-                line.update({"partner_id": partner_id.id})
+            line.update({"partner_id": partner_id})
 
         if sender_info:
             line.update({"partner_name": sender_info})
@@ -289,16 +347,17 @@ class ProviderVomsis(models.Model):
         lines = [line]
         return lines
 
-    @api.model
     def _do_request(self, uri, params={}, headers={}, type='POST'):
-
-        _logger.debug("Uri: %s - Type : %s - Headers: %s - Params : %s !", (uri, type, headers, params))
+        """Send the request with the pooled session of the provider. The
+        Authorization header is set from the cached token, renewed on 401."""
+        _logger.debug("Uri: %s - Type : %s - Params : %s !", uri, type, params)
         ask_time = fields.Datetime.now()
+        client = self._vomsis_client()
         try:
             if type.upper() in ('GET', 'DELETE'):
-                res = requests.request(type.lower(), uri, headers=headers, params=params, timeout=TIMEOUT)
+                res = client.request(type.upper(), uri, params=params, headers=headers)
             elif type.upper() in ('POST', 'PATCH', 'PUT'):
-                res = requests.request(type.lower(), uri, json=params, headers=headers, timeout=TIMEOUT)
+                res = client.request(type.upper(), uri, json_data=params, headers=headers)
             else:
                 raise Exception(_('Desteklenmeyen Metod [%s] not in [GET, POST, PUT, PATCH or DELETE]!') % (type))
             res.raise_for_status()
@@ -327,21 +386,19 @@ class ProviderVomsis(models.Model):
                 if error.response.status_code in (400, 401, 403, 410):
                     raise error
                 raise UserError(_("Bilinmeyen hata oluştu"))
+        except requests.Timeout as error:
+            _logger.warning("Vomsis request timed out: %s %s", type, uri)
+            raise UserError(_("Vomsis isteği zaman aşımına uğradı: %s") % error) from error
         return (status, response, ask_time)
 
     def _vomsis_get_account_balance(self, account_vomsis_id):
         try:
-            url = self.api_base or VOMSIS_API_BASE + "/accounts/"+str(account_vomsis_id)
+            url = "accounts/"+str(account_vomsis_id)
             headers = {
                 'Authorization': self._vomsis_get_token()
             }
             status, response, asktime = self._do_request(url, headers=headers, type='GET')
-            if not response['status'] == 'success':
-                raise UserError('Hesap Bakiyesi Alınırken Hata Oluştu!')
-            account_balance = response['account'][0].get('balance')
-            if not account_balance:
-                return Decimal()
-            return Decimal(account_balance)
+            return self._vomsis_account_balance(response)
         except requests.HTTPError as e:
             try:
                 response = e.response.json()
@@ -353,9 +410,18 @@ class ProviderVomsis(models.Model):
             message = _("Hata oluştu. %s") % (error)
             raise UserError(message)
 
+    @api.model
+    def _vomsis_account_balance(self, response):
+        if not response or not response['status'] == 'success':
+            raise UserError('Hesap Bakiyesi Alınırken Hata Oluştu!')
+        account_balance = response['account'][0].get('balance')
+        if not account_balance:
+            return Decimal()
+        return Decimal(account_balance)
+
     def get_vomsis_account_data(self):
         try:
-            url = self.api_base or VOMSIS_API_BASE + "/accounts"
+            url = "accounts"
             headers = {
                 'Authorization': self._vomsis_get_token()
             }
@@ -434,58 +500,80 @@ class ProviderVomsis(models.Model):
         return statement
     
     def _post_process_imported_lines(self, statement):
-        """İçe aktarılan ekstre satırlarını işleyerek uzlaştırma (reconciliation) verilerini ekler."""
+        """İçe aktarılan ekstre satırlarını işleyerek uzlaştırma (reconciliation) verilerini ekler.
+
+        Tüm satırların aday hareketleri tek sorguda okunur, eşleştirme bellekte
+        yapılır ve aynı veriyi alan satırlar birlikte yazılır.
+        """
         if 'lines_widget_json' not in self.env['account.bank.statement.line']._fields:
             # Field removed in newer Odoo versions; skip silently
             return
-        for line in statement.line_ids:
-            # Halihazırda uzlaştırma verisi olan satırları kontrol et
-            if line.lines_widget_json:
-                continue  # Eğer zaten veri varsa, işleme gerek yok
-                
-            # MULTI-COMPANY FIX: Company context ekle
-            domain = [
-                ('account_id.reconcile', '=', True),
-                ('reconciled', '=', False),
-                ('amount_residual', '!=', 0),
-                ('company_id', '=', statement.company_id.id),  # COMPANY FILTER EKLENDİ
-            ]
-            
-            # Tutar işaretine göre domain'i düzenle
-            if line.amount > 0:
-                domain.append(('amount_residual', '<', 0))
-            else:
-                domain.append(('amount_residual', '>', 0))
-            
-            # Tutar mutlak değer olarak aynı olmalı
-            domain.append(('amount_residual', 'in', [line.amount, -line.amount]))
-            
-            # Partner varsa partner'a göre de filtrele
+        # Halihazırda uzlaştırma verisi olan satırlara işleme gerek yok
+        lines = statement.line_ids.filtered(lambda line: not line.lines_widget_json and line.amount)
+        if not lines:
+            return
+        currency = statement.company_id.currency_id
+
+        # MULTI-COMPANY FIX: Company context ekle
+        # Tutar işaretine göre: giriş borç kalanıyla, çıkış alacak kalanıyla eşleşir
+        domain = [
+            ('account_id.reconcile', '=', True),
+            ('reconciled', '=', False),
+            ('company_id', '=', statement.company_id.id),  # COMPANY FILTER EKLENDİ
+            ('amount_residual', 'in', list({-line.amount for line in lines})),
+        ]
+        # Partner'sız satır yoksa partner'lara göre de filtrele
+        if all(lines.mapped('partner_id')):
+            domain.append(('partner_id', 'in', lines.partner_id.ids))
+        candidates = self.env['account.move.line'].search_fetch(
+            domain,
+            ['amount_residual', 'amount_residual_currency', 'partner_id', 'account_id', 'currency_id', 'date', 'move_id', 'name'],
+            order='date desc, id desc',
+        )
+
+        # En iyi eşleşen kayıt (en yakın tarihli), tutar ve partner'a göre
+        best_by_amount = {}
+        best_by_partner = {}
+        for candidate in candidates:
+            amount = currency.round(candidate.amount_residual)
+            best_by_amount.setdefault(amount, candidate)
+            best_by_partner.setdefault((amount, candidate.partner_id.id), candidate)
+
+        lines_by_json = defaultdict(lambda: self.env['account.bank.statement.line'])
+        match_data_cache = {}
+        for line in lines:
+            amount = currency.round(-line.amount)
             if line.partner_id:
-                domain.append(('partner_id', '=', line.partner_id.id))
-            
-            # En iyi eşleşen kaydı bul (örneğin en yakın tarihli)
-            matching_line = self.env['account.move.line'].search(domain, order='date desc', limit=1)
-            
-            if matching_line:
-                # Odoo 18 formatına uygun tek bir kayıt oluştur
-                currency = matching_line.currency_id
-                match_data = {
-                    "id": matching_line.id,
-                    "account_id": matching_line.account_id.id,
-                    "account_name": matching_line.account_id.name,
-                    "account_code": matching_line.account_id.code,
-                    "partner_id": f"res.partner({matching_line.partner_id.id})" if matching_line.partner_id else "res.partner()",
-                    "partner_name": matching_line.partner_id.name if matching_line.partner_id else False,
-                    "date": matching_line.date.strftime('%Y-%m-%d'),
-                    "move_id": f"account.move({matching_line.move_id.id},)",
-                    "move_name": matching_line.move_id.name,
-                    "name": matching_line.name,
-                    "amount_residual_currency": int(matching_line.amount_residual_currency) if matching_line.amount_residual_currency else matching_line.amount_residual,
-                    "amount_residual": float(matching_line.amount_residual),
-                    "currency_id": currency.id,
-                    "currency_symbol": currency.symbol
-                }
-                
-                # JSON formatındaki veriyi satıra ekle
-                line.write({'lines_widget_json': json.dumps(match_data)})
+                matching_line = best_by_partner.get((amount, line.partner_id.id))
+            else:
+                matching_line = best_by_amount.get(amount)
+            if not matching_line:
+                continue
+            if matching_line not in match_data_cache:
+                match_data_cache[matching_line] = json.dumps(self._vomsis_widget_match_data(matching_line))
+            lines_by_json[match_data_cache[matching_line]] |= line
+
+        # JSON formatındaki veriyi satırlara ekle
+        for match_json, matched_lines in lines_by_json.items():
+            matched_lines.write({'lines_widget_json': match_json})
+
+    @api.model
+    def _vomsis_widget_match_data(self, matching_line):
+        # Odoo 18 formatına uygun tek bir kayıt oluştur
+        currency = matching_line.currency_id
+        return {
+            "id": matching_line.id,
+            "account_id": matching_line.account_id.id,
+            "account_name": matching_line.account_id.name,
+            "account_code": matching_line.account_id.code,
+            "partner_id": f"res.partner({matching_line.partner_id.id})" if matching_line.partner_id else "res.partner()",
+            "partner_name": matching_line.partner_id.name if matching_line.partner_id else False,
+            "date": matching_line.date.strftime('%Y-%m-%d'),
+            "move_id": f"account.move({matching_line.move_id.id},)",
+            "move_name": matching_line.move_id.name,
+            "name": matching_line.name,
+            "amount_residual_currency": int(matching_line.amount_residual_currency) if matching_line.amount_residual_currency else matching_line.amount_residual,
+            "amount_residual": float(matching_line.amount_residual),
+            "currency_id": currency.id,
+            "currency_symbol": currency.symbol
+        }
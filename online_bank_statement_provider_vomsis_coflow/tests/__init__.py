@@ -0,0 +1,2 @@
+from . import test_vomsis_pull
+from . import test_vomsis_pull_benchmark
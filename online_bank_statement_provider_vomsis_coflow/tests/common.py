@@ -0,0 +1,51 @@
+# Copyright 2024 Coflow Team
+# License LGPLv3 or later (https://www.gnu.org/licenses/lgpl-3.0).
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+from .vomsis_server import VomsisServer
+
+
+class VomsisProviderCommon(AccountTestInvoicingCommon):
+    """Vomsis providers pulling from a local VomsisServer."""
+
+    server_options = {}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = VomsisServer(**cls.server_options).start()
+        cls.addClassCleanup(cls.server.stop)
+        cls.provider = cls._create_vomsis_provider('VOM1', 1101, 'TR330006100519786457841326')
+
+    @classmethod
+    def _create_vomsis_provider(cls, code, vomsis_id, iban, **values):
+        bank_account = cls.env['res.partner.bank'].create({
+            'acc_number': iban,
+            'vomsis_id': vomsis_id,
+            'partner_id': cls.env.company.partner_id.id,
+            'company_id': cls.env.company.id,
+        })
+        journal = cls.env['account.journal'].create({
+            'name': 'Vomsis %s' % code,
+            'code': code,
+            'type': 'bank',
+            'bank_account_id': bank_account.id,
+            'bank_statements_source': 'online',
+        })
+        return cls.env['online.bank.statement.provider'].create({
+            'name': 'Vomsis %s' % code,
+            'service': 'vomsis',
+            'journal_id': journal.id,
+            'api_key': 'test-key',
+            'api_secret': 'test-secret',
+            'api_base': cls.server.api_base,
+            'statement_creation_mode': 'daily',
+            'tz': 'UTC',
+            **values,
+        })
+
+    def _get_lines(self, provider=None):
+        return self.env['account.bank.statement.line'].search(
+            [('journal_id', '=', (provider or self.provider).journal_id.id)],
+            order='date, id',
+        )
@@ -0,0 +1,172 @@
+# Copyright 2024 Coflow Team
+# License LGPLv3 or later (https://www.gnu.org/licenses/lgpl-3.0).
+from datetime import datetime
+from unittest.mock import patch
+
+import requests
+
+from odoo.exceptions import UserError
+from odoo.tests.common import tagged
+from odoo.tools import mute_logger
+
+from .common import VomsisProviderCommon
+
+CLIENT = 'odoo.addons.online_bank_statement_provider_vomsis_coflow.vomsis_client'
+
+
+@tagged('post_install', '-at_install')
+class TestVomsisPull(VomsisProviderCommon):
+
+    def setUp(self):
+        super().setUp()
+        # The recorded transactions are on 2 and 3 May 2024
+        self.date_since = datetime(2024, 5, 2)
+        self.date_until = datetime(2024, 5, 4)
+        self.server.reset()
+        self.startPatcher(patch(CLIENT + '.BACKOFF_FACTOR', 0.01))
+
+    def test_pull(self):
+        self.provider._pull(self.date_since, self.date_until)
+        lines = self._get_lines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines.mapped('amount'), [12500.0, 7800.0, -23615.4, 4310.2, -9450.0])
+        statements = lines.statement_id.sorted('name')
+        self.assertEqual(statements.mapped('name'), ['VOM1/2024-05-02', 'VOM1/2024-05-03'])
+        self.assertAlmostEqual(statements[0].balance_start, 139840.75)
+        self.assertAlmostEqual(statements[0].balance_end_real, 140835.55)
+        self.assertAlmostEqual(statements[1].balance_end_real, 131385.55)
+
+    def test_pull_twice(self):
+        self.provider._pull(self.date_since, self.date_until)
+        self.provider._pull(self.date_since, self.date_until)
+        self.assertEqual(len(self._get_lines()), 5)
+
+    def test_pull_partner(self):
+        partner = self.env['res.partner'].with_context(no_vat_validation=True).create({
+            'name': 'Anadolu Tekstil',
+            'vat': 'TR 0680123456',
+        })
+        contact = self.env['res.partner'].create({'name': 'Mehmet Yılmaz', 'parent_id': partner.id})
+        self.env['res.partner.bank'].create({
+            'acc_number': 'TR51 0001 0002 0198 7654 3210 01',
+            'partner_id': contact.id,
+        })
+        self.provider._pull(self.date_since, self.date_until)
+        lines = self._get_lines()
+        # By tax number, then by IBAN when no partner has the tax number
+        self.assertEqual(lines[0].partner_id, partner)
+        self.assertEqual(lines[1].partner_id, partner)
+        self.assertFalse(lines[2].partner_id)
+
+    def test_pull_paging(self):
+        self.server.page_size = 2
+        self.provider._pull(self.date_since, self.date_until)
+        self.assertEqual(len(self._get_lines()), 5)
+        # 2 May: pages of 2, 2 and 0 transactions, 3 May: pages of 1 and 0
+        self.assertEqual(self.server.count_requests('transactions'), 5)
+        cursors = [request['params'].get('lastId') for request in self.server.requests if 'transactions' in request['path']]
+        self.assertEqual(cursors, [None, '58002', '58004', None, '58005'])
+
+    def test_pull_scheduled_high_water_mark(self):
+        scheduled_provider = self.provider.with_context(scheduled=True)
+        scheduled_provider._pull(self.date_since, self.date_until)
+        self.assertEqual(self.provider.last_transaction_ref, '58005')
+        self.assertEqual(self.provider.last_transaction_date, datetime(2024, 5, 3, 10, 1, 57))
+        self.server.requests.clear()
+        scheduled_provider._pull(self.date_since, self.date_until)
+        # 2 May is not requested again, 3 May only after the last transaction
+        requests = [request for request in self.server.requests if 'transactions' in request['path']]
+        self.assertEqual([request['params'].get('lastId') for request in requests], ['58005'])
+        self.assertEqual(requests[0]['params']['beginDate'], '03-05-2024 09:01:57')
+        self.assertEqual(len(self._get_lines()), 5)
+
+    def test_pull_scheduled_high_water_mark_after_midnight(self):
+        transactions = [dict(transaction) for transaction in self.server.transactions]
+        late_transaction = transactions.pop()
+        transactions.append(dict(
+            late_transaction, id=58005, system_date='2024-05-03 00:05:00', amount='1000.00', current_balance='141835.55',
+        ))
+        self.server.set_transactions(transactions)
+        self.provider.sync_overlap = 60
+        scheduled_provider = self.provider.with_context(scheduled=True)
+        scheduled_provider._pull(self.date_since, self.date_until)
+        self.assertEqual(self.provider.last_transaction_date, datetime(2024, 5, 3, 0, 5))
+
+        self.server.set_transactions(transactions + [dict(late_transaction, id=58006, current_balance='132385.55')])
+        scheduled_provider._pull(self.date_since, self.date_until)
+        # The overlap reaches back to 2 May, so all of 3 May is requested,
+        # but only after the cursor: its start balance is kept
+        statement = self._get_lines()[-1].statement_id
+        self.assertEqual(statement.name, 'VOM1/2024-05-03')
+        self.assertEqual(len(statement.line_ids), 2)
+        self.assertAlmostEqual(statement.balance_start, 140835.55)
+        self.assertAlmostEqual(statement.balance_end_real, 132385.55)
+
+    def test_pull_volume(self):
+        self.server.generate_transactions(1101, 300, self.date_since, self.date_until)
+        self.provider._pull(self.date_since, self.date_until)
+        self.assertEqual(len(self._get_lines()), 300)
+
+    def test_pull_token_expired(self):
+        self.provider._pull(self.date_since, datetime(2024, 5, 3))
+        authentications = self.server.count_requests('authenticate')
+        self.server.expire_tokens()
+        self.provider._pull(datetime(2024, 5, 3), self.date_until)
+        self.assertEqual(len(self._get_lines()), 5)
+        self.assertEqual(self.server.count_requests('authenticate'), authentications + 1)
+
+    def test_pull_no_transactions(self):
+        self.server.set_transactions([])
+        self.provider._pull(self.date_since, datetime(2024, 5, 3))
+        self.assertFalse(self._get_lines())
+        # The balance is read from the account instead
+        self.assertEqual(len([request for request in self.server.requests if request['path'] == 'accounts/1101']), 1)
+
+    def test_pull_server_error(self):
+        # Retried MAX_RETRIES times before giving up
+        self.server.inject_error(500, path='transactions', times=4)
+        with self.assertRaises(UserError):
+            self.provider._pull(self.date_since, self.date_until)
+        self.assertEqual(self.server.count_requests('transactions'), 4)
+
+    def test_pull_server_error_recovered(self):
+        self.server.inject_error(503, path='transactions', times=2)
+        self.provider._pull(self.date_since, self.date_until)
+        self.assertEqual(len(self._get_lines()), 5)
+
+    def test_pull_rate_limited(self):
+        self.server.inject_error(429, path='transactions', retry_after=0)
+        self.provider._pull(self.date_since, self.date_until)
+        self.assertEqual(len(self._get_lines()), 5)
+
+    @mute_logger('odoo.addons.account_statement_import_online.models.online_bank_statement_provider')
+    def test_pull_rate_limited_long(self):
+        # Waiting that long is left to the scheduler, the provider is paused
+        self.server.inject_error(429, path='transactions', retry_after=3600)
+        self.provider.with_context(scheduled=True)._pull(self.date_since, self.date_until)
+        self.assertEqual(self.server.count_requests('transactions'), 1)
+        self.assertEqual(self.provider.consecutive_failures, 1)
+        self.assertEqual(self.provider.health_state, 'paused')
+
+    def test_pull_timeout(self):
+        self.server.inject_error('timeout', path='transactions')
+        with patch(CLIENT + '.READ_TIMEOUT', 0.2), self.assertRaises(requests.Timeout):
+            self.provider._pull(self.date_since, self.date_until)
+
+    @mute_logger('odoo.addons.account_statement_import_online.models.online_bank_statement_provider')
+    def test_pull_scheduled_error(self):
+        self.server.inject_error(503, path='transactions', times=4)
+        self.provider.with_context(scheduled=True)._pull(self.date_since, self.date_until)
+        # The failing day is logged, the pull of the provider stops there
+        self.assertFalse(self._get_lines())
+        self.assertIn('Injected error 503', self.provider.message_ids[0].body)
+
+    def test_pull_concurrent(self):
+        other_provider = self._create_vomsis_provider('VOM2', 1102, 'TR460006200039800006291137')
+        self.server.generate_transactions(1102, 40, self.date_since, self.date_until, start_id=90001)
+        self.env['ir.config_parameter'].sudo().set_param('account_statement_import_online.pull_workers', 2)
+        providers = self.provider | other_provider
+        providers._pull(self.date_since, self.date_until)
+        self.assertEqual(len(self._get_lines()), 5)
+        self.assertEqual(len(self._get_lines(other_provider)), 40)
+        self.assertTrue(all(providers.mapped('last_fetch_duration')))
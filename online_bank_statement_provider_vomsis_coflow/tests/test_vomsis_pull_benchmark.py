@@ -0,0 +1,107 @@
+# Copyright 2024 Coflow Team
+# License LGPLv3 or later (https://www.gnu.org/licenses/lgpl-3.0).
+"""Throughput benchmark of a full Vomsis pull against the local server.
+
+Several providers pull the same volume of generated transactions, first one
+after the other, then with the pull workers. Transactions per second, queries
+per transaction, HTTP requests and the fetch and apply time of the providers
+are reported per mode as JSON.
+
+The benchmark is not part of the standard test run, launch it with::
+
+    odoo-bin -d db -i online_bank_statement_provider_vomsis_coflow --test-tags vomsis_benchmark
+
+``VOMSIS_BENCHMARK_SIZE`` sets the number of transactions per provider,
+``VOMSIS_BENCHMARK_PROVIDERS`` the number of providers, ``VOMSIS_BENCHMARK_WORKERS``
+the pull workers of the concurrent run, ``VOMSIS_BENCHMARK_LATENCY`` the
+latency of each request in seconds, ``VOMSIS_BENCHMARK_PAGE_SIZE`` the
+transactions per page and ``VOMSIS_BENCHMARK_OUTPUT`` a file to write the
+report to.
+"""
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+from odoo.tests.common import tagged
+
+from .common import VomsisProviderCommon
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('post_install', '-at_install', '-standard', 'vomsis_benchmark')
+class TestVomsisPullBenchmark(VomsisProviderCommon):
+
+    server_options = {
+        'latency': float(os.environ.get('VOMSIS_BENCHMARK_LATENCY', 0.02)),
+        'page_size': int(os.environ.get('VOMSIS_BENCHMARK_PAGE_SIZE', 100)),
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.size = int(os.environ.get('VOMSIS_BENCHMARK_SIZE', 1000))
+        cls.provider_count = int(os.environ.get('VOMSIS_BENCHMARK_PROVIDERS', 4))
+        cls.workers = int(os.environ.get('VOMSIS_BENCHMARK_WORKERS', 4))
+        cls.date_since = datetime(2024, 5, 1)
+        cls.date_until = cls.date_since + timedelta(days=7)
+
+    def _create_providers(self, mode):
+        providers = self.env['online.bank.statement.provider']
+        for i in range(self.provider_count):
+            vomsis_id = (2100 if mode == 'concurrent' else 2000) + i
+            providers |= self._create_vomsis_provider(
+                '%s%s' % (mode[0].upper(), i), vomsis_id, 'TR%024d' % vomsis_id,
+            )
+            self.server.generate_transactions(
+                vomsis_id, self.size, self.date_since, self.date_until, start_id=vomsis_id * 10 ** 6,
+            )
+        return providers
+
+    def _measure(self, providers, workers):
+        self.env['ir.config_parameter'].sudo().set_param('account_statement_import_online.pull_workers', workers)
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = self.env.cr.sql_log_count
+        requests = len(self.server.requests)
+        start = time.perf_counter()
+        providers._pull(self.date_since, self.date_until)
+        self.env.flush_all()
+        duration = time.perf_counter() - start
+        queries = self.env.cr.sql_log_count - queries
+        transactions = self.size * len(providers)
+        return {
+            'providers': len(providers),
+            'workers': workers,
+            'transactions': transactions,
+            'requests': len(self.server.requests) - requests,
+            'duration': duration,
+            'transactions_per_second': transactions / duration if duration else 0.0,
+            'queries_per_transaction': queries / transactions if transactions else 0.0,
+            'fetch_duration': sum(providers.mapped('last_fetch_duration')),
+            'apply_duration': sum(providers.mapped('last_apply_duration')),
+        }
+
+    def test_vomsis_pull_benchmark(self):
+        report = {}
+        sequential = self._create_providers('sequential')
+        report['sequential'] = self._measure(sequential, 1)
+        concurrent = self._create_providers('concurrent')
+        report['concurrent'] = self._measure(concurrent, self.workers)
+        report['latency'] = self.server.latency
+        report['page_size'] = self.server.page_size
+
+        output = json.dumps(report, indent=2)
+        output_path = os.environ.get('VOMSIS_BENCHMARK_OUTPUT')
+        if output_path:
+            with open(output_path, 'w') as output_file:
+                output_file.write(output)
+        _logger.info('Vomsis pull benchmark:\n%s', output)
+
+        for providers in (sequential, concurrent):
+            lines = self.env['account.bank.statement.line'].search_count(
+                [('journal_id', 'in', providers.journal_id.ids)]
+            )
+            self.assertEqual(lines, self.size * len(providers))
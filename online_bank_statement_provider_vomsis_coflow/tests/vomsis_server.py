@@ -0,0 +1,244 @@
+# Copyright 2024 Coflow Team
+# License LGPLv3 or later (https://www.gnu.org/licenses/lgpl-3.0).
+"""In-process stand-in of the Vomsis API for tests and benchmarks.
+
+The server answers the authenticate, accounts, account and transactions
+endpoints from the recorded JSON fixtures of the fixtures directory. The
+volume of transactions, the latency, the page size and injected errors are
+configurable, and every request is recorded for assertions::
+
+    with VomsisServer(page_size=50) as server:
+        server.generate_transactions(1101, 1000, since, until)
+        server.inject_error(429, path='transactions', retry_after=1)
+        provider.api_base = server.api_base
+        ...
+"""
+import copy
+import itertools
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+API_PATH = '/api/v2'
+DATE_FORMAT = '%d-%m-%Y %H:%M:%S'
+SYSTEM_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as fixture:
+        return json.load(fixture)
+
+
+class VomsisServer:
+    """Threaded HTTP server serving the Vomsis API on a free local port."""
+
+    def __init__(self, page_size=100, latency=0.0, token_lifetime=3600, timeout_delay=1.0):
+        self.page_size = self._page_size = page_size
+        # Seconds slept before answering each request
+        self.latency = self._latency = latency
+        self.token_lifetime = token_lifetime
+        # Seconds an injected timeout keeps the request waiting
+        self.timeout_delay = timeout_delay
+        self.accounts = load_fixture('accounts.json')['accounts']
+        self.transactions = load_fixture('transactions.json')['transactions']
+        self.tokens = set()
+        self.requests = []
+        self._errors = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    # Lifecycle
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='vomsis_server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def api_base(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}{API_PATH}'
+
+    # Configuration
+
+    def reset(self):
+        """Restore the recorded transactions and forget errors and requests."""
+        with self._lock:
+            self.transactions = load_fixture('transactions.json')['transactions']
+            self.page_size = self._page_size
+            self.latency = self._latency
+            self._errors.clear()
+            self.requests.clear()
+
+    def set_transactions(self, transactions):
+        self.transactions = list(transactions)
+
+    def generate_transactions(self, account_id, count, since, until, start_id=1):
+        """Replace the transactions of account_id by count transactions spread
+        over [since, until), cloned from the recorded ones with a consistent
+        running balance."""
+        templates = load_fixture('transactions.json')['transactions']
+        step = (until - since) / max(count, 1)
+        balance = Decimal('100000.00')
+        generated = []
+        for index, template in zip(range(count), itertools.cycle(templates)):
+            transaction = copy.deepcopy(template)
+            amount = Decimal(template['amount'])
+            balance += amount
+            transaction.update({
+                'id': start_id + index,
+                'bank_account_id': account_id,
+                'system_date': (since + step * index).strftime(SYSTEM_DATE_FORMAT),
+                'fis_no': template['fis_no'] and f"{template['fis_no']}-{index}",
+                'current_balance': str(balance),
+            })
+            generated.append(transaction)
+        self.transactions = [
+            transaction for transaction in self.transactions if transaction['bank_account_id'] != account_id
+        ] + generated
+        return generated
+
+    def inject_error(self, status, path=None, times=1, retry_after=None):
+        """Answer the next `times` requests whose path contains `path` with
+        `status` (an HTTP status code or 'timeout')."""
+        with self._lock:
+            self._errors.append({'status': status, 'path': path, 'times': times, 'retry_after': retry_after})
+
+    def expire_tokens(self):
+        """Reject the tokens issued so far, as when they expire server side."""
+        with self._lock:
+            self.tokens.clear()
+
+    def count_requests(self, path=None):
+        return len([request for request in self.requests if path is None or path in request['path']])
+
+    # Request handling
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server._handle(self, 'GET')
+
+            def do_POST(self):
+                server._handle(self, 'POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _pop_error(self, path):
+        with self._lock:
+            for error in self._errors:
+                if error['path'] is None or error['path'] in path:
+                    error['times'] -= 1
+                    if not error['times']:
+                        self._errors.remove(error)
+                    return error
+        return None
+
+    def _handle(self, handler, method):
+        url = urlparse(handler.path)
+        path = url.path[len(API_PATH):].strip('/') if url.path.startswith(API_PATH) else url.path
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = json.loads(handler.rfile.read(length) or b'{}') if length else {}
+        with self._lock:
+            self.requests.append({'method': method, 'path': path, 'params': params, 'time': time.time()})
+        if self.latency:
+            time.sleep(self.latency)
+
+        error = self._pop_error(path)
+        if error and error['status'] == 'timeout':
+            time.sleep(self.timeout_delay)
+            error = None
+        if error:
+            headers = {}
+            if error['retry_after'] is not None:
+                headers['Retry-After'] = str(error['retry_after'])
+            return self._reply(handler, error['status'], {
+                'status': 'error',
+                'errors': [{'message': f"Injected error {error['status']}"}],
+            }, headers)
+
+        if method == 'POST' and path == 'authenticate':
+            return self._reply(handler, 200, self._authenticate(body))
+        if handler.headers.get('Authorization', '').removeprefix('Bearer ') not in self.tokens:
+            return self._reply(handler, 401, {'status': 'error', 'errors': [{'message': 'Unauthenticated.'}]})
+        if method == 'GET' and path == 'accounts':
+            return self._reply(handler, 200, {'status': 'success', 'accounts': self.accounts})
+        match = re.fullmatch(r'accounts/(\d+)(/transactions)?', path)
+        if method == 'GET' and match:
+            account_id = int(match.group(1))
+            if match.group(2):
+                return self._reply(handler, 200, self._transactions(account_id, params))
+            account = [account for account in self.accounts if account['id'] == account_id]
+            if account:
+                return self._reply(handler, 200, {'status': 'success', 'account': account})
+        return self._reply(handler, 404, {'status': 'error', 'errors': [{'message': 'Not found.'}]})
+
+    def _authenticate(self, body):
+        values = dict(load_fixture('authenticate.json'))
+        if body.get('app_key') is None:
+            return {'status': 'error', 'message': 'Invalid credentials.'}
+        token = uuid.uuid4().hex
+        with self._lock:
+            self.tokens.add(token)
+        values.update({'token': token, 'expires_in': self.token_lifetime})
+        return values
+
+    def _transactions(self, account_id, params):
+        begin = datetime.strptime(params['beginDate'], DATE_FORMAT)
+        end = datetime.strptime(params['endDate'], DATE_FORMAT)
+        last_id = int(params.get('lastId') or 0)
+        transactions = sorted(
+            (
+                transaction
+                for transaction in self.transactions
+                if transaction['bank_account_id'] == account_id
+                and transaction['id'] > last_id
+                and begin <= datetime.strptime(transaction['system_date'], SYSTEM_DATE_FORMAT) < end + timedelta(seconds=1)
+            ),
+            key=lambda transaction: transaction['id'],
+        )
+        return {'status': 'success', 'transactions': transactions[:self.page_size]}
+
+    def _reply(self, handler, status, values, headers=None):
+        content = json.dumps(values).encode()
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(content)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        try:
+            handler.wfile.write(content)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up waiting, see inject_error('timeout')
+            pass
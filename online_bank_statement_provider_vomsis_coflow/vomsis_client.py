@@ -0,0 +1,209 @@
+# Copyright 2024 Coflow Team
+# License LGPLv3 or later (https://www.gnu.org/licenses/lgpl-3.0).
+"""HTTP client of the Vomsis API.
+
+One client is kept per API base and key in the worker process, so the pooled
+session and the authentication token are reused across pulls, providers and
+crons instead of logging in and opening a new connection on each request.
+"""
+import base64
+import binascii
+import json
+import logging
+import random
+import threading
+import time
+from datetime import timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from odoo.exceptions import UserError
+
+from odoo.addons.account_statement_import_online.models.online_bank_statement_provider import (
+    parse_retry_after,
+)
+
+_logger = logging.getLogger(__name__)
+
+VOMSIS_API_BASE = "https://developers.vomsis.com/api/v2"
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 20
+POOL_SIZE = 10
+# Used when neither the response nor the token tell when it expires
+DEFAULT_TOKEN_LIFETIME = 3600
+# Renew the token a bit before it expires to avoid a useless 401
+TOKEN_EXPIRY_MARGIN = 60
+# Rate limited and server errors are retried with an exponential backoff of
+# BACKOFF_FACTOR * 2 ** retry seconds at most, with full jitter
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+# Longer waits are not done in the request, the provider is paused instead
+BACKOFF_MAX = 30
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(app_key, app_secret, api_base=None):
+    """Return the shared client of the given credentials."""
+    api_base = (api_base or VOMSIS_API_BASE).rstrip("/")
+    key = (api_base, app_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None or client.app_secret != app_secret:
+            client = _clients[key] = VomsisClient(api_base, app_key, app_secret)
+        return client
+
+
+class VomsisClient:
+    def __init__(self, api_base, app_key, app_secret):
+        self.api_base = api_base
+        self.app_key = app_key
+        self.app_secret = app_secret
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._token = None
+        self._token_expiry = 0.0
+        self._lock = threading.Lock()
+
+    def url(self, path):
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.api_base}/{path.lstrip('/')}"
+
+    def get_token(self):
+        """Return the cached bearer token, logging in when it expired."""
+        with self._lock:
+            if not self._token or time.time() >= self._token_expiry:
+                self._authenticate()
+            return self._token
+
+    def invalidate_token(self, token=None):
+        """Forget the cached token, unless it was already renewed meanwhile."""
+        with self._lock:
+            if token is None or token == self._token:
+                self._token = None
+
+    def _authenticate(self):
+        response = self.session.post(
+            self.url("authenticate"),
+            json={"app_key": self.app_key, "app_secret": self.app_secret},
+            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+        )
+        try:
+            values = response.json()
+        except ValueError:
+            response.raise_for_status()
+            raise
+        if values.get("status") != "success":
+            raise UserError(values.get("message"))
+        self._token = f"Bearer {values.get('token')}"
+        self._token_expiry = self._get_token_expiry(values) - TOKEN_EXPIRY_MARGIN
+        _logger.debug("Vomsis token renewed for %s", self.api_base)
+
+    def _get_token_expiry(self, values):
+        """Expiry timestamp from the response, the token claims or the default."""
+        if values.get("expires_in"):
+            return time.time() + float(values["expires_in"])
+        try:
+            claims = values["token"].split(".")[1]
+            claims = json.loads(base64.urlsafe_b64decode(claims + "=" * (-len(claims) % 4)))
+            return float(claims["exp"])
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError, binascii.Error):
+            return time.time() + DEFAULT_TOKEN_LIFETIME
+
+    def request(self, method, path, params=None, json_data=None, headers=None):
+        """Send an authenticated request, logging in again once on a 401 and
+        retrying rate limited and server errors, see get_retry_delay()."""
+        headers = dict(headers or {})
+        renewed = False
+        retries = 0
+        while True:
+            token = self.get_token()
+            headers["Authorization"] = token
+            response = self.session.request(
+                method,
+                self.url(path),
+                params=params,
+                json=json_data,
+                headers=headers,
+                timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+            )
+            if response.status_code == 401 and not renewed:
+                renewed = True
+                self.invalidate_token(token)
+                continue
+            delay = get_retry_delay(response, retries)
+            if delay is None:
+                return response
+            retries += 1
+            _logger.info(
+                "Vomsis answered %s to %s %s, retry %s in %.1fs",
+                response.status_code, method, path, retries, delay,
+            )
+            time.sleep(delay)
+
+    def get_json(self, path, params=None):
+        """GET a resource, an empty dict when it does not exist."""
+        response = self.request("GET", path, params=params)
+        if response.status_code in (204, 404):
+            return {}
+        response.raise_for_status()
+        return response.json()
+
+    def iter_transaction_pages(self, account_id, since, until, interval_days, last_id=None, **filters):
+        """Yield (window start, window end, raw transactions) for [since, until).
+
+        The range is walked in windows of interval_days and each window is
+        paged with the lastId cursor until the API returns no new transaction.
+        """
+        path = f"accounts/{account_id}/transactions"
+        window_start = since
+        while window_start < until:
+            window_end = min(window_start + timedelta(days=interval_days), until)
+            cursor = last_id
+            while True:
+                response = self.get_json(path, params={
+                    "beginDate": window_start.strftime("%d-%m-%Y %H:%M:%S"),
+                    "endDate": window_end.strftime("%d-%m-%Y %H:%M:%S"),
+                    "lastId": cursor,
+                    **filters,
+                })
+                # Stop when the cursor does not move, whatever the API sends
+                page = [
+                    transaction
+                    for transaction in response.get("transactions") or []
+                    if cursor is None or transaction["id"] > cursor
+                ]
+                if not page:
+                    break
+                cursor = max(transaction["id"] for transaction in page)
+                yield window_start, window_end, page
+            window_start = window_end
+
+
+def get_retry_delay(response, retries):
+    """Seconds to wait before retrying the request, None to give up.
+
+    The Retry-After header is honoured, otherwise the delay grows
+    exponentially with a random jitter so that the workers pulling at the
+    same time do not retry together.
+    """
+    if response.status_code not in RETRY_STATUSES or retries >= MAX_RETRIES:
+        return None
+    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+    if retry_after is not None:
+        return retry_after if retry_after <= BACKOFF_MAX else None
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_FACTOR * 2 ** retries))
+
+
+def get_error_message(error):
+    """Message of an HTTP error response of the API, if any."""
+    try:
+        return error.response.json().get("errors", [])[0].get("message")
+    except Exception:
+        return None
@@ -25,6 +25,15 @@ class ResPartner(models.Model):
         for partner in self:
             partner.partner_balance = balance_map.get(partner.id, 0.0)
 
+    @api.model
+    def get_cheque_exposure(self, partner_id):
+        """Open received cheques of the partner per currency for the balance
+        header, read from the exposure rows maintained by the cheque module."""
+        partner = self.browse(partner_id)
+        if 'cheque_exposure_ids' not in partner._fields:
+            return {}
+        return partner._get_cheque_exposure_by_currency()
+
     def action_view_move_line_report(self):
         """Open Account Move Line Report for this partner"""
         self.ensure_one()
@@ -9,6 +9,7 @@ export class PartnerBalanceToolbar extends Component {
         dateFrom: { type: [String, { value: null }], optional: true },
         dateTo: { type: [String, { value: null }], optional: true },
         currencyBalances: { type: Object, optional: true },
+        chequeExposure: { type: Object, optional: true },
         showSummary: { type: Boolean, optional: true },
         isTrReport: { type: Boolean, optional: true },
         onTrReport: { type: Function },
@@ -84,4 +85,8 @@ export class PartnerBalanceToolbar extends Component {
     get currencyEntries() {
         return Object.entries(this.props.currencyBalances || {});
     }
+
+    get chequeEntries() {
+        return Object.entries(this.props.chequeExposure || {});
+    }
 }
@@ -30,6 +30,7 @@ export class PartnerBalanceListController extends ListController {
             currencyBalances: {},
             showSummary: false,
             initialBalance: 0,
+            chequeExposure: {},
         });
         this.state.showProducts = false;
         this.state.skipOpening = false;
@@ -48,6 +49,9 @@ export class PartnerBalanceListController extends ListController {
         onMounted(async () => {
             const cfg = await this.orm.call('partner.balance.user.config', 'get_user_config', []);
             Object.assign(this.userConfig, cfg);
+            if (this.partnerId) {
+                this.state.chequeExposure = await this.orm.call('res.partner', 'get_cheque_exposure', [this.partnerId]);
+            }
         });
 
         onPatched(() => {
@@ -86,6 +90,7 @@ export class PartnerBalanceListController extends ListController {
             dateFrom: this.state.dateFrom,
             dateTo: this.state.dateTo,
             currencyBalances: this.state.currencyBalances,
+            chequeExposure: this.state.chequeExposure,
             showSummary: this.state.showSummary,
             isTrReport: this.isTrReport,
             showProducts: this.state.showProducts,